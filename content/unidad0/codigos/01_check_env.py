@@ -12,78 +12,430 @@ Conceptos:
 2. Módulo `platform`: Datos del Hardware/OS.
 3. Módulo `shutil`: Verificar herramientas externas (git, gcc).
 4. Verificación de versiones con `packaging` (o tuplas simples).
+5. `concurrent.futures`: Las sondas corren en paralelo en un pool de hilos.
+6. Caché por "huella" (fingerprint): si nada cambió, no volvemos a sondear.
+7. Calibración: micro-benchmarks de CPU, escalamiento multiproceso, ancho
+   de banda de memoria y latencia de fsync para dimensionar pools y SQLite.
 
 Uso:
     python 01_check_env.py
+    python 01_check_env.py --json         # Salida para scripts de aprovisionamiento
+    python 01_check_env.py --sin-cache    # Fuerza un sondeo completo
+    python 01_check_env.py --versiones    # Incluye `<tool> --version` (más lento)
+    python 01_check_env.py --calibrar     # Mide el hardware y recomienda pools/PRAGMAs
 """
 
 import sys
 import platform
 import shutil
 import os
+import argparse
+import hashlib
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
 # Configuración de requisitos
 MIN_PYTHON_VERSION = (3, 10)
 REQUIRED_TOOLS = ["git", "pip"]
 
+# Subir este número invalida cachés viejas si cambia el formato de los datos
+VERSION_CACHE = 1
+
 def print_header(title):
     print(f"\n{'='*40}")
     print(f" {title.upper()}")
     print(f"{'='*40}")
 
-def check_python():
-    print_header("Intérprete Python")
-    print(f"Executable: {sys.executable}")
-    print(f"Version:    {sys.version.split()[0]}")
-    print(f"Compiler:   {platform.python_compiler()}")
-    print(f"Implement.: {platform.python_implementation()}")
-    
+# --- 1. Sondas (Recolectan datos, NO imprimen) ---
+# Separar "recolectar" de "mostrar" permite correr las sondas en paralelo,
+# cachearlas y reutilizarlas desde otra UI (01_rich_diagnostics.py) o en JSON.
+
+def sondear_python():
     current_ver = sys.version_info[:2]
-    if current_ver < MIN_PYTHON_VERSION:
-        print(f"\n[ERROR] Se requiere Python {MIN_PYTHON_VERSION}+. Tienes {current_ver}.")
+    return {
+        "executable": sys.executable,
+        "version": sys.version.split()[0],
+        "compiler": platform.python_compiler(),
+        "implementation": platform.python_implementation(),
+        "minimo": ".".join(map(str, MIN_PYTHON_VERSION)),
+        "ok": current_ver >= MIN_PYTHON_VERSION,
+    }
+
+def sondear_sistema():
+    # platform.processor() lanza `uname -p` en Linux: por eso vale la pena el pool
+    return {
+        "system": platform.system(),
+        "release": platform.release(),
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+    }
+
+def sondear_venv():
+    # sys.prefix != sys.base_prefix indica que estamos en un VENV
+    return {
+        "activo": sys.prefix != sys.base_prefix,
+        "prefix": sys.prefix,
+    }
+
+def sondear_herramienta(tool, version=False, timeout=3):
+    """
+    Busca la herramienta en PATH (microsegundos). Con version=True además
+    lanza `tool --version` (decenas o cientos de ms por herramienta): por
+    eso es opcional (--versiones).
+    """
+    path = shutil.which(tool)
+    version, preguntar = None, version
+    if path and preguntar:
+        try:
+            salida = subprocess.run([path, "--version"], capture_output=True,
+                                    text=True, timeout=timeout)
+            lineas = (salida.stdout or salida.stderr).strip().splitlines()
+            version = lineas[0] if lineas else None
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    return {"nombre": tool, "ruta": path, "version": version}
+
+# --- 2. Caché por Huella ---
+# La huella resume TODO lo que puede cambiar el resultado: intérprete,
+# venv, PATH y la fecha de modificación de cada carpeta del PATH (instalar
+# o borrar un ejecutable cambia el mtime de su carpeta).
+
+def ruta_cache(herramientas=REQUIRED_TOOLS):
+    """Un archivo por lista de herramientas: scripts con listas distintas no se pisan."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    lista = hashlib.sha256("\0".join(sorted(herramientas)).encode()).hexdigest()[:12]
+    return os.path.join(base, f"tecnm_diagnostico-{lista}.json")
+
+def _mtime(ruta):
+    try:
+        return os.stat(ruta).st_mtime_ns
+    except OSError:
+        return None
+
+def calcular_huella(herramientas, versiones=False):
+    path_env = os.environ.get("PATH", "")
+    datos = {
+        "version_cache": VERSION_CACHE,
+        "prefix": sys.prefix,
+        "executable": sys.executable,
+        "exe_mtime": _mtime(sys.executable),
+        "path": path_env,
+        "path_mtimes": [_mtime(d) for d in path_env.split(os.pathsep) if d],
+        "herramientas": sorted(herramientas),
+        "versiones": versiones,
+        "minimo": MIN_PYTHON_VERSION,
+    }
+    return hashlib.sha256(json.dumps(datos, sort_keys=True).encode()).hexdigest()
+
+def leer_cache(ruta, huella):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            contenido = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(contenido, dict) or contenido.get("huella") != huella:
+        return None
+    return contenido.get("datos")
+
+def escribir_cache(ruta, huella, datos):
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"huella": huella, "datos": datos}, f)
+        os.replace(temporal, ruta)  # Atómico: otro proceso nunca ve un JSON a medias
+    except OSError:
+        pass  # Sin caché no es un error: solo perdemos velocidad
+
+# --- 3. Recolección en Paralelo ---
+
+def recolectar_diagnostico(herramientas=REQUIRED_TOOLS, usar_cache=True, ruta=None, versiones=False):
+    """
+    Devuelve un dict con python/sistema/venv/herramientas. Usa la caché si la
+    huella coincide. versiones=True pregunta `--version` a cada herramienta.
+    """
+    ruta = ruta or ruta_cache(herramientas)
+    huella = calcular_huella(herramientas, versiones)
+    if usar_cache:
+        datos = leer_cache(ruta, huella)
+        if datos is not None:
+            datos["cache"] = True
+            return datos
+
+    with ThreadPoolExecutor(max_workers=len(herramientas) + 3) as pool:
+        f_python = pool.submit(sondear_python)
+        f_sistema = pool.submit(sondear_sistema)
+        f_venv = pool.submit(sondear_venv)
+        f_tools = [pool.submit(sondear_herramienta, tool, versiones) for tool in herramientas]
+        datos = {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": f_python.result(),
+            "sistema": f_sistema.result(),
+            "venv": f_venv.result(),
+            "herramientas": [f.result() for f in f_tools],
+        }
+    datos["ok"] = datos["python"]["ok"] and all(t["ruta"] for t in datos["herramientas"])
+
+    escribir_cache(ruta, huella, datos)
+    datos["cache"] = False
+    return datos
+
+# --- 4. Presentación ---
+
+def check_python(info):
+    print_header("Intérprete Python")
+    print(f"Executable: {info['executable']}")
+    print(f"Version:    {info['version']}")
+    print(f"Compiler:   {info['compiler']}")
+    print(f"Implement.: {info['implementation']}")
+
+    if not info["ok"]:
+        print(f"\n[ERROR] Se requiere Python {info['minimo']}+. Tienes {info['version']}.")
         return False
     else:
         print("\n[OK] Versión de Python correcta.")
         return True
 
-def check_system():
+def check_system(info):
     print_header("Sistema Operativo")
-    print(f"System:     {platform.system()} {platform.release()}")
-    print(f"Node:       {platform.node()}")
-    print(f"Machine:    {platform.machine()}")
-    print(f"Processor:  {platform.processor()}")
-    print(f"Cores (Log):{os.cpu_count()}")
+    print(f"System:     {info['system']} {info['release']}")
+    print(f"Node:       {info['node']}")
+    print(f"Machine:    {info['machine']}")
+    print(f"Processor:  {info['processor']}")
+    print(f"Cores (Log):{info['cpus']}")
 
-def check_tools():
+def check_tools(herramientas):
     print_header("Herramientas Externas")
     all_ok = True
-    for tool in REQUIRED_TOOLS:
-        path = shutil.which(tool)
-        status = f"[OK] ({path})" if path else "[FALTA]"
+    for tool in herramientas:
+        path = tool["ruta"]
+        status = f"[OK] ({path}) {tool['version'] or ''}" if path else "[FALTA]"
         if not path: all_ok = False
-        print(f"{tool:<10}: {status}") 
+        print(f"{tool['nombre']:<10}: {status}")
     return all_ok
 
-def check_virtual_env():
+def check_virtual_env(info):
     print_header("Entorno Virtual")
-    # sys.prefix != sys.base_prefix indica que estamos en un VENV
-    is_venv = sys.prefix != sys.base_prefix
+    is_venv = info["activo"]
     print(f"Activo:     {'SÍ' if is_venv else 'NO'}")
-    print(f"Path:       {sys.prefix}")
-    
+    print(f"Path:       {info['prefix']}")
+
     if not is_venv:
         print("\n[ADVERTENCIA] No estás usando un entorno virtual.")
         print("Recomendación: python -m venv .venv && source .venv/bin/activate")
 
+# --- 5. Calibración de Hardware ---
+# os.cpu_count() reporta los núcleos del HOST, no los que nos tocan: dentro
+# de un contenedor con cuota (docker --cpus=2) puede decir 64. Medimos.
+
+def _leer(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def cpus_efectivas():
+    """Mínimo entre afinidad del proceso y cuota de cgroups (v2 o v1)."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    cuota = None
+    cpu_max = _leer("/sys/fs/cgroup/cpu.max")          # cgroup v2: "200000 100000"
+    if cpu_max and not cpu_max.startswith("max"):
+        limite, periodo = cpu_max.split()
+        cuota = int(limite) / int(periodo)
+    else:
+        limite = _leer("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")   # cgroup v1
+        periodo = _leer("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if limite and periodo and int(limite) > 0:
+            cuota = int(limite) / int(periodo)
+
+    if cuota is not None:
+        cpus = min(cpus, max(1, int(cuota + 0.5)))
+    return cpus
+
+def memoria_efectiva():
+    """Bytes de RAM disponibles para nosotros (límite de cgroup si existe)."""
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        total = None
+    for ruta in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        limite = _leer(ruta)
+        if limite and limite.isdigit():
+            total = min(total, int(limite)) if total else int(limite)
+    return total
+
+def _trabajo_cpu(n):
+    """Carga de enteros pura (a nivel módulo para poder enviarla a otro proceso)."""
+    acumulado = 0
+    for i in range(n):
+        acumulado = (acumulado + i * i) % 1_000_003
+    return acumulado
+
+def medir_cpu_un_nucleo(duracion=0.5, bloque=200_000):
+    """Operaciones de bucle por segundo en un solo núcleo."""
+    operaciones = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < duracion:
+        _trabajo_cpu(bloque)
+        operaciones += bloque
+    return operaciones / (time.perf_counter() - inicio)
+
+def medir_escalamiento(max_workers, bloques_por_worker=4, bloque=200_000):
+    """
+    Throughput con 1, 2, 4... procesos. Eficiencia = speedup / workers.
+    Con una cuota de 2 CPUs, la eficiencia se desploma al pasar de 2 workers.
+    """
+    potencias = [2 ** k for k in range(max_workers.bit_length()) if 2 ** k <= max_workers]
+    niveles = sorted({*potencias, max_workers})
+    resultados = []
+    base = None
+    for workers in niveles:
+        tareas = [bloque] * (bloques_por_worker * workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_trabajo_cpu, [1000] * workers))  # Warmup: arrancar procesos
+            inicio = time.perf_counter()
+            list(pool.map(_trabajo_cpu, tareas))
+            transcurrido = time.perf_counter() - inicio
+        throughput = len(tareas) * bloque / transcurrido
+        base = base or throughput
+        speedup = throughput / base
+        resultados.append({"workers": workers, "ops_s": throughput,
+                           "speedup": speedup, "eficiencia": speedup / workers})
+    return resultados
+
+def medir_ancho_banda_memoria(tamano=64 * 1024 * 1024, repeticiones=5):
+    """GB/s copiando un buffer grande (memoryview evita copias intermedias)."""
+    origen = bytearray(tamano)
+    destino = bytearray(tamano)
+    vista_dst = memoryview(destino)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        vista_dst[:] = origen
+        tiempos.append(time.perf_counter() - inicio)
+    return tamano / min(tiempos) / 1e9
+
+def medir_latencia_fsync(directorio=".", escrituras=30, tamano=4096):
+    """Latencia de write+fsync de 4 KiB: lo que paga cada COMMIT durable de SQLite."""
+    datos = os.urandom(tamano)
+    latencias = []
+    with tempfile.NamedTemporaryFile(dir=directorio, prefix=".calibracion_") as f:
+        fd = f.fileno()
+        for _ in range(escrituras):
+            inicio = time.perf_counter()
+            os.write(fd, datos)
+            os.fsync(fd)
+            latencias.append(time.perf_counter() - inicio)
+    latencias.sort()
+    return {
+        "mediana_ms": statistics.median(latencias) * 1e3,
+        "p99_ms": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1e3,
+    }
+
+def recomendar(calibracion):
+    """Traduce mediciones en tamaños de pool y PRAGMAs de SQLite."""
+    cpus = calibracion["cpus_efectivas"]
+
+    # Procesos (CPU-bound): el mayor número de workers que aún escala bien
+    eficientes = [r["workers"] for r in calibracion["escalamiento"] if r["eficiencia"] >= 0.7]
+    procesos = max(eficientes) if eficientes else 1
+
+    # Hilos (I/O-bound): misma fórmula que ThreadPoolExecutor, pero con CPUs reales
+    hilos_io = min(32, cpus + 4)
+
+    fsync = calibracion["fsync"]["mediana_ms"]
+    ram = calibracion["memoria_bytes"] or 1024 ** 3
+    cache_kib = int(min(ram // 64, 256 * 1024 ** 2) // 1024)
+    pragmas = {
+        "journal_mode": "WAL",  # Lectores concurrentes y un solo fsync por checkpoint
+        # fsync lento => NORMAL (en WAL no corrompe, solo puede perder el último commit)
+        "synchronous": "NORMAL" if fsync > 2 else "FULL",
+        "cache_size": -cache_kib,  # Negativo = KiB (1/64 de la RAM, máx 256 MiB)
+        "mmap_size": 256 * 1024 ** 2 if calibracion["memcpy_gbs"] >= 2 else 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": max(5000, int(calibracion["fsync"]["p99_ms"] * 100)),
+    }
+    return {"hilos_io": hilos_io, "procesos_cpu": procesos, "sqlite_pragmas": pragmas}
+
+def calibrar_hardware(duracion=0.5, directorio="."):
+    cpus = cpus_efectivas()
+    calibracion = {
+        "cpu_count": os.cpu_count(),
+        "cpus_efectivas": cpus,
+        "memoria_bytes": memoria_efectiva(),
+        "ops_s_un_nucleo": medir_cpu_un_nucleo(duracion),
+        # Probamos hasta 2x las CPUs efectivas para ver dónde se rompe el escalamiento
+        "escalamiento": medir_escalamiento(min(2 * cpus, os.cpu_count() or cpus)),
+        "memcpy_gbs": medir_ancho_banda_memoria(),
+        "fsync": medir_latencia_fsync(directorio),
+    }
+    calibracion["recomendaciones"] = recomendar(calibracion)
+    return calibracion
+
+def imprimir_calibracion(c):
+    print_header("Calibración de Hardware")
+    print(f"os.cpu_count(): {c['cpu_count']}")
+    print(f"CPUs efectivas: {c['cpus_efectivas']} (afinidad + cuota cgroup)")
+    if c["memoria_bytes"]:
+        print(f"RAM efectiva:   {c['memoria_bytes'] / 1024 ** 3:.1f} GiB")
+    print(f"CPU 1 núcleo:   {c['ops_s_un_nucleo'] / 1e6:.1f} M ops/s")
+    print(f"Memcpy:         {c['memcpy_gbs']:.1f} GB/s")
+    print(f"fsync (4 KiB):  mediana {c['fsync']['mediana_ms']:.2f} ms, p99 {c['fsync']['p99_ms']:.2f} ms")
+
+    print(f"\n{'Workers':>8}{'M ops/s':>10}{'Speedup':>10}{'Eficiencia':>12}")
+    for r in c["escalamiento"]:
+        print(f"{r['workers']:>8}{r['ops_s'] / 1e6:>10.1f}{r['speedup']:>10.2f}{r['eficiencia']:>11.0%}")
+
+    rec = c["recomendaciones"]
+    print_header("Recomendaciones")
+    print(f"ThreadPoolExecutor(max_workers={rec['hilos_io']})   # I/O-bound")
+    print(f"ProcessPoolExecutor(max_workers={rec['procesos_cpu']})  # CPU-bound")
+    print("\nSQLite:")
+    for nombre, valor in rec["sqlite_pragmas"].items():
+        print(f"    PRAGMA {nombre} = {valor};")
+
 def main():
-    print(f"Iniciando Diagnóstico - {datetime.now()}")
-    
-    py_ok = check_python()
-    check_system()
-    check_virtual_env()
-    tools_ok = check_tools()
-    
+    parser = argparse.ArgumentParser(description="Diagnóstico de entorno del curso.")
+    parser.add_argument("--json", action="store_true", help="Imprime el diagnóstico como JSON.")
+    parser.add_argument("--sin-cache", action="store_true", help="Ignora la caché y sondea todo.")
+    parser.add_argument("--versiones", action="store_true", help="Pregunta la versión de cada herramienta (más lento).")
+    parser.add_argument("--calibrar", action="store_true", help="Mide el hardware y recomienda pools/PRAGMAs.")
+    args = parser.parse_args()
+
+    if args.calibrar:
+        calibracion = calibrar_hardware()
+        if args.json:
+            print(json.dumps(calibracion, indent=2))
+        else:
+            imprimir_calibracion(calibracion)
+        sys.exit(0)
+
+    diagnostico = recolectar_diagnostico(REQUIRED_TOOLS, usar_cache=not args.sin_cache, versiones=args.versiones)
+
+    if args.json:
+        print(json.dumps(diagnostico, indent=2, ensure_ascii=False))
+        sys.exit(0 if diagnostico["ok"] else 1)
+
+    origen = " (desde caché)" if diagnostico["cache"] else ""
+    print(f"Iniciando Diagnóstico - {datetime.now()}{origen}")
+
+    py_ok = check_python(diagnostico["python"])
+    check_system(diagnostico["sistema"])
+    check_virtual_env(diagnostico["venv"])
+    tools_ok = check_tools(diagnostico["herramientas"])
+
     print_header("Resumen")
     if py_ok and tools_ok:
         print("✅ EL ENTORNO ESTÁ LISTO PARA EL CURSO.")
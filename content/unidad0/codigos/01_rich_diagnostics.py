@@ -9,23 +9,29 @@ En lugar de imprimir texto plano aburrido, usamos 'rich' para renderizar
 tablas, paneles, emojis y barras de progreso.
 Esto demuestra que incluso las herramientas de CLI pueden tener una UX estelar.
 
+Los datos vienen de las sondas paralelas y cacheadas de `01_check_env.py`:
+esta capa solo se encarga de la presentación.
+
 Requisitos:
     pip install rich
+
+Uso:
+    python 01_rich_diagnostics.py
+    python 01_rich_diagnostics.py --json        # Mismo JSON que 01_check_env.py
+    python 01_rich_diagnostics.py --sin-cache
+    python 01_rich_diagnostics.py --versiones   # Incluye `<tool> --version`
 """
 
 import sys
-import platform
-import shutil
-import os
-import time
-from datetime import datetime
+import argparse
+import importlib
+import json
 
 # Intentar importar rich
 try:
     from rich.console import Console
     from rich.table import Table
     from rich.panel import Panel
-    from rich.progress import track
     from rich.layout import Layout
     from rich.text import Text
     from rich import print as rprint
@@ -34,83 +40,94 @@ except ImportError:
     print("Ejecuta: pip install rich")
     sys.exit(1)
 
+# El nombre empieza con dígito: no se puede usar `import 01_check_env`
+check_env = importlib.import_module("01_check_env")
+
 console = Console()
 
 # Configuración
-MIN_PYTHON = (3, 10)
+MIN_PYTHON = check_env.MIN_PYTHON_VERSION
 TOOLS = ["git", "pip", "gcc", "docker", "code"]
 
-def get_python_info():
-    ver = sys.version_info
-    ver_str = f"{ver.major}.{ver.minor}.{ver.micro}"
-    is_valid = ver >= MIN_PYTHON
-    
+def get_python_info(info):
+    is_valid = info["ok"]
+
     table = Table(title="🐍 Intérprete Python", expand=True, border_style="green" if is_valid else "red")
     table.add_column("Propiedad", style="cyan")
     table.add_column("Valor", style="magenta")
-    
-    table.add_row("Versión Actual", ver_str)
+
+    table.add_row("Versión Actual", info["version"])
     table.add_row("Versión Mínima", f"{MIN_PYTHON[0]}.{MIN_PYTHON[1]}+")
-    table.add_row("Ruta Ejecutable", sys.executable)
-    table.add_row("Compiler", platform.python_compiler())
-    
+    table.add_row("Ruta Ejecutable", info["executable"])
+    table.add_row("Compiler", info["compiler"])
+
     status = "✅ APROBADO" if is_valid else "❌ OBSOLETO"
     return Panel(table, title=f"Estado: {status}", border_style="green" if is_valid else "red")
 
-def get_system_info():
+def get_system_info(info):
     table = Table(title="💻 Sistema Operativo", expand=True)
     table.add_column("Hardwre/OS", style="blue")
     table.add_column("Detalle", style="white")
-    
-    table.add_row("Sistema", f"{platform.system()} {platform.release()}")
-    table.add_row("Arquitectura", platform.machine())
-    table.add_row("Procesador", platform.processor() or "Desconocido")
-    table.add_row("Núcleos CPU", str(os.cpu_count()))
-    table.add_row("Hostname", platform.node())
-    
+
+    table.add_row("Sistema", f"{info['system']} {info['release']}")
+    table.add_row("Arquitectura", info["machine"])
+    table.add_row("Procesador", info["processor"] or "Desconocido")
+    table.add_row("Núcleos CPU", str(info["cpus"]))
+    table.add_row("Hostname", info["node"])
+
     return Panel(table, border_style="blue")
 
-def check_tools_with_progress():
+def get_tools_info(herramientas):
     table = Table(title="🛠 Herramientas Externas", expand=True)
     table.add_column("Herramienta")
     table.add_column("Estado")
     table.add_column("Ruta")
+    table.add_column("Versión")
 
-    # Simular carga para efecto dramático (UX)
-    for tool in track(TOOLS, description="Escaneando PATH..."):
-        time.sleep(0.2) # Fake processing
-        path = shutil.which(tool)
-        if path:
-            table.add_row(f"[bold green]{tool}[/]", "✅ Instalado", path)
+    # Las sondas ya corrieron en paralelo: aquí solo pintamos
+    for tool in herramientas:
+        if tool["ruta"]:
+            table.add_row(f"[bold green]{tool['nombre']}[/]", "✅ Instalado", tool["ruta"], tool["version"] or "-")
         else:
-            table.add_row(f"[bold red]{tool}[/]", "❌ No encontrado", "-")
-            
+            table.add_row(f"[bold red]{tool['nombre']}[/]", "❌ No encontrado", "-", "-")
+
     return Panel(table, border_style="yellow")
 
 def main():
+    parser = argparse.ArgumentParser(description="Diagnóstico de entorno (Rich).")
+    parser.add_argument("--json", action="store_true", help="Imprime el diagnóstico como JSON.")
+    parser.add_argument("--sin-cache", action="store_true", help="Ignora la caché y sondea todo.")
+    parser.add_argument("--versiones", action="store_true", help="Pregunta la versión de cada herramienta (más lento).")
+    args = parser.parse_args()
+
+    if args.json:
+        diagnostico = check_env.recolectar_diagnostico(TOOLS, usar_cache=not args.sin_cache,
+                                                       versiones=args.versiones)
+        print(json.dumps(diagnostico, indent=2, ensure_ascii=False))
+        return
+
     console.clear()
     rprint(Panel.fit("[bold white on blue] Tópicos Avanzados de Programación [/]\n[italic]Diagnóstico de Entorno v2.0[/]", border_style="blue"))
-    
+
     with console.status("[bold green]Recopilando telemetría...[/]", spinner="dots"):
-        time.sleep(1) # UX Delay
-        py_panel = get_python_info()
-        sys_panel = get_system_info()
-    
+        diagnostico = check_env.recolectar_diagnostico(TOOLS, usar_cache=not args.sin_cache,
+                                                       versiones=args.versiones)
+        py_panel = get_python_info(diagnostico["python"])
+        sys_panel = get_system_info(diagnostico["sistema"])
+        tools_panel = get_tools_info(diagnostico["herramientas"])
+
     console.print(sys_panel)
     console.print(py_panel)
-    
-    # Herramientas con barra de carga real
-    tools_panel = check_tools_with_progress()
     console.print(tools_panel)
-    
+
     # Venv Check
-    is_venv = sys.prefix != sys.base_prefix
-    if is_venv:
+    if diagnostico["venv"]["activo"]:
         rprint(Panel("✅ Entorno Virtual [bold green]ACTIVO[/]", border_style="green"))
     else:
         rprint(Panel("⚠️  [bold yellow]ADVERTENCIA:[/bold yellow] No estás en un VirtualEnv.\nRecomendado: [code]python -m venv .venv[/code]", border_style="yellow"))
 
-    rprint("\n[bold green]➜ Diagnóstico Finalizado.[/]")
+    origen = " [dim](desde caché)[/]" if diagnostico["cache"] else ""
+    rprint(f"\n[bold green]➜ Diagnóstico Finalizado.[/]{origen}")
 
 if __name__ == "__main__":
     main()
@@ -10,15 +10,30 @@ Conceptos:
 1. `subprocess`: Ejecutar comandos de terminal desde Python.
 2. `importlib`: Verificar si un paquete ya está importable.
 3. Gestión de `requirements.txt`.
+4. `python -X importtime`: cuánto cuesta importar cada paquete (y sus submódulos).
+5. Instalación por lotes y "wheelhouse" local para máquinas sin Internet.
+6. `importlib.metadata`: leer los paquetes instalados sin lanzar `pip freeze`.
 
 Escenario:
     Este script intenta importar `requests` y `customtkinter`. 
     Si no existen, pregunta al usuario si desea instalarlos y ejecuta pip.
+
+Uso:
+    python 02_pip_automation.py
+    python 02_pip_automation.py --importtime                  # Costo de import
+    python 02_pip_automation.py --importtime --paquetes pandas matplotlib
+    python 02_pip_automation.py --llenar-wheelhouse wheels/   # (con Internet)
+    python 02_pip_automation.py --wheelhouse wheels/ --si     # (sin Internet)
+    python 02_pip_automation.py --requirements
 """
 
+import argparse
+import re
 import subprocess
 import sys
 import importlib.util
+import importlib.metadata
+from dataclasses import dataclass, field
 
 PACKAGES_TO_CHECK = [
     ("requests", "requests"),          # (nombre_import, nombre_pip)
@@ -27,17 +42,56 @@ PACKAGES_TO_CHECK = [
     ("sqlalchemy", "sqlalchemy")
 ]
 
-def install_package(package_name):
-    """Instala un paquete usando pip vía subprocess."""
-    print(f"📦 Instalando {package_name}...")
+def _args_wheelhouse(wheelhouse):
+    # --no-index: jamás tocar PyPI. --find-links: buscar wheels en la carpeta local.
+    return ["--no-index", "--find-links", wheelhouse] if wheelhouse else []
+
+def install_packages(package_names, wheelhouse=None):
+    """
+    Instala TODOS los paquetes en una sola invocación de pip.
+    Un proceso por paquete re-resuelve (y re-descarga) las dependencias
+    compartidas cada vez; una sola llamada resuelve el conjunto completo.
+    """
+    if not package_names:
+        return True
+    origen = f" desde {wheelhouse}" if wheelhouse else ""
+    print(f"📦 Instalando {', '.join(package_names)}{origen}...")
     try:
         # sys.executable asegura que usamos el pip del mismo entorno que este python
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package_name])
-        print(f"✅ {package_name} instalado correctamente.")
+        subprocess.check_call([sys.executable, "-m", "pip", "install",
+                               *_args_wheelhouse(wheelhouse), *package_names])
+        print("✅ Paquetes instalados correctamente.")
+        return True
+    except subprocess.CalledProcessError:
+        print(f"❌ Error al instalar {', '.join(package_names)}.")
+        return False
+
+def install_package(package_name, wheelhouse=None):
+    """Instala un paquete usando pip vía subprocess."""
+    return install_packages([package_name], wheelhouse)
+
+def llenar_wheelhouse(directorio, package_names=None, requirements=None):
+    """
+    Construye wheels (incluyendo dependencias) en `directorio`.
+    Se corre UNA vez en una máquina con Internet; luego se copia la carpeta
+    a los hosts aislados e `install_packages(..., wheelhouse=directorio)`.
+    """
+    objetivos = list(package_names or [])
+    if requirements:
+        objetivos += ["-r", requirements]
+    if not objetivos:
+        objetivos = [pip_name for _, pip_name in PACKAGES_TO_CHECK]
+    print(f"🛞 Llenando wheelhouse en {directorio}...")
+    try:
+        # `pip wheel` descarga y además compila los sdists: el host destino no necesita compilador
+        subprocess.check_call([sys.executable, "-m", "pip", "wheel", "--wheel-dir", directorio, *objetivos])
+        print("✅ Wheelhouse listo.")
+        return True
     except subprocess.CalledProcessError:
-        print(f"❌ Error al instalar {package_name}.")
+        print("❌ Error al construir el wheelhouse.")
+        return False
 
-def check_and_install():
+def check_and_install(wheelhouse=None, confirmar=True):
     print("--- Verificador de Dependencias ---")
     
     missing = []
@@ -55,23 +109,168 @@ def check_and_install():
         return
 
     print(f"\nPaquetes faltantes: {', '.join(missing)}")
-    resp = input("¿Desea instalar los faltantes ahora? (s/n): ").lower()
+    resp = input("¿Desea instalar los faltantes ahora? (s/n): ").lower() if confirmar else "s"
     
     if resp == 's':
-        for pkg in missing:
-            install_package(pkg)
+        install_packages(missing, wheelhouse)
         print("\nRe-ejecuta este script para verificar.")
     else:
         print("Operación cancelada.")
 
-def generate_requirements():
-    """Genera un archivo requirements.txt con las versiones actuales."""
-    print("\n📄 Generando requirements.txt...")
-    result = subprocess.run([sys.executable, "-m", "pip", "freeze"], capture_output=True, text=True)
-    with open("requirements.txt", "w") as f:
-        f.write(result.stdout)
-    print("✅ Archivo requirements.txt creado.")
+# --- Costo de Importación (-X importtime) ---
+# El arranque de una GUI/CLI suele estar dominado por los imports
+# (pandas, matplotlib, sqlalchemy...). Medimos en un intérprete NUEVO
+# para no contar módulos que ya estaban en sys.modules.
+
+# Formato: "import time:   self [us] | cumulative | <sangría>modulo"
+_LINEA_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+@dataclass
+class NodoImport:
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+    hijos: list = field(default_factory=list)
+
+    def recorrer(self):
+        """Itera este nodo y todos sus descendientes."""
+        pila = [self]
+        while pila:
+            nodo = pila.pop()
+            yield nodo
+            pila.extend(nodo.hijos)
+
+def parsear_importtime(texto):
+    """
+    Convierte la salida de -X importtime en un árbol.
+    Python imprime en POST-ORDEN: los hijos (más sangría) aparecen ANTES
+    que su padre, así que acumulamos pendientes por nivel.
+    """
+    pendientes = {}  # nivel -> nodos esperando a su padre
+    for linea in texto.splitlines():
+        m = _LINEA_IMPORTTIME.match(linea)
+        if not m:
+            continue  # Cabecera u otra salida de stderr
+        propio, acumulado, sangria, modulo = m.groups()
+        nivel = (len(sangria) - 1) // 2
+        nodo = NodoImport(modulo, int(propio), int(acumulado))
+        nodo.hijos = pendientes.pop(nivel + 1, [])
+        pendientes.setdefault(nivel, []).append(nodo)
+    return pendientes.get(0, [])
+
+def _importtime(codigo):
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                          capture_output=True, text=True)
+
+_ARRANQUE = None
+
+def modulos_de_arranque():
+    """Módulos que el intérprete importa SIEMPRE (site, encodings...): no son del paquete."""
+    global _ARRANQUE
+    if _ARRANQUE is None:
+        _ARRANQUE = {n.modulo for n in parsear_importtime(_importtime("pass").stderr)}
+    return _ARRANQUE
+
+def medir_importtime(import_name, repeticiones=3):
+    """
+    Importa en un proceso limpio; devuelve el árbol de la mejor corrida (o None).
+    `import a.b.c` importa primero `a` y `a.b` como raíces separadas, por eso
+    colgamos todas las raíces nuevas de un nodo sintético con el nombre pedido.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        proceso = _importtime(f"import {import_name}")
+        if proceso.returncode != 0:
+            return None
+        raices = [n for n in parsear_importtime(proceso.stderr) if n.modulo not in modulos_de_arranque()]
+        if len(raices) == 1 and raices[0].modulo == import_name:
+            raiz = raices[0]
+        else:
+            raiz = NodoImport(import_name, 0, sum(n.acumulado_us for n in raices), raices)
+        if mejor is None or raiz.acumulado_us < mejor.acumulado_us:
+            mejor = raiz
+    return mejor
+
+def imprimir_arbol(nodo, umbral_us, nivel=0, max_nivel=3):
+    print(f"{'  ' * nivel}{nodo.modulo:<{40 - 2 * nivel}} {nodo.acumulado_us / 1000:>8.1f} ms"
+          f"  (propio {nodo.propio_us / 1000:.1f} ms)")
+    if nivel >= max_nivel:
+        return
+    for hijo in sorted(nodo.hijos, key=lambda n: n.acumulado_us, reverse=True):
+        if hijo.acumulado_us >= umbral_us:
+            imprimir_arbol(hijo, umbral_us, nivel + 1, max_nivel)
+
+def reporte_importtime(import_names, top=10, umbral_ms=100.0, repeticiones=3):
+    print("--- Costo de Importación (python -X importtime) ---")
+    arboles = {}
+    for nombre in import_names:
+        raiz = medir_importtime(nombre, repeticiones)
+        if raiz is None:
+            print(f"[FALTA] {nombre} (no se pudo importar)")
+            continue
+        arboles[nombre] = raiz
+
+    # Resumen por paquete
+    print(f"\n{'Paquete':<20}{'Total':>12}{'Módulos':>10}")
+    for nombre, raiz in sorted(arboles.items(), key=lambda kv: kv[1].acumulado_us, reverse=True):
+        alerta = "  ⚠️  candidato a import diferido" if raiz.acumulado_us / 1000 >= umbral_ms else ""
+        print(f"{nombre:<20}{raiz.acumulado_us / 1000:>10.1f}ms{sum(1 for _ in raiz.recorrer()):>10}{alerta}")
+
+    # Árbol de submódulos (solo ramas que pesan >= 1% del paquete)
+    for nombre, raiz in arboles.items():
+        print(f"\n🌳 {nombre}")
+        imprimir_arbol(raiz, umbral_us=raiz.acumulado_us * 0.01)
+
+    # Los más pesados por tiempo PROPIO: ahí es donde realmente se gasta
+    todos = {n.modulo: n for raiz in arboles.values() for n in raiz.recorrer()}
+    print(f"\n🔥 Top {top} imports por tiempo propio:")
+    for nodo in sorted(todos.values(), key=lambda n: n.propio_us, reverse=True)[:top]:
+        print(f"   {nodo.propio_us / 1000:>8.1f} ms  {nodo.modulo}")
+    return arboles
+
+# Igual que `pip freeze`: las herramientas de empaquetado no se fijan
+_EXCLUIR_FREEZE = {"pip", "setuptools", "wheel", "distribute"}
+
+def generate_requirements(ruta="requirements.txt"):
+    """
+    Genera un archivo requirements.txt con las versiones actuales.
+    Lee los metadatos instalados con importlib.metadata: sin lanzar un
+    subproceso de pip (que tarda casi un segundo solo en arrancar).
+    """
+    print(f"\n📄 Generando {ruta}...")
+    versiones = {}
+    for dist in importlib.metadata.distributions():
+        nombre = dist.metadata["Name"]
+        if not nombre:
+            continue  # Metadatos rotos (instalación a medias)
+        clave = re.sub(r"[-_.]+", "-", nombre).lower()  # Normalización PEP 503
+        if clave not in _EXCLUIR_FREEZE:
+            versiones.setdefault(clave, f"{nombre}=={dist.version}")
+    with open(ruta, "w") as f:
+        f.write("".join(f"{linea}\n" for _, linea in sorted(versiones.items())))
+    print(f"✅ Archivo {ruta} creado ({len(versiones)} paquetes).")
 
 if __name__ == "__main__":
-    check_and_install()
-    # generate_requirements() # Descomentar si se desea generar snapshot
+    parser = argparse.ArgumentParser(description="Automatización de dependencias.")
+    parser.add_argument("--importtime", action="store_true", help="Mide el costo de importar cada paquete.")
+    parser.add_argument("--paquetes", nargs="+", help="Módulos a medir (por defecto PACKAGES_TO_CHECK).")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--umbral-ms", type=float, default=100.0, help="Marca paquetes más lentos que esto.")
+    parser.add_argument("--wheelhouse", metavar="DIR", help="Instala solo desde esta carpeta de wheels (offline).")
+    parser.add_argument("--llenar-wheelhouse", metavar="DIR", help="Construye wheels de los paquetes en DIR.")
+    parser.add_argument("-r", "--desde-requirements", metavar="ARCHIVO", help="Usado con --llenar-wheelhouse.")
+    parser.add_argument("--si", action="store_true", help="No preguntar antes de instalar.")
+    parser.add_argument("--requirements", action="store_true", help="Genera requirements.txt del entorno actual.")
+    args = parser.parse_args()
+
+    if args.importtime:
+        reporte_importtime(args.paquetes or [imp for imp, _ in PACKAGES_TO_CHECK],
+                           top=args.top, umbral_ms=args.umbral_ms)
+    elif args.llenar_wheelhouse:
+        ok = llenar_wheelhouse(args.llenar_wheelhouse, args.paquetes, args.desde_requirements)
+        sys.exit(0 if ok else 1)
+    elif args.requirements:
+        generate_requirements()
+    else:
+        check_and_install(wheelhouse=args.wheelhouse, confirmar=not args.si)
+        # generate_requirements() # Descomentar si se desea generar snapshot
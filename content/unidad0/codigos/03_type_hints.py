@@ -11,14 +11,40 @@ Conceptos:
 1. Sintaxis de tipos: `name: str`, `age: int`.
 2. Tipos complejos: `List`, `Dict`, `Optional`, `Union` (o `|` en 3.10+).
 3. `dataclasses`: Clases de datos sin boilerplate.
+4. Contenedores tipados con índices: hash (dict) para búsqueda exacta,
+   lista ordenada (`bisect`) para rangos/top-k y agregados incrementales.
+5. Almacenamiento columnar: una `array` (o buffer NumPy) por campo en vez
+   de un objeto por registro. Cadenas internadas y agregados vectorizados.
+6. Validación en runtime: `@validated` genera y compila un chequeo
+   especializado a partir de las anotaciones (metaprogramación con exec).
 
 Uso:
     python 03_type_hints.py
+    python 03_type_hints.py --columnar 1000000   # Memoria/tiempo: objetos vs columnas
+    python 03_type_hints.py --validacion 100000  # Validador compilado vs ingenuo
     (Idealmente revisar con: mypy 03_type_hints.py)
 """
 
+import argparse
+import bisect
+import csv
+import dataclasses
+import functools
+import inspect
+import math
+import random
+import time
+import tracemalloc
+import types
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence,
+                    Tuple, Union, get_args, get_origin, get_type_hints)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él, los agregados recorren las arrays en Python puro
+    np = None
 
 # --- 1. DATACLASSES ---
 # Reduce el código de __init__, __repr__, __eq__ automáticamente.
@@ -55,6 +81,662 @@ def buscar_por_matricula(estudiantes: List[Estudiante], target: str) -> Estudian
             return e
     return None
 
+# --- 3. CONTENEDOR INDEXADO ---
+# buscar_por_matricula es O(n) y calcular_promedio_curso re-suma todo en
+# cada llamada. Con cientos de miles de registros eso no escala.
+# GrupoEstudiantes mantiene los índices al día en cada alta/baja:
+#   - dict matricula -> Estudiante:        búsqueda O(1)
+#   - lista ordenada (promedio, matricula): rangos y top-k en O(log n + k)
+#   - suma y conteo acumulados:             promedio general O(1)
+
+class GrupoEstudiantes:
+    """Colección de estudiantes con índices por matrícula y por promedio."""
+
+    UMBRAL_HONORIFICO: float = 95.0
+
+    def __init__(self, estudiantes: Iterable[Estudiante] = ()) -> None:
+        self._por_matricula: Dict[str, Estudiante] = {}
+        self._por_promedio: List[Tuple[float, str]] = []
+        self._suma: float = 0.0
+        self._activos: int = 0
+        self.extender(estudiantes)
+
+    # --- Protocolo de contenedor ---
+    def __len__(self) -> int:
+        return len(self._por_matricula)
+
+    def __contains__(self, matricula: object) -> bool:
+        return matricula in self._por_matricula
+
+    def __iter__(self) -> Iterator[Estudiante]:
+        return iter(self._por_matricula.values())
+
+    # --- Altas y bajas (mantienen los índices) ---
+    def agregar(self, estudiante: Estudiante) -> None:
+        if estudiante.matricula in self._por_matricula:
+            raise ValueError(f"Matrícula duplicada: {estudiante.matricula}")
+        self._por_matricula[estudiante.matricula] = estudiante
+        bisect.insort(self._por_promedio, (estudiante.promedio, estudiante.matricula))
+        self._suma += estudiante.promedio
+        self._activos += estudiante.activo
+
+    def extender(self, estudiantes: Iterable[Estudiante]) -> None:
+        """
+        Alta masiva. insort por elemento sería O(n^2) en total (cada inserción
+        desplaza la lista); aquí agregamos al final y ordenamos UNA vez:
+        Timsort aprovecha que el prefijo ya estaba ordenado.
+        """
+        nuevos: List[Tuple[float, str]] = []
+        try:
+            for estudiante in estudiantes:
+                if estudiante.matricula in self._por_matricula:
+                    raise ValueError(f"Matrícula duplicada: {estudiante.matricula}")
+                self._por_matricula[estudiante.matricula] = estudiante
+                nuevos.append((estudiante.promedio, estudiante.matricula))
+                self._suma += estudiante.promedio
+                self._activos += estudiante.activo
+        finally:
+            # Aun si hubo un duplicado, los ya agregados quedan indexados
+            self._por_promedio.extend(nuevos)
+            self._por_promedio.sort()
+
+    def eliminar(self, matricula: str) -> Estudiante:
+        """Quita y retorna al estudiante. Lanza KeyError si no existe."""
+        estudiante = self._por_matricula.pop(matricula)
+        clave = (estudiante.promedio, matricula)
+        i = bisect.bisect_left(self._por_promedio, clave)
+        del self._por_promedio[i]
+        self._suma -= estudiante.promedio
+        self._activos -= estudiante.activo
+        return estudiante
+
+    def actualizar_promedio(self, matricula: str, promedio: float) -> None:
+        """
+        Cambia el promedio SIN romper el índice ordenado.
+        (Modificar `e.promedio` directamente dejaría el índice desactualizado.)
+        """
+        estudiante = self.eliminar(matricula)
+        estudiante.promedio = promedio
+        self.agregar(estudiante)
+
+    # --- Consultas ---
+    def buscar(self, matricula: str) -> Estudiante | None:
+        return self._por_matricula.get(matricula)
+
+    def rango_promedio(self, minimo: float, maximo: float = float("inf")) -> List[Estudiante]:
+        """Estudiantes con minimo <= promedio <= maximo, de menor a mayor."""
+        inicio = bisect.bisect_left(self._por_promedio, (minimo, ""))
+        fin = bisect.bisect_right(self._por_promedio, (maximo, "\U0010ffff"))
+        return [self._por_matricula[m] for _, m in self._por_promedio[inicio:fin]]
+
+    def top(self, k: int) -> List[Estudiante]:
+        """Los k mejores promedios, de mayor a menor."""
+        if k <= 0:
+            return []
+        return [self._por_matricula[m] for _, m in reversed(self._por_promedio[-k:])]
+
+    def honorificos(self) -> List[Estudiante]:
+        return self.rango_promedio(self.UMBRAL_HONORIFICO)
+
+    def promedio_general(self) -> Optional[float]:
+        """Mismo resultado que calcular_promedio_curso, pero en O(1)."""
+        if not self._por_matricula:
+            return None
+        return round(self._suma / len(self._por_matricula), 2)
+
+    @property
+    def total_activos(self) -> int:
+        return self._activos
+
+# --- 4. ALMACENAMIENTO COLUMNAR ---
+# Un Estudiante (dataclass con __dict__) cuesta cientos de bytes: el objeto,
+# su diccionario, el float, los strings... Un millón son cientos de MB.
+# En formato columnar cada campo vive en una `array` contigua:
+#   promedio -> array('d'): 8 bytes por estudiante, sin objetos float.
+# Los strings repetidos (nombres) se "internan": se guarda un índice (4 bytes)
+# a una tabla de cadenas únicas.
+
+class PoolCadenas:
+    """Tabla de cadenas únicas: cadena <-> código entero."""
+
+    def __init__(self) -> None:
+        self._valores: List[str] = []
+        self._codigos: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def __getitem__(self, codigo: int) -> str:
+        return self._valores[codigo]
+
+    def internar(self, valor: str) -> int:
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = len(self._valores)
+            self._valores.append(valor)
+            self._codigos[valor] = codigo
+        return codigo
+
+    def codigo(self, valor: str) -> Optional[int]:
+        return self._codigos.get(valor)
+
+class TablaEstudiantes:
+    """
+    Almacén columnar de solo-agregar (append-only) para analítica.
+
+    Las matrículas son únicas y no se repiten entre filas, así que se guardan
+    en una lista simple; el índice hash matrícula -> fila (un dict cuesta
+    ~100 bytes por entrada) solo se construye la primera vez que se busca.
+    Los objetos Estudiante solo se crean al acceder (`tabla[i]`, iteración).
+    """
+
+    # (typecode de array, dtype equivalente de NumPy)
+    _TIPOS: Dict[str, Tuple[str, str]] = {
+        "nombre": ("I", "uint32"),
+        "promedio": ("d", "float64"),
+        "activo": ("B", "uint8"),
+        "semestre": ("B", "uint8"),
+    }
+
+    def __init__(self) -> None:
+        self._nombres = PoolCadenas()
+        self._matriculas: List[str] = []
+        self._indice: Optional[Dict[str, int]] = None  # Perezoso: ver _indice_matriculas()
+        self._columnas: Dict[str, array] = {
+            campo: array(typecode) for campo, (typecode, _) in self._TIPOS.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._matriculas)
+
+    # --- Carga ---
+    def agregar(self, estudiante: Estudiante) -> None:
+        self.agregar_fila(estudiante.nombre, estudiante.matricula, estudiante.promedio,
+                          estudiante.activo, estudiante.semestre)
+
+    def agregar_fila(self, nombre: str, matricula: str, promedio: float,
+                     activo: bool = True, semestre: int = 1) -> None:
+        self._registrar_matricula(matricula)
+        cols = self._columnas
+        cols["nombre"].append(self._nombres.internar(nombre))
+        cols["promedio"].append(promedio)
+        cols["activo"].append(activo)
+        cols["semestre"].append(semestre)
+
+    def extender(self, estudiantes: Iterable[Estudiante]) -> None:
+        for e in estudiantes:
+            self.agregar(e)
+
+    def _registrar_matricula(self, matricula: str) -> None:
+        # Si el índice ya existe lo mantenemos al día; si no, los duplicados
+        # se detectan cuando se construya (ValueError en ese momento).
+        if self._indice is not None:
+            if matricula in self._indice:
+                raise ValueError(f"Matrícula duplicada: {matricula}")
+            self._indice[matricula] = len(self._matriculas)
+        self._matriculas.append(matricula)
+
+    def _indice_matriculas(self) -> Dict[str, int]:
+        if self._indice is None:
+            indice = {m: fila for fila, m in enumerate(self._matriculas)}
+            if len(indice) != len(self._matriculas):
+                raise ValueError("Hay matrículas duplicadas en la tabla.")
+            self._indice = indice
+        return self._indice
+
+    @classmethod
+    def desde_csv(cls, ruta: str, tamano_bloque: int = 50_000) -> "TablaEstudiantes":
+        """
+        Carga en streaming: nunca hay más de `tamano_bloque` filas como
+        objetos Python a la vez. Columnas: nombre,matricula,promedio,activo,semestre.
+        """
+        tabla = cls()
+        with open(ruta, newline="", encoding="utf-8") as f:
+            lector = csv.reader(f)
+            next(lector, None)  # Cabecera
+            while True:
+                bloque = [fila for _, fila in zip(range(tamano_bloque), lector)]
+                if not bloque:
+                    break
+                tabla._cargar_bloque(bloque)
+        return tabla
+
+    def _cargar_bloque(self, filas: List[List[str]]) -> None:
+        # Parseamos el bloque completo a listas locales y luego `array.extend`
+        # copia en C: mucho más rápido que append() fila por fila.
+        nombres, promedios, activos, semestres = [], [], [], []
+        for nombre, matricula, promedio, activo, semestre in filas:
+            self._registrar_matricula(matricula)
+            nombres.append(self._nombres.internar(nombre))
+            promedios.append(float(promedio))
+            activos.append(activo.strip().lower() in ("1", "true", "si", "sí"))
+            semestres.append(int(semestre))
+        cols = self._columnas
+        cols["nombre"].extend(nombres)
+        cols["promedio"].extend(promedios)
+        cols["activo"].extend(activos)
+        cols["semestre"].extend(semestres)
+
+    def guardar_csv(self, ruta: str) -> None:
+        with open(ruta, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["nombre", "matricula", "promedio", "activo", "semestre"])
+            for e in self:
+                escritor.writerow([e.nombre, e.matricula, e.promedio, int(e.activo), e.semestre])
+
+    # --- Acceso (materialización perezosa) ---
+    def __getitem__(self, fila: int) -> Estudiante:
+        if fila < 0:
+            fila += len(self)
+        cols = self._columnas
+        return Estudiante(
+            self._nombres[cols["nombre"][fila]],
+            self._matriculas[fila],
+            cols["promedio"][fila],
+            bool(cols["activo"][fila]),
+            cols["semestre"][fila],
+        )
+
+    def __iter__(self) -> Iterator[Estudiante]:
+        return self.materializar(range(len(self)))
+
+    def materializar(self, filas: Iterable[int]) -> Iterator[Estudiante]:
+        for fila in filas:
+            yield self[int(fila)]
+
+    def buscar(self, matricula: str) -> Estudiante | None:
+        fila = self._indice_matriculas().get(matricula)
+        return None if fila is None else self[fila]
+
+    # --- Vectorización ---
+    def _vista(self, campo: str) -> Any:
+        """
+        Vista NumPy SIN copia sobre la array. Debe ser temporal: mientras
+        exista, la array no puede crecer (BufferError al hacer append).
+        """
+        typecode, dtype = self._TIPOS[campo]
+        return np.frombuffer(self._columnas[campo], dtype=dtype)
+
+    def filtrar(self, *, honorifico: Optional[bool] = None, activo: Optional[bool] = None,
+                semestre: Optional[int] = None, promedio_min: Optional[float] = None,
+                promedio_max: Optional[float] = None) -> Sequence[int]:
+        """Índices de fila que cumplen TODOS los criterios dados."""
+        umbral = GrupoEstudiantes.UMBRAL_HONORIFICO
+        if np is not None:
+            mascara = np.ones(len(self), dtype=bool)
+            promedio = self._vista("promedio")
+            if honorifico is not None:
+                mascara &= (promedio >= umbral) == honorifico
+            if promedio_min is not None:
+                mascara &= promedio >= promedio_min
+            if promedio_max is not None:
+                mascara &= promedio <= promedio_max
+            if activo is not None:
+                mascara &= self._vista("activo").astype(bool) == activo
+            if semestre is not None:
+                mascara &= self._vista("semestre") == semestre
+            del promedio
+            return np.flatnonzero(mascara)
+
+        # Sin NumPy: una sola pasada recorriendo las columnas en paralelo
+        cols = self._columnas
+        filas = enumerate(zip(cols["promedio"], cols["activo"], cols["semestre"]))
+        return array("L", (
+            i for i, (p, a, s) in filas
+            if (honorifico is None or (p >= umbral) == honorifico)
+            and (promedio_min is None or p >= promedio_min)
+            and (promedio_max is None or p <= promedio_max)
+            and (activo is None or bool(a) == activo)
+            and (semestre is None or s == semestre)
+        ))
+
+    def estadisticas_promedio(self, filas: Optional[Sequence[int]] = None) -> Dict[str, float]:
+        """n, media, min, max y desviación estándar de `promedio` (opcionalmente solo en `filas`)."""
+        if np is not None:
+            valores = self._vista("promedio")
+            if filas is not None:
+                valores = valores[np.asarray(filas, dtype=np.intp)]  # Fancy indexing: copia
+            n = int(valores.size)
+            if n == 0:
+                return {"n": 0}
+            return {"n": n, "media": float(valores.mean()), "min": float(valores.min()),
+                    "max": float(valores.max()), "desviacion": float(valores.std())}
+
+        col = self._columnas["promedio"]
+        datos: Sequence[float] = col if filas is None else [col[i] for i in filas]
+        n = len(datos)
+        if n == 0:
+            return {"n": 0}
+        media = math.fsum(datos) / n
+        varianza = math.fsum((x - media) ** 2 for x in datos) / n
+        return {"n": n, "media": media, "min": min(datos), "max": max(datos),
+                "desviacion": math.sqrt(varianza)}
+
+    def memoria_bytes(self) -> int:
+        """Bytes de las columnas (los pools de cadenas se cuentan aparte con tracemalloc)."""
+        return sum(col.itemsize * len(col) for col in self._columnas.values())
+
+def comparar_columnar(n: int) -> None:
+    """Memoria y tiempo: lista de Estudiante vs TablaEstudiantes."""
+    nombres = ["Ana", "Beto", "Carla", "Diego", "Elena", "Fer", "Gaby", "Hugo"]
+    rng = random.Random(42)
+    filas = [(rng.choice(nombres), f"{i:08d}", round(rng.uniform(60, 100), 1),
+              rng.random() > 0.1, rng.randint(1, 12)) for i in range(n)]
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    objetos = [Estudiante(*f) for f in filas]
+    mem_objetos = tracemalloc.get_traced_memory()[0] - base
+    base = tracemalloc.get_traced_memory()[0]
+    tabla = TablaEstudiantes()
+    for f in filas:
+        tabla.agregar_fila(*f)
+    mem_tabla = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    # Nota: las matrículas (strings) se comparten con `filas` en ambos casos
+
+    print(f"--- {n:,} estudiantes (NumPy: {'sí' if np is not None else 'no'}) ---")
+    print(f"Objetos Estudiante: {mem_objetos / 1e6:>8.1f} MB")
+    print(f"TablaEstudiantes:   {mem_tabla / 1e6:>8.1f} MB (columnas: {tabla.memoria_bytes() / 1e6:.1f} MB)")
+
+    inicio = time.perf_counter()
+    honor = [e for e in objetos if e.es_honorifico() and e.activo]
+    t_objetos = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    honor_tabla = tabla.filtrar(honorifico=True, activo=True)
+    stats = tabla.estadisticas_promedio(honor_tabla)
+    t_tabla = time.perf_counter() - inicio
+    assert len(honor) == len(honor_tabla)
+    print(f"Honoríficos activos: {len(honor):,} | objetos {t_objetos * 1e3:.1f} ms"
+          f" vs columnar {t_tabla * 1e3:.1f} ms (incluye estadísticas)")
+    print(f"Estadísticas: {stats}")
+
+# --- 5. VALIDACIÓN EN RUNTIME (GENERADA DESDE LOS TYPE HINTS) ---
+# mypy revisa el código, pero los DATOS que llegan en runtime (CSV, JSON,
+# APIs) no pasan por mypy: Estudiante("Error", 12345, "Noventa") se crea
+# sin quejarse. Un validador genérico recorre los objetos de `typing` en
+# CADA llamada (get_origin, get_args...) y eso es lento.
+# @validated lee las anotaciones UNA vez, escribe el código Python de un
+# chequeo especializado (como haría un humano), lo compila con exec()
+# y lo cachea. En cada llamada solo corren isinstance() directos.
+
+def _nombre_tipo(tipo: Any) -> str:
+    return tipo.__name__ if isinstance(tipo, type) else repr(tipo).replace("typing.", "")
+
+def _error_tipo(etiqueta: str, esperado: str, valor: Any) -> TypeError:
+    return TypeError(f"'{etiqueta}' debe ser {esperado}, se recibió {type(valor).__name__}: {valor!r}")
+
+def _es_simple(tipo: Any) -> bool:
+    return tipo is type(None) or (isinstance(tipo, type) and get_origin(tipo) is None)
+
+def _clases_isinstance(tipo: Any) -> Tuple[type, ...]:
+    # Torre numérica de PEP 484: donde se pide float, un int también es válido
+    return (int, float) if tipo is float else (tipo,)
+
+class _GeneradorValidador:
+    """Traduce anotaciones de `typing` a líneas de código Python."""
+
+    def __init__(self) -> None:
+        self.ns: Dict[str, Any] = {"_error_tipo": _error_tipo}
+        self._contador = 0
+
+    def _nombre(self, prefijo: str) -> str:
+        self._contador += 1
+        return f"_{prefijo}{self._contador}"
+
+    def _constante(self, valor: Any) -> str:
+        nombre = self._nombre("k")
+        self.ns[nombre] = valor
+        return nombre
+
+    def _falla(self, pad: str, var: str, etiqueta: str, tipo: Any) -> str:
+        return f"{pad}    raise _error_tipo({etiqueta!r}, {_nombre_tipo(tipo)!r}, {var})"
+
+    def chequeo(self, tipo: Any, var: str, etiqueta: str, nivel: int) -> List[str]:
+        pad = "    " * nivel
+        if tipo is Any or tipo is object:
+            return []
+        if tipo is None or tipo is type(None):
+            return [f"{pad}if {var} is not None:", self._falla(pad, var, etiqueta, None)]
+
+        origen, args = get_origin(tipo), get_args(tipo)
+
+        if origen is Union or origen is types.UnionType:  # Optional[X], Union[...], X | None
+            if all(_es_simple(a) for a in args):
+                clases = tuple(c for a in args for c in _clases_isinstance(a))
+                return [f"{pad}if not isinstance({var}, {self._constante(clases)}):",
+                        self._falla(pad, var, etiqueta, tipo)]
+            no_nulos = [a for a in args if a is not type(None)]
+            if len(no_nulos) == 1:  # Optional de algo complejo: List[int] | None
+                return [f"{pad}if {var} is not None:"] + self.chequeo(no_nulos[0], var, etiqueta, nivel + 1)
+            # Unión de genéricos (raro): probamos cada alternativa compilada por separado
+            alternativas = self._constante(tuple(self.funcion_suelta(a, etiqueta) for a in args))
+            alt = self._nombre("alt")
+            return [f"{pad}for {alt} in {alternativas}:",
+                    f"{pad}    try:",
+                    f"{pad}        {alt}({var})",
+                    f"{pad}        break",
+                    f"{pad}    except TypeError:",
+                    f"{pad}        pass",
+                    f"{pad}else:",
+                    self._falla(pad, var, etiqueta, tipo)]
+
+        if origen is Literal:
+            return [f"{pad}if {var} not in {self._constante(args)}:", self._falla(pad, var, etiqueta, tipo)]
+
+        if origen in (list, set, frozenset, tuple, dict):
+            lineas = [f"{pad}if not isinstance({var}, {self._constante(origen)}):",
+                      self._falla(pad, var, etiqueta, tipo)]
+            if origen is dict and args:
+                k, v = self._nombre("k"), self._nombre("v")
+                cuerpo = (self.chequeo(args[0], k, f"{etiqueta}(clave)", nivel + 1)
+                          + self.chequeo(args[1], v, f"{etiqueta}[]", nivel + 1))
+                if cuerpo:
+                    lineas += [f"{pad}for {k}, {v} in {var}.items():"] + cuerpo
+            elif origen is tuple and args and args[-1] is not Ellipsis:
+                lineas += [f"{pad}if len({var}) != {len(args)}:", self._falla(pad, var, etiqueta, tipo)]
+                for i, arg in enumerate(args):
+                    lineas += self.chequeo(arg, f"{var}[{i}]", f"{etiqueta}[{i}]", nivel)
+            elif args:
+                e = self._nombre("e")
+                cuerpo = self.chequeo(args[0], e, f"{etiqueta}[]", nivel + 1)
+                if cuerpo:
+                    lineas += [f"{pad}for {e} in {var}:"] + cuerpo
+            return lineas
+
+        clase = origen if origen is not None else tipo
+        if isinstance(clase, type):
+            return [f"{pad}if not isinstance({var}, {self._constante(_clases_isinstance(clase))}):",
+                    self._falla(pad, var, etiqueta, tipo)]
+        return []  # TypeVar, Protocol sin runtime_checkable...: no se valida
+
+    def compilar(self, nombre: str, firma: str, lineas: List[str]) -> Callable[..., None]:
+        fuente = f"def {nombre}({firma}):\n" + "\n".join(lineas or ["    pass"]) + "\n"
+        exec(compile(fuente, f"<validador {nombre}>", "exec"), self.ns)
+        funcion = self.ns[nombre]
+        funcion.__fuente__ = fuente  # Para poder inspeccionar lo que se generó
+        return funcion
+
+    def funcion_suelta(self, tipo: Any, etiqueta: str) -> Callable[[Any], None]:
+        return self.compilar(self._nombre("chequeo"), "v", self.chequeo(tipo, "v", etiqueta, 1))
+
+def _validador_dataclass(cls: type) -> Callable[[Any], None]:
+    hints = get_type_hints(cls)
+    gen = _GeneradorValidador()
+    lineas: List[str] = []
+    for campo in dataclasses.fields(cls):
+        var = f"v_{campo.name}"
+        cuerpo = gen.chequeo(hints.get(campo.name, Any), var, campo.name, 1)
+        if cuerpo:
+            lineas += [f"    {var} = self.{campo.name}"] + cuerpo
+    return gen.compilar(f"validar_{cls.__name__}", "self", lineas)
+
+def _validador_funcion(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Genera un envoltorio con LA MISMA firma que la función: el intérprete
+    hace el binding de argumentos (inspect.Signature.bind es lento), se
+    valida y se llama a la función original sin empaquetar *args/**kwargs.
+    Los defaults se comparan por identidad: si no se pasó el argumento,
+    no se valida (un `x: int = None` no debe fallar en cada llamada).
+    """
+    hints = get_type_hints(func)
+    gen = _GeneradorValidador()
+    gen.ns["_func"] = func
+    firma = inspect.signature(func)
+
+    parametros = []
+    llamada: List[str] = []
+    lineas: List[str] = []
+    for p in firma.parameters.values():
+        default = p.empty
+        if p.default is not p.empty:
+            default = _Codigo(gen._constante(p.default))
+        parametros.append(p.replace(annotation=p.empty, default=default))
+
+        if p.kind is p.VAR_POSITIONAL:
+            llamada.append(f"*{p.name}")
+        elif p.kind is p.VAR_KEYWORD:
+            llamada.append(f"**{p.name}")
+        elif p.kind is p.KEYWORD_ONLY:
+            llamada.append(f"{p.name}={p.name}")
+        else:
+            llamada.append(p.name)
+
+        if p.name not in hints:
+            continue
+        if p.kind is p.VAR_POSITIONAL or p.kind is p.VAR_KEYWORD:
+            e = gen._nombre("e")
+            iterable = p.name if p.kind is p.VAR_POSITIONAL else f"{p.name}.values()"
+            cuerpo = gen.chequeo(hints[p.name], e, p.name, 2)
+            if cuerpo:
+                lineas += [f"    for {e} in {iterable}:"] + cuerpo
+        elif p.default is not p.empty:
+            cuerpo = gen.chequeo(hints[p.name], p.name, p.name, 2)
+            if cuerpo:
+                lineas += [f"    if {p.name} is not {default}:"] + cuerpo
+        else:
+            lineas += gen.chequeo(hints[p.name], p.name, p.name, 1)
+
+    lineas.append(f"    return _func({', '.join(llamada)})")
+    texto_firma = str(firma.replace(parameters=parametros, return_annotation=firma.empty))[1:-1]
+    return gen.compilar(f"validar_{func.__name__}", texto_firma, lineas)
+
+class _Codigo(str):
+    """Un str cuyo repr es él mismo: permite poner nombres de variables como defaults en la firma."""
+
+    def __repr__(self) -> str:
+        return str(self)
+
+_CACHE_VALIDADORES: Dict[Any, Callable[..., Any]] = {}
+
+def compilar_validador(obj: Any) -> Callable[..., Any]:
+    """Genera (una sola vez por objeto) el chequeo de una dataclass o el envoltorio de una función."""
+    validador = _CACHE_VALIDADORES.get(obj)
+    if validador is None:
+        if dataclasses.is_dataclass(obj):
+            validador = _validador_dataclass(obj)
+        else:
+            validador = _validador_funcion(obj)
+        _CACHE_VALIDADORES[obj] = validador
+    return validador
+
+def _envolver(func: Callable[..., Any]) -> Callable[..., Any]:
+    try:
+        envoltorio = compilar_validador(func)
+    except NameError:
+        envoltorio = None  # Referencia adelantada: compilamos en la primera llamada
+
+    if envoltorio is not None:
+        return functools.wraps(func)(envoltorio)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return compilar_validador(func)(*args, **kwargs)
+    return wrapper
+
+def validated(obj: Any) -> Any:
+    """
+    Decorador de validación en runtime basado en los type hints.
+    - Función:   se reemplaza por un envoltorio generado que valida y la llama.
+    - Dataclass: lo mismo con el __init__ generado por @dataclass.
+    Soporta clases, List/Set/Dict/Tuple, Optional, Union, `X | None`, Literal y Any.
+    Para revisar una instancia ya construida: compilar_validador(Clase)(obj).
+    """
+    if isinstance(obj, type):
+        if not dataclasses.is_dataclass(obj):
+            raise TypeError("@validated en clases requiere una dataclass (aplícalo ENCIMA de @dataclass).")
+        # El __init__ de @dataclass ya tiene las anotaciones de los campos
+        obj.__init__ = _envolver(obj.__init__)
+        return obj
+    return _envolver(obj)
+
+@validated
+@dataclass
+class EstudianteValidado(Estudiante):
+    """Igual que Estudiante, pero rechaza datos con tipos incorrectos al crearse."""
+
+@validated
+def registrar_calificaciones(matricula: str, notas: List[float], extra: Optional[float] = None) -> float:
+    """Promedio de notas (+ extra). Ejemplo de función validada."""
+    return sum(notas) / len(notas) + (extra or 0.0)
+
+# Validador "ingenuo": lo que hacen muchas librerías genéricas.
+# Recorre los objetos de typing en CADA llamada.
+
+def validar_ingenuo(valor: Any, tipo: Any) -> bool:
+    if tipo is Any:
+        return True
+    if tipo is None or tipo is type(None):
+        return valor is None
+    origen, args = get_origin(tipo), get_args(tipo)
+    if origen is Union or origen is types.UnionType:
+        return any(validar_ingenuo(valor, a) for a in args)
+    if origen in (list, set, frozenset):
+        return isinstance(valor, origen) and all(validar_ingenuo(e, args[0]) for e in valor) if args \
+            else isinstance(valor, origen)
+    if origen is dict:
+        return isinstance(valor, dict) and all(
+            validar_ingenuo(k, args[0]) and validar_ingenuo(v, args[1]) for k, v in valor.items())
+    if tipo is float:
+        return isinstance(valor, (int, float))
+    return isinstance(valor, origen or tipo)
+
+def validar_dataclass_ingenuo(obj: Any) -> None:
+    hints = get_type_hints(type(obj))
+    for campo in dataclasses.fields(obj):
+        valor = getattr(obj, campo.name)
+        if not validar_ingenuo(valor, hints[campo.name]):
+            raise _error_tipo(campo.name, _nombre_tipo(hints[campo.name]), valor)
+
+def comparar_validacion(n: int) -> None:
+    """Costo por registro: sin validar vs validador compilado vs validador ingenuo."""
+    filas = [(f"Alumno{i}", f"{i:08d}", 80.0 + i % 20, True, 1 + i % 12) for i in range(n)]
+    notas = [[90.0, 85.5, 70]] * n
+
+    def medir(etiqueta: str, funcion: Callable[[], Any], base: Optional[float] = None) -> float:
+        inicio = time.perf_counter()
+        funcion()
+        t = time.perf_counter() - inicio
+        extra = f"  ({(t - base) / n * 1e9:+.0f} ns/registro)" if base is not None else ""
+        print(f"{etiqueta:<34}{t * 1e3:>9.1f} ms{extra}")
+        return t
+
+    print(f"--- Validación de {n:,} registros ---")
+    base = medir("Estudiante (sin validar)", lambda: [Estudiante(*f) for f in filas])
+    medir("EstudianteValidado (compilado)", lambda: [EstudianteValidado(*f) for f in filas], base)
+    medir("Estudiante + validador ingenuo",
+          lambda: [validar_dataclass_ingenuo(Estudiante(*f)) for f in filas], base)
+
+    hints = get_type_hints(registrar_calificaciones.__wrapped__)
+    base = medir("\nfunción (sin validar)", lambda: [registrar_calificaciones.__wrapped__("x", ns) for ns in notas])
+    medir("función @validated", lambda: [registrar_calificaciones("x", ns) for ns in notas], base)
+    medir("función + validador ingenuo", lambda: [
+        (validar_ingenuo("x", hints["matricula"]) and validar_ingenuo(ns, hints["notas"]),
+         registrar_calificaciones.__wrapped__("x", ns)) for ns in notas], base)
+
+    print("\nCódigo generado para EstudianteValidado.__init__:")
+    print(EstudianteValidado.__init__.__fuente__)
+
 def main() -> None:
     # Creación de objetos limpia
     grupo = [
@@ -65,6 +747,11 @@ def main() -> None:
     
     # Intento de error de tipo (Descomentar para ver que el editor se queja)
     # grupo.append(Estudiante("Error", 12345, "Noventa")) 
+    # En runtime, solo la versión validada lo detecta:
+    try:
+        EstudianteValidado("Error", 12345, "Noventa")
+    except TypeError as e:
+        print(f"Validación runtime: {e}")
 
     promedio_gral = calcular_promedio_curso(grupo)
     print(f"Promedio del Grupo: {promedio_gral}")
@@ -81,5 +768,28 @@ def main() -> None:
     else:
         print("No existe.")
 
+    # Contenedor indexado
+    indexado = GrupoEstudiantes(grupo)
+    indexado.agregar(Estudiante("Diego", "2023004", 96.0, semestre=5))
+    print(f"\nPromedio (O(1)): {indexado.promedio_general()}")
+    print(f"Honoríficos: {[e.nombre for e in indexado.honorificos()]}")
+    print(f"Top 2: {[e.nombre for e in indexado.top(2)]}")
+    print(f"Búsqueda O(1): {indexado.buscar('2023003')}")
+
+    # Almacén columnar
+    tabla = TablaEstudiantes()
+    tabla.extender(indexado)
+    print(f"\nColumnar honoríficos: {[e.nombre for e in tabla.materializar(tabla.filtrar(honorifico=True))]}")
+    print(f"Columnar estadísticas: {tabla.estadisticas_promedio()}")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Type hints, dataclasses y contenedores.")
+    parser.add_argument("--columnar", type=int, metavar="N", help="Compara objetos vs columnas con N estudiantes.")
+    parser.add_argument("--validacion", type=int, metavar="N", help="Benchmark del validador con N registros.")
+    args = parser.parse_args()
+    if args.columnar:
+        comparar_columnar(args.columnar)
+    elif args.validacion:
+        comparar_validacion(args.validacion)
+    else:
+        main()
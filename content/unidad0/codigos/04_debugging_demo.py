@@ -13,22 +13,32 @@ Conceptos:
     - s (step): Entrar a función.
     - c (continue): Continuar hasta el final.
     - p variable: Imprimir valor.
+3. Trazado NO interactivo: `sys.monitoring` (3.12+) o `sys.settrace`
+   cuentan cuántas veces se ejecuta cada línea y cuánto tiempo acumula,
+   sin detener el programa (ideal para procesos batch lentos).
 
 Instrucciones:
     Ejecuta el script. Se detendrá en la línea 'breakpoint()'.
     Escribe 'p i' para ver el contador.
     Escribe 'c' para terminar.
+
+Modo trazado (líneas calientes):
+    python 04_debugging_demo.py --trazar procesar_lista
+    python 04_debugging_demo.py --trazar funcion_con_bug_logico --n 10000
 """
 
+import argparse
+import inspect
 import sys
+import time
+from collections import defaultdict
 
 def funcion_con_bug_logico(a, b):
     # Imagina que esta función es compleja
     resultado = a + b
     
     # ¡BOOM! Aquí queremos inspeccionar
-    # En Python 3.7+ usamos breakpoint() nativo
-    print(f"-> Entrando al debugger con a={a}, b={b}...")
+    # En Python 3.7+ usamos breakpoint() nativo (prueba 'p a, b' al detenerse)
     # breakpoint()  # <--- DESCOMENTAR ESTA LÍNEA PARA PROBAR PDB
     
     # Bug simulado: Debería multiplicar pero suma
@@ -45,14 +55,164 @@ def procesar_lista(numeros):
         
     return total
 
-def main():
-    datos = [10, 20, 30, 40, 50]
+# --- Trazador de Líneas Calientes ---
+# breakpoint() pausa el programa: inútil para saber POR QUÉ un batch es lento.
+# Un trazador registra, para UNA función elegida, cuántas veces corre cada
+# línea y cuánto tiempo acumula (incluyendo las funciones que llama).
+
+class TrazadorLineas:
+    """
+    Context manager que perfila línea por línea una sola función.
+
+    - Python 3.12+: `sys.monitoring` con eventos LOCALES al code object,
+      el resto del programa corre sin overhead.
+    - Python < 3.12: `sys.settrace`, activando el trazado de líneas solo
+      en los frames de la función objetivo.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.code = func.__code__
+        self.hits = defaultdict(int)
+        self.tiempos = defaultdict(float)
+        self.backend = "sys.monitoring" if hasattr(sys, "monitoring") else "sys.settrace"
+        self._pila = []   # [linea_actual, t_inicio] por llamada activa (soporta recursión)
+        self._tool_id = None
+        self._trace_previo = None
+
+    def __enter__(self):
+        if self.backend == "sys.monitoring":
+            self._activar_monitoring()
+        else:
+            self._trace_previo = sys.gettrace()
+            sys.settrace(self._trace_global)
+        return self
+
+    def __exit__(self, *exc):
+        if self.backend == "sys.monitoring":
+            self._desactivar_monitoring()
+        else:
+            sys.settrace(self._trace_previo)
+        return False
+
+    # --- Contabilidad común ---
+    def _entrar(self):
+        self._pila.append([None, time.perf_counter()])
+
+    def _linea(self, lineno):
+        ahora = time.perf_counter()
+        estado = self._pila[-1] if self._pila else None
+        if estado is None:  # Empezamos a trazar a mitad de una llamada
+            estado = [None, ahora]
+            self._pila.append(estado)
+        if estado[0] is not None:
+            self.tiempos[estado[0]] += ahora - estado[1]
+        self.hits[lineno] += 1
+        estado[0], estado[1] = lineno, time.perf_counter()
+
+    def _salir(self):
+        ahora = time.perf_counter()
+        if self._pila:
+            linea, inicio = self._pila.pop()
+            if linea is not None:
+                self.tiempos[linea] += ahora - inicio
+
+    # --- Backend 3.12+: sys.monitoring ---
+    def _activar_monitoring(self):
+        mon = sys.monitoring
+        for tool_id in (mon.PROFILER_ID, mon.OPTIMIZER_ID):
+            if mon.get_tool(tool_id) is None:
+                self._tool_id = tool_id
+                break
+        else:
+            raise RuntimeError("No hay un tool id libre en sys.monitoring.")
+        eventos = mon.events
+        mon.use_tool_id(self._tool_id, "trazador_lineas")
+        mon.register_callback(self._tool_id, eventos.PY_START, lambda code, off: self._entrar())
+        mon.register_callback(self._tool_id, eventos.PY_RESUME, lambda code, off: self._entrar())
+        mon.register_callback(self._tool_id, eventos.LINE, lambda code, linea: self._linea(linea))
+        mon.register_callback(self._tool_id, eventos.PY_RETURN, lambda code, off, val: self._salir())
+        mon.register_callback(self._tool_id, eventos.PY_YIELD, lambda code, off, val: self._salir())
+        # Una excepción que escapa de la función también cierra su llamada;
+        # sin esto la pila conservaría una entrada de más. PY_UNWIND no es un
+        # evento local: se activa global y el callback filtra por code object
+        # (solo cuesta algo cuando una excepción atraviesa un frame).
+        mon.register_callback(self._tool_id, eventos.PY_UNWIND, self._desenrollar)
+        mon.set_events(self._tool_id, eventos.PY_UNWIND)
+        mon.set_local_events(
+            self._tool_id, self.code,
+            eventos.PY_START | eventos.PY_RESUME | eventos.LINE | eventos.PY_RETURN | eventos.PY_YIELD,
+        )
+
+    def _desenrollar(self, code, offset, excepcion):
+        if code is self.code:
+            self._salir()
+
+    def _desactivar_monitoring(self):
+        mon = sys.monitoring
+        mon.set_local_events(self._tool_id, self.code, 0)
+        mon.set_events(self._tool_id, 0)
+        for evento in (mon.events.PY_START, mon.events.PY_RESUME, mon.events.LINE,
+                       mon.events.PY_RETURN, mon.events.PY_YIELD, mon.events.PY_UNWIND):
+            mon.register_callback(self._tool_id, evento, None)
+        mon.free_tool_id(self._tool_id)
+
+    # --- Backend < 3.12: sys.settrace ---
+    def _trace_global(self, frame, evento, arg):
+        # Solo devolvemos tracer local para la función objetivo:
+        # las demás funciones no generan eventos 'line'.
+        if evento == "call" and frame.f_code is self.code:
+            self._entrar()
+            return self._trace_local
+        return None
+
+    def _trace_local(self, frame, evento, arg):
+        if evento == "line":
+            self._linea(frame.f_lineno)
+        elif evento == "return":
+            self._salir()
+        return self._trace_local
+
+    # --- Reporte ---
+    def reporte(self):
+        """Listado del código fuente anotado con hits, tiempo y % por línea."""
+        lineas, inicio = inspect.getsourcelines(self.func)
+        total = sum(self.tiempos.values()) or 1.0
+        salida = [f"Trazado de {self.func.__qualname__} ({self.backend})",
+                  f"{'Línea':>6}{'Hits':>9}{'Tiempo':>12}{'%':>7}  Código"]
+        for offset, texto in enumerate(lineas):
+            lineno = inicio + offset
+            if lineno in self.hits:
+                t = self.tiempos[lineno]
+                salida.append(f"{lineno:>6}{self.hits[lineno]:>9}{t * 1e3:>10.3f}ms"
+                              f"{100 * t / total:>6.1f}%  {texto.rstrip()}")
+            else:
+                salida.append(f"{lineno:>6}{'':>28}  {texto.rstrip()}")
+        return "\n".join(salida)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Demo de depuración.")
+    parser.add_argument("--trazar", choices=["procesar_lista", "funcion_con_bug_logico"],
+                        help="Perfila línea por línea la función indicada (sin pausar).")
+    parser.add_argument("--n", type=int, default=5, help="Tamaño de la lista de datos (10, 20, 30...).")
+    args = parser.parse_args(argv)
+
+    datos = list(range(10, 10 * args.n + 1, 10))
     print("Iniciando proceso batch...")
-    
-    res = procesar_lista(datos)
-    
+
+    if args.trazar:
+        objetivo = globals()[args.trazar]
+        with TrazadorLineas(objetivo) as trazador:
+            res = procesar_lista(datos)
+    else:
+        res = procesar_lista(datos)
+
     print(f"\nResultado final: {res}")
     print("Si el resultado no es el esperado, usa el debugger.")
 
+    if args.trazar:
+        print()
+        print(trazador.reporte())
+
 if __name__ == "__main__":
     main()
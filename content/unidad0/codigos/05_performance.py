@@ -10,16 +10,51 @@ Conceptos:
 1. `time.perf_counter()`: Medición precisa de tiempo de pared.
 2. `cProfile`: Profiler determinista integrado en Python.
 3. Complejidad Algorítmica (Big O) demostrada en la práctica.
+4. Benchmarking estadístico: warmup, repeticiones, percentiles y baselines.
+5. Profiler por muestreo: fotografías periódicas de la pila (bajo overhead),
+   exportables a flamegraph en formato "collapsed stacks".
+6. `tracemalloc`: pico de memoria, memoria retenida y líneas que más memoria retienen.
+7. Curvas de escalamiento: barrido geométrico de N y ajuste log-log del
+   exponente empírico (t ~ N^k). Un solo N nunca demuestra O(n) vs O(n^2).
 
 Compararemos:
     - Concatenación de strings con '+' (Lento, O(n^2)).
     - Concatenación con 'join' (Rápido, O(n)).
+
+Uso:
+    python 05_performance.py                          # Benchmark + cProfile
+    python 05_performance.py --guardar-baseline base.json
+    python 05_performance.py --comparar base.json     # Exit code 1 si hay regresión
+    python 05_performance.py --perfil muestreo --hz 500 --flamegraph pila.txt
+    python 05_performance.py --memoria                # Tiempo + memoria por caso
+    python 05_performance.py --escalamiento --n-max 1024000 --csv curva.csv
+    (luego: flamegraph.pl pila.txt > pila.svg, o arrastrar a speedscope.app)
+
+Como librería (el nombre empieza con dígito, así que usamos importlib):
+    perf = importlib.import_module("05_performance")
+    bench = perf.Benchmark(repeticiones=30)
+    bench.registrar("mi_funcion", mi_funcion, 1000)
+    resultados = bench.ejecutar()
 """
 
-import time
+import argparse
 import cProfile
+import csv
+import gc
 import io
+import json
+import math
+import os
+import platform
 import pstats
+import signal
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import asdict, dataclass, field
 
 ITERACIONES = 50000
 
@@ -37,35 +72,670 @@ def metodo_rapido():
         lista.append(str(i))
     return "".join(lista)
 
+# Las mismas ideas parametrizadas por n (para las curvas de escalamiento)
+def concat_mas(n):
+    resultado = ""
+    for i in range(n):
+        resultado += str(i)
+    return resultado
+
+def concat_join(n):
+    lista = []
+    for i in range(n):
+        lista.append(str(i))
+    return "".join(lista)
+
+def concat_stringio(n):
+    buffer = io.StringIO()
+    for i in range(n):
+        buffer.write(str(i))
+    return buffer.getvalue()
+
+def concat_generador(n):
+    return "".join(str(i) for i in range(n))
+
+def concat_bytearray(n):
+    buffer = bytearray()
+    for i in range(n):
+        buffer += str(i).encode()
+    return buffer.decode()
+
+ESTRATEGIAS = {
+    "+=": concat_mas,
+    "append+join": concat_join,
+    "io.StringIO": concat_stringio,
+    "join(generador)": concat_generador,
+    "bytearray": concat_bytearray,
+}
+
 def medir_tiempo(func, nombre):
     start = time.perf_counter()
     func()
     end = time.perf_counter()
     print(f"[{nombre}] Tiempo: {end - start:.4f} segundos")
 
-def main():
-    print(f"--- Benchmark (N={ITERACIONES}) ---")
-    
-    # 1. Medición simple
-    medir_tiempo(metodo_lento, "String + (Lento)")
-    medir_tiempo(metodo_rapido, "String .join (Rápido)")
-    
-    # 2. Profiling Profundo
-    print("\n--- Analizando con cProfile ---")
+# --- 1. Resultados Estadísticos ---
+# Una sola medición con perf_counter es ruido: el SO, la caché y el GC
+# meten variaciones de +/-20%. Por eso guardamos TODAS las muestras.
+
+def percentil(muestras, p):
+    """Percentil p (0-100) con interpolación lineal entre muestras ordenadas."""
+    if not muestras:
+        raise ValueError("No hay muestras para calcular el percentil.")
+    ordenadas = sorted(muestras)
+    k = (len(ordenadas) - 1) * p / 100
+    piso = math.floor(k)
+    techo = math.ceil(k)
+    if piso == techo:
+        return ordenadas[int(k)]
+    return ordenadas[piso] + (ordenadas[techo] - ordenadas[piso]) * (k - piso)
+
+@dataclass
+class ResultadoBenchmark:
+    nombre: str
+    muestras: list = field(repr=False)  # Segundos por llamada
+    memoria: "ResultadoMemoria | None" = None
+
+    @property
+    def minimo(self):
+        return min(self.muestras)
+
+    @property
+    def mediana(self):
+        return statistics.median(self.muestras)
+
+    @property
+    def p95(self):
+        return percentil(self.muestras, 95)
+
+    @property
+    def desviacion(self):
+        return statistics.stdev(self.muestras) if len(self.muestras) > 1 else 0.0
+
+    def resumen(self):
+        return {
+            "min": self.minimo,
+            "mediana": self.mediana,
+            "p95": self.p95,
+            "stddev": self.desviacion,
+        }
+
+# --- 2. Harness de Benchmark ---
+
+@dataclass
+class _Caso:
+    func: object
+    args: tuple
+    kwargs: dict
+
+class Benchmark:
+    """Registro de funciones a medir con warmup y repeticiones."""
+
+    def __init__(self, repeticiones=20, warmup=3, numero=1, desactivar_gc=True):
+        self.repeticiones = repeticiones
+        self.warmup = warmup
+        self.numero = numero            # Llamadas por muestra (útil para funciones muy rápidas)
+        self.desactivar_gc = desactivar_gc  # Igual que timeit: el GC mete picos aleatorios
+        self.casos = {}
+
+    def registrar(self, nombre, func=None, *args, **kwargs):
+        """Registra un callable. También funciona como decorador: @bench.registrar("x")."""
+        if func is None:
+            def decorador(f):
+                self.casos[nombre] = _Caso(f, args, kwargs)
+                return f
+            return decorador
+        self.casos[nombre] = _Caso(func, args, kwargs)
+        return func
+
+    def medir(self, nombre):
+        """Ejecuta warmup + repeticiones de un caso y devuelve sus muestras."""
+        caso = self.casos[nombre]
+        func, args, kwargs = caso.func, caso.args, caso.kwargs
+
+        # Warmup: calienta cachés, imports perezosos y el allocator
+        for _ in range(self.warmup):
+            func(*args, **kwargs)
+
+        gc_estaba_activo = gc.isenabled()
+        if self.desactivar_gc:
+            gc.collect()
+            gc.disable()
+        try:
+            muestras = []
+            for _ in range(self.repeticiones):
+                start = time.perf_counter()
+                for _ in range(self.numero):
+                    func(*args, **kwargs)
+                muestras.append((time.perf_counter() - start) / self.numero)
+        finally:
+            if gc_estaba_activo:
+                gc.enable()
+        return ResultadoBenchmark(nombre, muestras)
+
+    def medir_memoria(self, nombre, top=5):
+        """Ejecuta el caso UNA vez bajo tracemalloc (el tracing es caro: no se mezcla con el tiempo)."""
+        caso = self.casos[nombre]
+        return medir_memoria(caso.func, *caso.args, top=top, **caso.kwargs)
+
+    def ejecutar(self, nombres=None, memoria=False):
+        """Mide todos los casos registrados (o solo `nombres`)."""
+        resultados = {}
+        for nombre in (nombres or self.casos):
+            resultados[nombre] = self.medir(nombre)
+            if memoria:
+                resultados[nombre].memoria = self.medir_memoria(nombre)
+        return resultados
+
+def imprimir_resultados(resultados):
+    print(f"{'Caso':<28}{'min':>12}{'mediana':>12}{'p95':>12}{'stddev':>12}")
+    for r in resultados.values():
+        print(f"{r.nombre:<28}{r.minimo * 1e3:>10.3f}ms{r.mediana * 1e3:>10.3f}ms"
+              f"{r.p95 * 1e3:>10.3f}ms{r.desviacion * 1e3:>10.3f}ms")
+
+    con_memoria = [r for r in resultados.values() if r.memoria is not None]
+    if con_memoria:
+        print(f"\n{'Caso':<28}{'pico':>12}{'retenido':>12}{'bloq. ret.':>12}")
+        for r in con_memoria:
+            m = r.memoria
+            print(f"{r.nombre:<28}{formatear_bytes(m.pico):>12}"
+                  f"{formatear_bytes(m.retenido):>12}{m.bloques_retenidos:>12}")
+        for r in con_memoria:
+            print(f"\n  Top sitios de memoria retenida - {r.nombre}:")
+            for sitio in r.memoria.sitios:
+                print(f"    {formatear_bytes(sitio['bytes']):>10} {sitio['bloques_retenidos']:>7} bloques  {sitio['sitio']}")
+
+# --- 3. Baselines en JSON ---
+
+def guardar_baseline(resultados, ruta):
+    """Guarda muestras crudas + resumen para comparar en futuras ejecuciones."""
+    datos = {
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": {
+            nombre: {**asdict(r), **r.resumen()} for nombre, r in resultados.items()
+        },
+    }
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2)
+
+def cargar_baseline(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    return {
+        nombre: ResultadoBenchmark(nombre, r["muestras"])
+        for nombre, r in datos["resultados"].items()
+    }
+
+# --- 4. Detección de Regresiones ---
+# Comparar solo medianas da falsos positivos. Usamos Mann-Whitney U:
+# no asume distribución normal (los tiempos tienen cola larga a la derecha).
+
+def mann_whitney_p(actual, base):
+    """p-valor unilateral de que `actual` sea más lento que `base` (aprox. normal)."""
+    n1, n2 = len(actual), len(base)
+    if n1 < 2 or n2 < 2:
+        return 1.0
+    combinadas = sorted([(v, 0) for v in actual] + [(v, 1) for v in base])
+
+    # Rangos promedio para empates
+    rangos = [0.0] * len(combinadas)
+    empates = []
+    i = 0
+    while i < len(combinadas):
+        j = i
+        while j + 1 < len(combinadas) and combinadas[j + 1][0] == combinadas[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            rangos[k] = (i + j) / 2 + 1
+        empates.append(j - i + 1)
+        i = j + 1
+
+    r1 = sum(r for r, (_, grupo) in zip(rangos, combinadas) if grupo == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    mu = n1 * n2 / 2
+    n = n1 + n2
+    correccion = sum(t ** 3 - t for t in empates) / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - correccion))
+    if sigma == 0:
+        return 1.0
+    z = (u1 - mu - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+@dataclass
+class Regresion:
+    nombre: str
+    mediana_base: float
+    mediana_actual: float
+    p_valor: float
+
+    @property
+    def cambio(self):
+        return _cambio_relativo(self.mediana_base, self.mediana_actual)
+
+def _cambio_relativo(base, actual):
+    if base > 0:
+        return actual / base - 1
+    # Baseline en 0 (por debajo de la resolución del reloj, o JSON editado):
+    # cualquier tiempo medible cuenta como empeoramiento sin límite.
+    return math.inf if actual > 0 else 0.0
+
+def detectar_regresiones(actuales, baseline, umbral=0.05, alpha=0.01):
+    """
+    Devuelve los casos cuya mediana empeoró más de `umbral` (5%)
+    Y cuya diferencia es estadísticamente significativa (p < alpha).
+    """
+    regresiones = []
+    for nombre, actual in actuales.items():
+        base = baseline.get(nombre)
+        if base is None:
+            continue
+        cambio = _cambio_relativo(base.mediana, actual.mediana)
+        p = mann_whitney_p(actual.muestras, base.muestras)
+        if cambio > umbral and p < alpha:
+            regresiones.append(Regresion(nombre, base.mediana, actual.mediana, p))
+    return regresiones
+
+# --- 5. Profiling con cProfile ---
+
+def perfil_cprofile(*funcs):
     pr = cProfile.Profile()
     pr.enable()
-    
-    # Ejecutamos ambos
-    metodo_lento()
-    metodo_rapido()
-    
+    for func in funcs:
+        func()
     pr.disable()
-    
-    # Reporte
+
     s = io.StringIO()
     ps = pstats.Stats(pr, stream=s).sort_stats('tottime')
     ps.print_stats(10) # Top 10 funciones más lentas
-    print(s.getvalue())
+    return s.getvalue()
+
+# --- 6. Profiler por Muestreo (Sampling) ---
+# cProfile intercepta CADA llamada: en código con muchas llamadas pequeñas
+# el programa corre 2-3x más lento y las proporciones se deforman.
+# Un profiler por muestreo solo "mira" la pila N veces por segundo:
+# el costo es casi cero y el resultado es estadísticamente representativo.
+
+def _etiqueta_frame(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _pila_de(frame):
+    """Convierte un frame en tupla raíz -> hoja."""
+    pila = []
+    while frame is not None:
+        pila.append(_etiqueta_frame(frame))
+        frame = frame.f_back
+    pila.reverse()
+    return tuple(pila)
+
+class MuestreadorPila:
+    """
+    Profiler estadístico. Dos estrategias:
+    - "hilo":  un hilo daemon lee sys._current_frames() del hilo objetivo.
+               Portable, pero limitado por el GIL (switch interval ~5ms).
+    - "senal": SIGPROF + setitimer (solo Unix, hilo principal). Mide tiempo
+               de CPU y el intérprete entrega el frame interrumpido.
+    """
+
+    def __init__(self, hz=200, modo="hilo"):
+        if modo not in ("hilo", "senal"):
+            raise ValueError(f"Modo de muestreo desconocido: {modo!r}")
+        if modo == "senal" and not hasattr(signal, "setitimer"):
+            raise RuntimeError("El modo 'senal' requiere setitimer (Linux/macOS).")
+        if hz <= 0:
+            raise ValueError(f"La frecuencia de muestreo debe ser positiva (hz={hz}).")
+        self.intervalo = 1.0 / hz
+        self.modo = modo
+        self.pilas = Counter()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._objetivo = None
+        self._handler_previo = None
+
+    # Context manager: `with MuestreadorPila() as m: trabajo()`
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.detener()
+        return False
+
+    def iniciar(self):
+        self._objetivo = threading.get_ident()
+        if self.modo == "hilo":
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="muestreador", daemon=True)
+            self._hilo.start()
+        else:
+            self._handler_previo = signal.signal(signal.SIGPROF, self._on_senal)
+            signal.setitimer(signal.ITIMER_PROF, self.intervalo, self.intervalo)
+
+    def detener(self):
+        if self.modo == "hilo":
+            self._detener.set()
+            if self._hilo is not None:
+                self._hilo.join()
+        else:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._handler_previo or signal.SIG_DFL)
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self._objetivo)
+            if frame is not None:
+                self.pilas[_pila_de(frame)] += 1
+
+    def _on_senal(self, signum, frame):
+        if frame is not None:
+            self.pilas[_pila_de(frame)] += 1
+
+    @property
+    def total(self):
+        return sum(self.pilas.values())
+
+    def collapsed(self):
+        """Formato de Brendan Gregg: 'a;b;c 42' (una pila por línea)."""
+        return "\n".join(f"{';'.join(pila)} {n}" for pila, n in sorted(self.pilas.items()))
+
+    def guardar_collapsed(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(self.collapsed() + "\n")
+
+    def top(self, n=10):
+        """Lista [(función, muestras_propias, muestras_inclusivas)] ordenada por tiempo propio."""
+        propio = Counter()
+        inclusivo = Counter()
+        for pila, cuenta in self.pilas.items():
+            propio[pila[-1]] += cuenta
+            for etiqueta in set(pila):  # set(): la recursión no cuenta doble
+                inclusivo[etiqueta] += cuenta
+        return [(f, propio[f], inclusivo[f]) for f, _ in propio.most_common(n)]
+
+    def reporte(self, n=10):
+        total = self.total or 1
+        lineas = [f"{self.total} muestras ({self.modo}, {1 / self.intervalo:.0f} Hz)",
+                  f"{'propio':>8}{'%':>7}{'inclus.':>9}{'%':>7}  función"]
+        for funcion, propio, inclusivo in self.top(n):
+            lineas.append(f"{propio:>8}{100 * propio / total:>6.1f}%"
+                          f"{inclusivo:>9}{100 * inclusivo / total:>6.1f}%  {funcion}")
+        return "\n".join(lineas)
+
+def perfil_muestreo(*funcs, hz=200, modo="hilo", repeticiones=1):
+    """
+    Equivalente a perfil_cprofile() pero con el profiler estadístico.
+    Las funciones cortas se repiten para juntar suficientes muestras.
+    """
+    muestreador = MuestreadorPila(hz=hz, modo=modo)
+    with muestreador:
+        for _ in range(repeticiones):
+            for func in funcs:
+                func()
+    return muestreador
+
+# --- 7. Memoria con tracemalloc ---
+# En teoría cada `+=` crea un string nuevo y copia el anterior (churn O(n^2)).
+# En la práctica CPython a veces hace realloc in-place cuando el string tiene
+# una sola referencia. tracemalloc nos dice la verdad: compara el PICO de
+# cada estrategia contra su memoria retenida (el resultado final).
+
+def formatear_bytes(n):
+    signo = "-" if n < 0 else ""
+    n = abs(n)
+    for unidad in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{signo}{n:.0f}{unidad}" if unidad == "B" else f"{signo}{n:.1f}{unidad}"
+        n /= 1024
+    return f"{signo}{n:.1f}GiB"
+
+@dataclass
+class ResultadoMemoria:
+    pico: int        # Bytes máximos vivos durante la llamada (sobre el punto de partida)
+    retenido: int    # Bytes que siguen vivos al terminar (incluye el valor de retorno)
+    # tracemalloc solo ve bloques VIVOS: no cuenta asignaciones que ya se
+    # liberaron, así que esto no es "cuántas veces se pidió memoria" sino
+    # cuántos bloques quedan asignados al terminar (neto).
+    bloques_retenidos: int
+    sitios: list = field(default_factory=list)  # [{"sitio", "bytes", "bloques_retenidos"}]
+
+_FILTROS_TRACEMALLOC = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+def _filtros_arnes():
+    """Excluye las líneas de medir_memoria (snapshots, el propio resultado...), no el resto del archivo:
+    las estrategias medidas también viven aquí."""
+    codigo = medir_memoria.__code__
+    lineas = {linea for _, _, linea in codigo.co_lines() if linea is not None}
+    return tuple(tracemalloc.Filter(False, codigo.co_filename, linea) for linea in sorted(lineas))
+
+def medir_memoria(func, *args, top=5, **kwargs):
+    """Ejecuta func(*args) bajo tracemalloc y reporta pico, retenido y sitios."""
+    ya_activo = tracemalloc.is_tracing()
+    if not ya_activo:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        antes = tracemalloc.take_snapshot()
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        resultado = func(*args, **kwargs)  # Lo mantenemos vivo: es memoria retenida
+
+        actual, pico = tracemalloc.get_traced_memory()
+        despues = tracemalloc.take_snapshot()
+        del resultado
+    finally:
+        if not ya_activo:
+            tracemalloc.stop()
+
+    # Filtramos DESPUÉS de tomar ambos snapshots: filter_traces compila
+    # patrones (fnmatch/re) y esas asignaciones no son del código medido.
+    antes = antes.filter_traces(_FILTROS_TRACEMALLOC + _filtros_arnes())
+    despues = despues.filter_traces(_FILTROS_TRACEMALLOC + _filtros_arnes())
+    diferencias = despues.compare_to(antes, "lineno")
+    sitios = [
+        {"sitio": f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+         "bytes": d.size_diff, "bloques_retenidos": d.count_diff}
+        for d in diferencias[:top] if d.size_diff > 0
+    ]
+    return ResultadoMemoria(
+        pico=pico - base,
+        retenido=actual - base,
+        bloques_retenidos=sum(d.count_diff for d in diferencias),
+        sitios=sitios,
+    )
+
+# --- 8. Curvas de Escalamiento ---
+# Si t = c * N^k, entonces log(t) = log(c) + k*log(N): una recta.
+# La pendiente k ajustada por mínimos cuadrados es el exponente empírico.
+# k ~ 1 => lineal; k ~ 2 => cuadrático. La pendiente LOCAL entre dos N
+# consecutivos muestra dónde una estrategia empieza a romperse.
+# Sorpresa frecuente: en CPython `+=` suele dar k ~ 1 gracias al realloc
+# in-place (ver sección 7). Basta otra referencia viva al string, u otro
+# intérprete (PyPy), para volver al O(n^2) de los libros.
+
+def rango_geometrico(inicio, fin, factor=2):
+    """
+    N enteros distintos de `inicio` a `fin` multiplicando por `factor`.
+    ValueError si factor <= 1, inicio < 1 o quedan menos de 2 puntos
+    (con factores chicos `int()` repite N: se descartan los repetidos).
+    """
+    if factor <= 1:
+        raise ValueError(f"El factor debe ser > 1 (recibido {factor}).")
+    if inicio < 1:
+        raise ValueError(f"N mínimo debe ser >= 1 (recibido {inicio}).")
+    ns = []
+    n = inicio
+    while n <= fin:
+        if not ns or int(n) != ns[-1]:
+            ns.append(int(n))
+        n *= factor
+    if len(ns) < 2:
+        raise ValueError(f"El rango {inicio}..{fin} con factor {factor} da menos de 2 N distintos.")
+    return ns
+
+def ajustar_exponente(ns, tiempos):
+    """Regresión lineal en log-log. Devuelve (exponente, r2)."""
+    if len(ns) < 2:
+        raise ValueError("Se necesitan al menos 2 puntos para ajustar un exponente.")
+    xs = [math.log(n) for n in ns]
+    ys = [math.log(t) for t in tiempos]
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    k = sxy / sxx
+    ss_tot = sum((y - my) ** 2 for y in ys)
+    ss_res = sum((y - (my + k * (x - mx))) ** 2 for x, y in zip(xs, ys))
+    r2 = 1 - ss_res / ss_tot if ss_tot else 1.0
+    return k, r2
+
+def exponentes_locales(ns, tiempos):
+    """Pendiente entre cada par de puntos consecutivos."""
+    return [
+        math.log(t2 / t1) / math.log(n2 / n1)
+        for (n1, t1), (n2, t2) in zip(zip(ns, tiempos), zip(ns[1:], tiempos[1:]))
+    ]
+
+@dataclass
+class CurvaEscalamiento:
+    nombre: str
+    ns: list
+    tiempos: list  # Mínimo por N (el mínimo es el estimador menos ruidoso)
+
+    @property
+    def ajuste(self):
+        return ajustar_exponente(self.ns, self.tiempos)
+
+    @property
+    def locales(self):
+        return exponentes_locales(self.ns, self.tiempos)
+
+def curva_escalamiento(estrategias, ns, repeticiones=5, warmup=1, muestra_minima=0.002):
+    """Mide cada estrategia(n) para cada n. Funciones rápidas se repiten `numero` veces."""
+    curvas = {}
+    for nombre, func in estrategias.items():
+        tiempos = []
+        for n in ns:
+            # Calibración: cada muestra debe durar >= muestra_minima para que
+            # la resolución del reloj no domine en los N pequeños.
+            start = time.perf_counter()
+            func(n)
+            una = time.perf_counter() - start
+            numero = max(1, int(muestra_minima / una)) if una > 0 else 1000
+
+            bench = Benchmark(repeticiones=repeticiones, warmup=warmup, numero=numero)
+            bench.registrar(nombre, func, n)
+            tiempos.append(bench.medir(nombre).minimo)
+        curvas[nombre] = CurvaEscalamiento(nombre, list(ns), tiempos)
+    return curvas
+
+def imprimir_curvas(curvas):
+    ns = next(iter(curvas.values())).ns
+    print(f"{'N':>10}" + "".join(f"{nombre:>18}" for nombre in curvas))
+    for i, n in enumerate(ns):
+        print(f"{n:>10}" + "".join(f"{c.tiempos[i] * 1e3:>16.3f}ms" for c in curvas.values()))
+
+    print(f"\n{'Estrategia':<18}{'k (ajuste)':>12}{'R²':>8}{'k local máx':>14}{'en N':>10}")
+    for c in curvas.values():
+        k, r2 = c.ajuste
+        locales = c.locales
+        peor = max(range(len(locales)), key=locales.__getitem__)
+        print(f"{c.nombre:<18}{k:>12.2f}{r2:>8.3f}{locales[peor]:>14.2f}{c.ns[peor + 1]:>10}")
+
+def guardar_csv(curvas, ruta):
+    """CSV ancho: una fila por N, una columna (segundos) por estrategia."""
+    ns = next(iter(curvas.values())).ns
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["n", *curvas])
+        for i, n in enumerate(ns):
+            escritor.writerow([n, *(f"{c.tiempos[i]:.9f}" for c in curvas.values())])
+
+def crear_benchmark_demo(repeticiones, warmup):
+    bench = Benchmark(repeticiones=repeticiones, warmup=warmup)
+    bench.registrar("String + (Lento)", metodo_lento)
+    bench.registrar("String .join (Rápido)", metodo_rapido)
+    return bench
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de concatenación de strings.")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--guardar-baseline", metavar="RUTA", help="Guarda resultados como baseline JSON.")
+    parser.add_argument("--comparar", metavar="RUTA", help="Compara contra un baseline JSON.")
+    parser.add_argument("--umbral", type=float, default=0.05, help="Empeoramiento mínimo relevante (0.05 = 5%%).")
+    parser.add_argument("--perfil", choices=["cprofile", "muestreo", "ambos", "ninguno"], default="cprofile")
+    parser.add_argument("--hz", type=int, default=200, help="Frecuencia del profiler por muestreo.")
+    parser.add_argument("--modo-muestreo", choices=["hilo", "senal"], default="hilo")
+    parser.add_argument("--flamegraph", metavar="RUTA", help="Guarda las pilas en formato collapsed.")
+    parser.add_argument("--memoria", action="store_true", help="Mide también pico/retenido con tracemalloc.")
+    parser.add_argument("--escalamiento", action="store_true", help="Barrido de N y ajuste de complejidad.")
+    parser.add_argument("--n-min", type=int, default=1000)
+    parser.add_argument("--n-max", type=int, default=256000)
+    parser.add_argument("--factor", type=float, default=2)
+    parser.add_argument("--csv", metavar="RUTA", help="Guarda la curva tiempo-vs-N en CSV.")
+    args = parser.parse_args(argv)
+    if args.hz <= 0:
+        parser.error(f"--hz debe ser mayor que 0 (recibido: {args.hz})")
+    if args.flamegraph and args.perfil not in ("muestreo", "ambos"):
+        parser.error("--flamegraph necesita el profiler por muestreo: usa --perfil muestreo o ambos")
+
+    if args.escalamiento:
+        try:
+            ns = rango_geometrico(args.n_min, args.n_max, args.factor)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"--- Curvas de escalamiento (N={ns[0]}..{ns[-1]}, {len(ns)} puntos) ---")
+        curvas = curva_escalamiento(ESTRATEGIAS, ns, repeticiones=min(args.repeticiones, 5))
+        imprimir_curvas(curvas)
+        if args.csv:
+            guardar_csv(curvas, args.csv)
+            print(f"\n📈 Curva guardada en {args.csv}")
+        return 0
+
+    print(f"--- Benchmark (N={ITERACIONES}, repeticiones={args.repeticiones}, warmup={args.warmup}) ---")
+
+    # 1. Medición estadística
+    bench = crear_benchmark_demo(args.repeticiones, args.warmup)
+    resultados = bench.ejecutar(memoria=args.memoria)
+    imprimir_resultados(resultados)
+
+    if args.guardar_baseline:
+        guardar_baseline(resultados, args.guardar_baseline)
+        print(f"\n💾 Baseline guardado en {args.guardar_baseline}")
+
+    codigo_salida = 0
+    if args.comparar:
+        regresiones = detectar_regresiones(resultados, cargar_baseline(args.comparar), umbral=args.umbral)
+        print(f"\n--- Comparación contra {args.comparar} ---")
+        if regresiones:
+            for r in regresiones:
+                print(f"❌ {r.nombre}: {r.mediana_base * 1e3:.3f}ms -> {r.mediana_actual * 1e3:.3f}ms "
+                      f"({r.cambio:+.1%}, p={r.p_valor:.4f})")
+            codigo_salida = 1
+        else:
+            print("✅ Sin regresiones significativas.")
+
+    # 2. Profiling Profundo
+    if args.perfil in ("cprofile", "ambos"):
+        print("\n--- Analizando con cProfile ---")
+        print(perfil_cprofile(metodo_lento, metodo_rapido))
+
+    if args.perfil in ("muestreo", "ambos"):
+        print("\n--- Analizando con Profiler por Muestreo ---")
+        muestreador = perfil_muestreo(metodo_lento, metodo_rapido, hz=args.hz, modo=args.modo_muestreo,
+                                       repeticiones=args.repeticiones)
+        print(muestreador.reporte())
+        if args.flamegraph:
+            muestreador.guardar_collapsed(args.flamegraph)
+            print(f"\n🔥 Pilas guardadas en {args.flamegraph} (formato flamegraph)")
+
+    return codigo_salida
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -12,13 +12,31 @@ Conceptos:
 2. `inspect`: Módulo estándar para inspeccionar objetos vivos.
 3. `getattr`, `setattr`: Manipulación dinámica.
 4. Análisis de Frames y Stack Trace.
+5. `gc.get_referents`: Tamaño PROFUNDO de un objeto y qué parte lo retiene.
+6. Índice por lotes: firmas y rangos de código de un paquete entero, cacheados.
 
 Laboratorio:
     Analizaremos una función desconocida para ver sus argumentos y código fuente.
+    python 01_introspeccion_profunda.py --indice json --salida indice.json
+    python 01_introspeccion_profunda.py --comparar email
 """
 
+import argparse
+import ast
+import gc
+import heapq
+import importlib
 import inspect
+import json
+import os
+import pkgutil
+import re
+import sys
+import tempfile
+import time
 import types
+from collections import defaultdict, deque
+from dataclasses import dataclass
 
 class CajaNegra:
     """Una clase misteriosa para analizar."""
@@ -32,6 +50,333 @@ class CajaNegra:
         """Suma a y b y multiplica por el secreto."""
         return (a + b) * self.SECRETO
 
+# --- Tamaño Profundo (grafo de referencias) ---
+# sys.getsizeof(obj) solo mide el "cascarón": una instancia con un caché de
+# un millón de entradas reporta ~56 bytes. Para saber cuánto RETIENE hay que
+# recorrer todo lo que referencia (gc.get_referents), sin contar dos veces
+# lo compartido y sin perderse en módulos o clases (que son globales).
+
+@dataclass
+class PerfilMemoria:
+    total: int                 # Bytes alcanzables desde la raíz
+    objetos: int               # Objetos distintos visitados
+    por_tipo: list             # [(tipo, cantidad, bytes)] de mayor a menor
+    mayores: list              # [(ruta, tipo, bytes retenidos)] de mayor a menor
+
+def _es_frontera(obj, dicts_de_modulos):
+    # Módulos, clases y los __dict__ de módulos (vía __globals__ de funciones)
+    return (isinstance(obj, (types.ModuleType, type))
+            or (type(obj) is dict and id(obj) in dicts_de_modulos))
+
+def _etiqueta(padre, hijo):
+    """Cómo se llega de padre a hijo: .attr, [clave], [i] o <tipo>."""
+    if isinstance(padre, dict):
+        for clave, valor in padre.items():
+            if valor is hijo:
+                return f"[{clave!r}]"
+            if clave is hijo:
+                return f"<clave {clave!r}>"
+    elif isinstance(padre, (list, tuple)):
+        for i, valor in enumerate(padre):
+            if valor is hijo:
+                return f"[{i}]"
+    elif getattr(padre, "__dict__", None) is hijo:
+        return ".__dict__"
+    else:
+        nombres = list(getattr(padre, "__dict__", {}))
+        for cls in type(padre).__mro__:
+            slots = cls.__dict__.get("__slots__", ())
+            nombres.extend([slots] if isinstance(slots, str) else slots)
+        for nombre in nombres:
+            if getattr(padre, nombre, None) is hijo:
+                return f".{nombre}"
+    return f"<{type(hijo).__name__}>"
+
+def tamano_profundo(obj, top=10):
+    """
+    Recorre el grafo de referentes de `obj` de forma ITERATIVA (sin límite
+    de recursión) y devuelve un PerfilMemoria.
+
+    Cada objeto se cuenta una sola vez (detección de ciclos por id). El tamaño
+    "retenido" de un objeto es el de su subárbol en el árbol de recorrido: si
+    algo es compartido se atribuye al primer camino que lo encontró.
+    Los tamaños son los de sys.getsizeof (aproximados: no incluyen el
+    overhead del allocator).
+    """
+    dicts_de_modulos = {id(vars(m)) for m in list(sys.modules.values()) if m is not None}
+    objetos = {id(obj): obj}
+    padres = {id(obj): None}
+    orden = [id(obj)]          # Orden BFS: todo hijo aparece después de su padre
+
+    # El recorrido crea millones de referencias: sin GC automático mientras tanto
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        pendientes = deque([obj])
+        while pendientes:
+            actual = pendientes.popleft()
+            id_actual = id(actual)
+            referentes = gc.get_referents(actual)
+            if type(actual) is dict:
+                # Con claves str, el GC no recorre las claves (no pueden formar ciclos)
+                referentes.extend(actual)
+            for hijo in referentes:
+                i = id(hijo)
+                if i in objetos or _es_frontera(hijo, dicts_de_modulos):
+                    continue
+                objetos[i] = hijo
+                padres[i] = id_actual
+                orden.append(i)
+                pendientes.append(hijo)
+    finally:
+        if gc_activo:
+            gc.enable()
+
+    propio = {i: sys.getsizeof(o) for i, o in objetos.items()}
+    retenido = dict(propio)
+    for i in reversed(orden):  # Hijos antes que padres: acumulamos hacia arriba
+        padre = padres[i]
+        if padre is not None:
+            retenido[padre] += retenido[i]
+
+    tipos = defaultdict(lambda: [0, 0])
+    for i, o in objetos.items():
+        entrada = tipos[type(o).__qualname__]
+        entrada[0] += 1
+        entrada[1] += propio[i]
+    por_tipo = sorted(((t, c, b) for t, (c, b) in tipos.items()), key=lambda f: -f[2])
+
+    def ruta(i, max_pasos=12):
+        pasos = []
+        while padres[i] is not None:
+            if len(pasos) == max_pasos:  # Grafos profundos: solo el final del camino
+                pasos.append("…")
+                break
+            pasos.append(_etiqueta(objetos[padres[i]], objetos[i]))
+            i = padres[i]
+        texto = type(obj).__name__ + "".join(reversed(pasos))
+        return re.sub(r"\.__dict__\['(\w+)'\]", r".\1", texto)  # obj.__dict__['x'] -> obj.x
+
+    candidatos = heapq.nlargest(top, orden[1:], key=retenido.__getitem__)
+    mayores = [(ruta(i), type(objetos[i]).__qualname__, retenido[i]) for i in candidatos]
+    return PerfilMemoria(retenido[id(obj)], len(objetos), por_tipo, mayores)
+
+def imprimir_perfil(perfil, top=8):
+    print(f"Memoria profunda: {perfil.total:,} bytes en {perfil.objetos:,} objetos")
+    print("  Por tipo:")
+    for tipo, cantidad, total in perfil.por_tipo[:top]:
+        print(f"    {tipo:<20} {cantidad:>9,} obj {total:>13,} bytes")
+    print("  Lo que más retiene:")
+    for ruta, tipo, total in perfil.mayores[:top]:
+        print(f"    {total:>13,} bytes  {ruta}  ({tipo})")
+
+# --- Índice de Introspección por Lotes ---
+# inspect.getsource() vuelve a leer y tokenizar el archivo en CADA llamada,
+# e inspect.signature() reconstruye la firma cada vez. Con miles de callables
+# eso son segundos de arranque. El índice:
+#   - parsea cada archivo UNA vez con `ast` para obtener los rangos de líneas,
+#   - cachea las firmas por `__code__` (en memoria),
+#   - persiste el resultado en JSON por archivo (mtime + tamaño): si el archivo
+#     no cambió, ni siquiera se importa el módulo.
+
+VERSION_INDICE = 1
+
+def ruta_cache_indice():
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                        "tecnm_introspeccion.json")
+
+def _rangos_ast(archivo):
+    """{qualname: (línea_inicio, línea_fin)} de clases y funciones (incluye decoradores)."""
+    with open(archivo, "rb") as f:
+        arbol = ast.parse(f.read(), filename=archivo)
+    rangos = {}
+    pendientes = [(arbol, "")]
+    while pendientes:
+        nodo, prefijo = pendientes.pop()
+        for hijo in ast.iter_child_nodes(nodo):
+            if isinstance(hijo, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                nombre = prefijo + hijo.name
+                inicio = min([hijo.lineno] + [d.lineno for d in hijo.decorator_list])
+                rangos[nombre] = (inicio, hijo.end_lineno)
+                # Lo definido dentro de una función vive en <locals>: no lo indexamos
+                if isinstance(hijo, ast.ClassDef):
+                    pendientes.append((hijo, nombre + "."))
+    return rangos
+
+class IndiceIntrospeccion:
+    """
+    Analiza en una pasada todas las clases y funciones de un módulo o paquete.
+
+        indice = IndiceIntrospeccion()
+        entradas = indice.analizar("json")     # nombre o módulo ya importado
+        indice.guardar()                       # persiste para el próximo arranque
+    """
+
+    def __init__(self, ruta_cache=None):
+        self.ruta_cache = ruta_cache or ruta_cache_indice()
+        self._firmas = {}      # (code, es_clase) -> str
+        self._rangos = {}      # (archivo, mtime_ns) -> {qualname: (inicio, fin)}
+        self._archivos = {}    # archivo -> {"mtime_ns", "tamano", "entradas"}
+        self.aciertos = self.fallos = 0
+        try:
+            with open(self.ruta_cache, encoding="utf-8") as f:
+                contenido = json.load(f)
+            if contenido.get("version") == VERSION_INDICE:
+                self._archivos = contenido["archivos"]
+        except (OSError, ValueError, KeyError):
+            pass  # Sin caché: se reconstruye
+
+    def guardar(self):
+        # Mismo esquema que 01_check_env.py (temporal + os.replace). Si dos
+        # análisis guardan a la vez gana el último; al otro solo le tocará
+        # volver a analizar los archivos que falten.
+        try:
+            os.makedirs(os.path.dirname(self.ruta_cache), exist_ok=True)
+            temporal = f"{self.ruta_cache}.{os.getpid()}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"version": VERSION_INDICE, "archivos": self._archivos}, f)
+            os.replace(temporal, self.ruta_cache)
+        except OSError:
+            pass
+
+    # --- Recorrido ---
+    def analizar(self, modulo):
+        """Lista de entradas de un módulo; si es un paquete, incluye sus submódulos."""
+        if isinstance(modulo, str):
+            modulo = importlib.import_module(modulo)
+        entradas = self._analizar_modulo(modulo.__name__, getattr(modulo, "__file__", None), modulo)
+        for info in pkgutil.walk_packages(getattr(modulo, "__path__", []), modulo.__name__ + "."):
+            spec = info.module_finder.find_spec(info.name)
+            archivo = spec.origin if spec and spec.has_location else None
+            entradas.extend(self._analizar_modulo(info.name, archivo))
+        return entradas
+
+    def _analizar_modulo(self, nombre, archivo, modulo=None):
+        try:
+            estado = os.stat(archivo) if archivo else None
+        except OSError:
+            estado = None
+        if estado is not None:
+            previo = self._archivos.get(archivo)
+            if previo and previo["mtime_ns"] == estado.st_mtime_ns and previo["tamano"] == estado.st_size:
+                self.aciertos += 1
+                return list(previo["entradas"])
+        self.fallos += 1
+        if modulo is None:
+            try:
+                modulo = importlib.import_module(nombre)
+            except Exception:
+                return []  # Submódulos con dependencias opcionales ausentes, etc.
+        entradas = self._inspeccionar(modulo, archivo, estado)
+        if estado is not None and archivo.endswith(".py"):
+            self._archivos[archivo] = {"mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size,
+                                       "entradas": entradas}
+        return list(entradas)  # analizar() extiende la lista: no tocar la de la caché
+
+    def _inspeccionar(self, modulo, archivo, estado):
+        rangos = {}
+        if estado is not None and archivo.endswith(".py"):
+            clave = (archivo, estado.st_mtime_ns)
+            if clave not in self._rangos:
+                try:
+                    self._rangos[clave] = _rangos_ast(archivo)
+                except (SyntaxError, ValueError, OSError):
+                    self._rangos[clave] = {}
+            rangos = self._rangos[clave]
+
+        entradas = []
+        pendientes = [obj for obj in vars(modulo).values()
+                      if (inspect.isclass(obj) or inspect.isfunction(obj))
+                      and getattr(obj, "__module__", None) == modulo.__name__]
+        vistos = set()
+        while pendientes:
+            obj = pendientes.pop()
+            if id(obj) in vistos:
+                continue
+            vistos.add(id(obj))
+            es_clase = inspect.isclass(obj)
+            if es_clase:
+                for miembro in vars(obj).values():
+                    miembro = getattr(miembro, "__func__", miembro)  # staticmethod/classmethod
+                    if ((inspect.isfunction(miembro) or inspect.isclass(miembro))
+                            and miembro.__qualname__.startswith(obj.__qualname__ + ".")):
+                        pendientes.append(miembro)
+            inicio, fin = rangos.get(obj.__qualname__, (None, None))
+            doc = inspect.getdoc(obj) if obj.__doc__ else None
+            entradas.append({
+                "nombre": obj.__qualname__,
+                "modulo": modulo.__name__,
+                "tipo": "clase" if es_clase else ("metodo" if "." in obj.__qualname__ else "funcion"),
+                "firma": self._firma(obj, es_clase),
+                "archivo": archivo,
+                "inicio": inicio,
+                "fin": fin,
+                "doc": doc.splitlines()[0] if doc else None,
+            })
+        entradas.sort(key=lambda e: (e["inicio"] or 0, e["nombre"]))
+        return entradas
+
+    def _firma(self, obj, es_clase):
+        codigo = getattr(obj.__init__ if es_clase else obj, "__code__", None)
+        clave = (codigo, es_clase)
+        if codigo is not None and clave in self._firmas:
+            return self._firmas[clave]
+        try:
+            firma = str(inspect.signature(obj))
+        except (TypeError, ValueError):
+            firma = None  # Builtins o clases con __init__ en C
+        if codigo is not None:
+            self._firmas[clave] = firma
+        return firma
+
+def indexar_ingenuo(modulo):
+    """Lo que hace analista_de_codigo, repetido: getsource + signature por objeto."""
+    total = 0
+    for info in [None] + list(pkgutil.walk_packages(getattr(modulo, "__path__", []), modulo.__name__ + ".")):
+        try:
+            mod = modulo if info is None else importlib.import_module(info.name)
+        except Exception:
+            continue
+        for obj in list(vars(mod).values()):
+            if (inspect.isclass(obj) or inspect.isfunction(obj)) and getattr(obj, "__module__", None) == mod.__name__:
+                miembros = [obj] + ([m for m in vars(obj).values() if inspect.isfunction(m)]
+                                    if inspect.isclass(obj) else [])
+                for m in miembros:
+                    try:
+                        inspect.getsource(m)
+                        inspect.signature(m)
+                    except (OSError, TypeError, ValueError):
+                        pass
+                    total += 1
+    return total
+
+def comparar_indice(nombre_modulo):
+    modulo = importlib.import_module(nombre_modulo)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "indice.json")
+
+        inicio = time.perf_counter()
+        n_ingenuo = indexar_ingenuo(modulo)
+        t_ingenuo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        indice = IndiceIntrospeccion(ruta)
+        entradas = indice.analizar(modulo)
+        indice.guardar()
+        t_frio = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        indice = IndiceIntrospeccion(ruta)
+        entradas_tibio = indice.analizar(modulo)
+        t_tibio = time.perf_counter() - inicio
+
+    print(f"\n📚 --- ÍNDICE DE '{nombre_modulo}' ---")
+    print(f"getsource + signature ({n_ingenuo} objetos):  {t_ingenuo * 1e3:8.1f} ms")
+    print(f"Índice en frío ({len(entradas)} entradas):          {t_frio * 1e3:8.1f} ms")
+    print(f"Índice desde caché ({indice.aciertos} archivos sin cambios): {t_tibio * 1e3:8.1f} ms")
+    assert entradas_tibio == entradas
+    return entradas
+
 def analista_de_codigo(obj):
     print(f"\n🔍 --- ANALIZANDO: {obj} ---")
     
@@ -62,7 +407,39 @@ def analista_de_codigo(obj):
         for name, param in sig.parameters.items():
             print(f"   - Arg: {name:<10} Default: {param.default} Anotación: {param.annotation}")
 
-def main():
+    else:
+        # 4. ¿Cuánto cuesta realmente? (instancias y datos, no clases/funciones)
+        print(f"sys.getsizeof: {sys.getsizeof(obj)} bytes (solo el objeto)")
+        imprimir_perfil(tamano_profundo(obj), top=4)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Laboratorio de introspección.")
+    parser.add_argument("--indice", metavar="MODULO",
+                        help="Indexa todas las clases/funciones de un módulo o paquete y emite JSON.")
+    parser.add_argument("--salida", help="Archivo JSON de salida para --indice (por defecto, stdout).")
+    parser.add_argument("--sin-cache", action="store_true", help="Ignora el índice persistido.")
+    parser.add_argument("--comparar", metavar="MODULO",
+                        help="Compara el índice contra getsource/signature por objeto.")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        comparar_indice(args.comparar)
+        return
+    if args.indice:
+        indice = IndiceIntrospeccion(os.devnull if args.sin_cache else None)
+        entradas = indice.analizar(args.indice)
+        if not args.sin_cache:
+            indice.guardar()
+        texto = json.dumps(entradas, indent=2, ensure_ascii=False)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                f.write(texto + "\n")
+            print(f"✅ {len(entradas)} entradas -> {args.salida} "
+                  f"({indice.aciertos} archivos desde caché, {indice.fallos} analizados)")
+        else:
+            print(texto)
+        return
+
     # Caso 1: Analizar una clase
     analista_de_codigo(CajaNegra)
     
@@ -86,5 +463,11 @@ def main():
     instancia.procesar = types.MethodType(hack, instancia)
     print(f"Despues: {instancia.procesar(1)}")
 
+    # Caso 4: Un caché "olvidado" que crece en un proceso de larga vida
+    print("\n🧠 --- ¿QUIÉN RETIENE LA MEMORIA? ---")
+    instancia.cache = {f"clave_{i}": list(range(20)) for i in range(5_000)}
+    instancia.historial = [instancia]  # Ciclo: no debe contarse dos veces
+    imprimir_perfil(tamano_profundo(instancia))
+
 if __name__ == "__main__":
     main()
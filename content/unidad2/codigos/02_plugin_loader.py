@@ -11,16 +11,113 @@ Conceptos:
 1. `importlib.import_module`: Importar por string.
 2. `pkgutil.iter_modules`: Escanear directorios buscando módulos.
 3. Definición de una Interfaz (Protocolo ABstracto).
+4. Descubrimiento estático (`ast` o manifiesto) y carga perezosa:
+   arrancar sin importar ningún plugin.
+5. Caché de descubrimiento (mtime + tamaño + hash): solo se re-analiza lo que cambió.
+6. Ejecución concurrente (hilos/procesos) con timeout y tiempos por plugin.
+7. Recarga en caliente: `importlib.reload` solo de los módulos que cambiaron.
+8. Trabajadores persistentes: un proceso por plugin/grupo, IPC con pickle 5,
+   health checks y respawn automático.
+9. Registro con `__init_subclass__`: búsqueda O(1) por nombre y capacidad.
+10. Dependencias entre plugins: DAG, oleadas paralelas y ruta crítica.
+
+Uso:
+    python 02_plugin_loader.py                         # Hilos, timeout 1.5s
+    python 02_plugin_loader.py --modo procesos
+    python 02_plugin_loader.py --modo aislado --workers 2   # 2 procesos persistentes
+    python 02_plugin_loader.py --modo secuencial
 """
 
+import argparse
+import ast
+import builtins
+import hashlib
+import types
 import importlib
+import importlib.util
+import inspect
+import json
+import multiprocessing
+import multiprocessing.connection
 import pkgutil
 import os
+import pickle
+import queue
+import struct
 import sys
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
 
 # --- 1. Definición del Contrato (Interface) ---
 class PluginInterface(ABC):
+    """
+    Contrato de los plugins. Cada subclase se REGISTRA sola al definirse
+    (`__init_subclass__`), así descubrir no requiere recorrer dir(módulo):
+
+        class MiPlugin(PluginInterface, capabilities=("io",), depends=("Otro",)):
+            name = "Mi Plugin"
+
+    Búsquedas O(1): PluginInterface.registrado("Mi Plugin"),
+    PluginInterface.con_capacidad("io"), PluginInterface.del_modulo(__name__).
+    """
+    capabilities = ()
+    depends = ()               # Nombres de plugins que deben inicializarse antes
+
+    _registro = {}             # nombre -> clase
+    _por_capacidad = {}        # tag -> {nombre: clase}
+    _por_modulo = {}           # módulo -> {nombre: clase}
+
+    def __init_subclass__(cls, capabilities=None, depends=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if capabilities is not None:
+            cls.capabilities = tuple(capabilities)
+        if depends is not None:
+            cls.depends = tuple(depends)
+        nombre = cls.name if isinstance(cls.name, str) else cls.__qualname__
+        previa = PluginInterface._registro.get(nombre)
+        if previa is not None and previa.__module__ != cls.__module__:
+            print(f"⚠️ '{nombre}' ya estaba registrado por {previa.__module__}: lo reemplaza {cls.__module__}")
+        if previa is not None:  # Recarga (o reemplazo): sacar la clase vieja de los índices
+            PluginInterface._por_modulo.get(previa.__module__, {}).pop(nombre, None)
+            for tag in previa.capabilities:
+                PluginInterface._por_capacidad.get(tag, {}).pop(nombre, None)
+        PluginInterface._registro[nombre] = cls
+        PluginInterface._por_modulo.setdefault(cls.__module__, {})[nombre] = cls
+        for tag in cls.capabilities:
+            PluginInterface._por_capacidad.setdefault(tag, {})[nombre] = cls
+
+    @classmethod
+    def _olvidar_modulo(cls, modulo):
+        """Quita del registro las clases de `modulo` (antes de recargarlo o al borrarlo)."""
+        for nombre, clase in PluginInterface._por_modulo.pop(modulo, {}).items():
+            if PluginInterface._registro.get(nombre) is clase:
+                del PluginInterface._registro[nombre]
+            for tag in clase.capabilities:
+                PluginInterface._por_capacidad.get(tag, {}).pop(nombre, None)
+
+    @classmethod
+    def registrado(cls, nombre):
+        """Clase registrada con ese nombre (KeyError si no existe)."""
+        return PluginInterface._registro[nombre]
+
+    @classmethod
+    def con_capacidad(cls, tag):
+        """Clases concretas (no abstractas) que declaran la capacidad `tag`."""
+        return [c for c in PluginInterface._por_capacidad.get(tag, {}).values() if not inspect.isabstract(c)]
+
+    @classmethod
+    def del_modulo(cls, modulo):
+        """Clases concretas definidas en `modulo`."""
+        return [c for c in PluginInterface._por_modulo.get(modulo, {}).values() if not inspect.isabstract(c)]
+
+    def setup(self, dependencias):
+        """Se llama tras instanciar, con {nombre: instancia} de sus `depends`."""
+        self.dependencias = dependencias
+
     @abstractmethod
     def run(self):
         """Ejecuta la acción del plugin."""
@@ -32,53 +129,1262 @@ class PluginInterface(ABC):
         """Nombre legible del plugin."""
         pass
 
-# --- 2. Sistema de Plugins ---
+# --- 2. Descubrimiento Estático ---
+# Importar un plugin ejecuta su módulo (y todo lo que éste importe). Para
+# arrancar rápido leemos QUÉ plugins hay sin ejecutar nada:
+#   1. Un manifiesto `plugins.json` en el paquete, si existe:
+#      {"plugins": [{"modulo": "hello", "clase": "HelloPlugin", "nombre": "..."}]}
+#   2. Si no, el AST de cada módulo: clases cuya base es PluginInterface
+#      (también con alias, o vía otra clase plugin del mismo archivo) y sus
+#      atributos literales. Si una base viene de otro módulo del proyecto,
+#      ese módulo se importa para decidir (ver _confirmar_plugin).
+
+MANIFIESTO = "plugins.json"
+
+@dataclass
+class PluginSpec:
+    """Lo que sabemos de un plugin SIN haberlo importado."""
+    nombre: str
+    modulo: str                # Nombre completo: paquete.modulo
+    clase: str
+    archivo: Optional[str] = None
+    metadatos: dict = field(default_factory=dict)
+
+def _nombre_base(nodo):
+    if isinstance(nodo, ast.Subscript):  # Generic[T], Base[...]
+        nodo = nodo.value
+    if isinstance(nodo, ast.Name):
+        return nodo.id
+    if isinstance(nodo, ast.Attribute):
+        return nodo.attr
+    return None
+
+# Lo que ast.literal_eval puede lanzar ante algo que no es un literal simple
+_NO_LITERAL = (ValueError, TypeError, SyntaxError, RecursionError)
+
+# Nada importado de la biblioteca estándar (ABC, Enum, Generic...) puede ser un plugin
+_MODULOS_STD = getattr(sys, "stdlib_module_names", frozenset())
+
+def specs_desde_ast(archivo, modulo):
+    """
+    PluginSpecs de un archivo .py leyendo su AST (no lo ejecuta).
+
+    Si una clase hereda de algo que el AST no sabe clasificar (una base de
+    otro módulo del proyecto, una llamada...), se devuelve igual con el
+    metadato `base_externa`: solo importándola se sabe si es un plugin.
+    """
+    with open(archivo, "rb") as f:
+        arbol = ast.parse(f.read(), filename=archivo)
+    # Bases que sí entendemos, con lo que aportan a sus hijas:
+    #   plugins: nombre -> métodos abstractos aún sin implementar
+    #   otras:   nombre -> métodos/atributos concretos (clases que no son plugin)
+    abstractos_raiz = set(PluginInterface.__abstractmethods__)
+    plugins = {PluginInterface.__name__: abstractos_raiz}
+    otras = {}
+    modulos_std = set()
+    specs = []
+
+    def clasificar(base):
+        """("plugin" | "otra", conjunto) o None si no se puede saber sin importar."""
+        nombre = _nombre_base(base)
+        if isinstance(base, ast.Subscript):
+            base = base.value
+        if isinstance(base, ast.Attribute):  # modulo.Clase
+            if nombre == PluginInterface.__name__:
+                return "plugin", abstractos_raiz
+            raiz = base
+            while isinstance(raiz, ast.Attribute):
+                raiz = raiz.value
+            if isinstance(raiz, ast.Name) and raiz.id in modulos_std:
+                return "otra", set()
+            return None
+        if nombre in plugins:
+            return "plugin", plugins[nombre]
+        if nombre in otras:
+            return "otra", otras[nombre]
+        if nombre is not None and hasattr(builtins, nombre):  # object, Exception...
+            return "otra", set()
+        return None
+
+    for nodo in arbol.body:  # En orden: una base se define antes que sus hijas
+        if isinstance(nodo, ast.Import):
+            modulos_std.update(a.asname or a.name for a in nodo.names
+                               if a.name.split(".")[0] in _MODULOS_STD)
+            continue
+        if isinstance(nodo, ast.ImportFrom):
+            de_std = not nodo.level and (nodo.module or "").split(".")[0] in _MODULOS_STD
+            for a in nodo.names:
+                if a.name == PluginInterface.__name__:  # ... import PluginInterface as Base
+                    plugins[a.asname or a.name] = abstractos_raiz
+                elif de_std:
+                    otras[a.asname or a.name] = set()
+            continue
+        if not isinstance(nodo, ast.ClassDef):
+            continue
+        bases = [clasificar(b) for b in nodo.bases]
+        resueltas = [b for b in bases if b is not None]
+        base_externa = len(resueltas) < len(bases)
+        if not base_externa and not any(tipo == "plugin" for tipo, _ in resueltas):
+            otras[nodo.name] = set().union(_definidos(nodo), *(c for _, c in resueltas))
+            continue
+        metadatos = {"base_externa": True} if base_externa else {}
+        for kw in nodo.keywords:  # class X(PluginInterface, capabilities=(...))
+            try:
+                metadatos[kw.arg] = ast.literal_eval(kw.value)
+            except _NO_LITERAL:
+                pass
+        for sentencia in nodo.body:
+            if (isinstance(sentencia, ast.Assign) and len(sentencia.targets) == 1
+                    and isinstance(sentencia.targets[0], ast.Name)):
+                try:
+                    metadatos[sentencia.targets[0].id] = ast.literal_eval(sentencia.value)
+                except _NO_LITERAL:
+                    pass  # No es un literal: solo se conoce al importar
+            elif isinstance(sentencia, (ast.FunctionDef, ast.AsyncFunctionDef)) and sentencia.name == "name":
+                # `name` como @property (lo que declara la ABC): si solo
+                # devuelve un literal lo usamos; si no, hay que importar.
+                cuerpo = sentencia.body
+                if cuerpo and isinstance(cuerpo[0], ast.Expr) and isinstance(cuerpo[0].value, ast.Constant):
+                    cuerpo = cuerpo[1:]  # Docstring
+                try:
+                    if len(cuerpo) != 1 or not isinstance(cuerpo[0], ast.Return):
+                        raise ValueError
+                    metadatos["name"] = ast.literal_eval(cuerpo[0].value)
+                except _NO_LITERAL:
+                    metadatos.pop("name", None)
+                    metadatos["nombre_dinamico"] = True
+        # Abstracta = le queda algún método abstracto, propio o heredado de
+        # una base de este archivo que nadie en la jerarquía implementó.
+        propios = {d.name for d in nodo.body if isinstance(d, (ast.FunctionDef, ast.AsyncFunctionDef))
+                   and any(_nombre_base(x) == "abstractmethod" for x in d.decorator_list)}
+        concretos = set().union(_definidos(nodo), *(c for tipo, c in resueltas if tipo == "otra"))
+        heredados = set().union(*(c for tipo, c in resueltas if tipo == "plugin"))
+        pendientes = (heredados - concretos) | propios
+        plugins[nodo.name] = pendientes
+        if pendientes and not base_externa:
+            continue
+        nombre = metadatos.pop("name", nodo.name)
+        specs.append(PluginSpec(str(nombre), modulo, nodo.name, archivo, metadatos))
+    return specs
+
+def _definidos(clase):
+    """Nombres que el cuerpo de una clase define de forma concreta."""
+    nombres = set()
+    for sentencia in clase.body:
+        if isinstance(sentencia, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not any(_nombre_base(x) == "abstractmethod" for x in sentencia.decorator_list):
+                nombres.add(sentencia.name)
+        elif isinstance(sentencia, ast.Assign):
+            nombres.update(t.id for t in sentencia.targets if isinstance(t, ast.Name))
+        elif isinstance(sentencia, ast.AnnAssign) and sentencia.value is not None \
+                and isinstance(sentencia.target, ast.Name):
+            nombres.add(sentencia.target.id)
+    return nombres
+
+def specs_desde_manifiesto(ruta, paquete):
+    with open(ruta, encoding="utf-8") as f:
+        contenido = json.load(f)
+    specs = []
+    for entrada in contenido["plugins"]:
+        entrada = dict(entrada)
+        modulo = f"{paquete}.{entrada.pop('modulo')}"
+        clase = entrada.pop("clase")
+        archivo = os.path.join(os.path.dirname(ruta), modulo.rsplit(".", 1)[1] + ".py")
+        specs.append(PluginSpec(entrada.pop("nombre", clase), modulo, clase,
+                                archivo if os.path.exists(archivo) else None, entrada))
+    return specs
+
+class PluginPerezoso:
+    """
+    Proxy de un plugin descubierto estáticamente.
+    `name` sale del spec; el módulo se importa y la clase se instancia
+    la primera vez que se usa cualquier otra cosa (run, atributos...).
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._instancia = None
+
+    @property
+    def name(self):
+        return self.spec.nombre
+
+    @property
+    def cargado(self):
+        return self._instancia is not None
+
+    @property
+    def instancia(self):
+        if self._instancia is None:
+            modulo = importlib.import_module(self.spec.modulo)
+            self._instancia = getattr(modulo, self.spec.clase)()
+            # El nombre estático puede ser provisional (name calculado en runtime)
+            self.spec.nombre = self._instancia.name
+            print(f"✅ Cargado bajo demanda: {self.name}")
+        return self._instancia
+
+    def run(self):
+        return self.instancia.run()
+
+    def __getattr__(self, atributo):
+        if atributo.startswith("_"):  # Evita recursión (copy/pickle antes de __init__)
+            raise AttributeError(atributo)
+        return getattr(self.instancia, atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self.cargado else "sin cargar"
+        return f"<PluginPerezoso {self.name!r} {self.spec.modulo}.{self.spec.clase} ({estado})>"
+
+# --- Caché Persistente de Descubrimiento ---
+# Incluso sin importar, parsear el AST de decenas de archivos en cada arranque
+# cuesta. Guardamos los specs por archivo junto con (mtime, tamaño, sha256):
+#   - mtime y tamaño iguales  -> se reutiliza sin leer el archivo
+#   - cambió el mtime pero el hash es el mismo (touch, checkout) -> se reutiliza
+#   - si no, se vuelve a analizar SOLO ese archivo
+
+VERSION_CACHE_PLUGINS = 2    # Formato del JSON
+
+def _huella_codigo(codigo, h):
+    h.update(codigo.co_code)
+    h.update(repr(codigo.co_names).encode())
+    for constante in codigo.co_consts:
+        if isinstance(constante, types.CodeType):  # Lambdas/comprensiones anidadas
+            _huella_codigo(constante, h)
+        else:
+            h.update(repr(constante).encode())
+
+def version_analizador():
+    """
+    Huella del bytecode de `specs_desde_ast`: si cambia lo que el analizador
+    extrae (p. ej. keywords de clase), las entradas viejas dejan de servir
+    aunque los archivos de plugins no hayan cambiado.
+    """
+    h = hashlib.sha256()
+    for funcion in (specs_desde_ast, _nombre_base, _definidos):
+        _huella_codigo(funcion.__code__, h)
+    return h.hexdigest()[:16]
+
+def ruta_cache_plugins():
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                        "tecnm_plugins.json")
+
+def _sha256(archivo):
+    with open(archivo, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class CacheDescubrimiento:
+    """Specs por archivo, agrupados por directorio del paquete."""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or ruta_cache_plugins()
+        self.aciertos = self.fallos = 0
+        self._vistos = {}      # directorio -> {archivo} tocados en esta pasada
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                contenido = json.load(f)
+            vigente = (contenido.get("version") == VERSION_CACHE_PLUGINS
+                       and contenido.get("analizador") == version_analizador())
+            self._paquetes = contenido["paquetes"] if vigente else {}
+        except (OSError, ValueError, KeyError):
+            self._paquetes = {}
+
+    def specs(self, directorio, archivo, calcular):
+        """Specs de `archivo`: desde la caché si no cambió, si no llama a calcular()."""
+        directorio = os.path.abspath(directorio)
+        nombre = os.path.basename(archivo)
+        self._vistos.setdefault(directorio, set()).add(nombre)
+        entradas = self._paquetes.setdefault(directorio, {})
+        previo = entradas.get(nombre)
+        estado = os.stat(archivo)
+
+        if previo and previo["mtime_ns"] == estado.st_mtime_ns and previo["tamano"] == estado.st_size:
+            self.aciertos += 1
+            return [PluginSpec(**d) for d in previo["specs"]]
+        huella = _sha256(archivo)
+        if previo and previo["sha256"] == huella:
+            previo["mtime_ns"], previo["tamano"] = estado.st_mtime_ns, estado.st_size
+            self.aciertos += 1
+            return [PluginSpec(**d) for d in previo["specs"]]
+
+        self.fallos += 1
+        specs = calcular()
+        entradas[nombre] = {"mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size,
+                            "sha256": huella, "specs": [asdict(s) for s in specs]}
+        return specs
+
+    def guardar(self):
+        # Los archivos borrados desaparecen de la caché
+        for directorio, vistos in self._vistos.items():
+            entradas = self._paquetes.get(directorio, {})
+            for nombre in set(entradas) - vistos:
+                del entradas[nombre]
+        # Un solo archivo guarda todos los directorios de plugins: quien
+        # escribe último pisa lo que otro proceso descubrió en paralelo, y ese
+        # directorio simplemente se vuelve a analizar con AST la próxima vez.
+        try:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            temporal = f"{self.ruta}.{os.getpid()}.tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"version": VERSION_CACHE_PLUGINS, "analizador": version_analizador(),
+                           "paquetes": self._paquetes}, f)
+            os.replace(temporal, self.ruta)
+        except OSError:
+            pass
+
+# --- Ejecución Concurrente ---
+# run() en serie: un plugin lento frena a todos y uno colgado bloquea para
+# siempre. Con hilos (plugins de I/O) o procesos (CPU, o cancelación real)
+# cada plugin corre con su propio timeout, y los errores se recolectan sin
+# abortar el lote.
+
+@dataclass
+class ResultadoPlugin:
+    nombre: str
+    estado: str                # "ok" | "error" | "timeout"
+    resultado: Any = None
+    error: Optional[str] = None
+    pared: float = 0.0         # Segundos de reloj
+    cpu: float = 0.0           # Segundos de CPU del hilo/proceso
+
+def _ejecutar_medido(plugin, reloj_cpu):
+    """Corre plugin.run() midiendo pared y CPU. Nunca lanza."""
+    inicio, cpu_inicio = time.perf_counter(), reloj_cpu()
+    try:
+        resultado = plugin.run()
+        estado, error = "ok", None
+    except Exception as e:
+        resultado, estado, error = None, "error", f"{type(e).__name__}: {e}"
+    return ResultadoPlugin(plugin.name, estado, resultado, error,
+                           time.perf_counter() - inicio, reloj_cpu() - cpu_inicio)
+
+def _ejecutar_en_hilos(plugins, max_workers, timeout):
+    """
+    Pool de hilos DEMONIO: un plugin colgado ocupa su hilo, pero no impide
+    que el resto avance ni que el intérprete termine (un hilo no se puede
+    matar; para cancelación real, usar procesos). Al expirar un plugin se
+    lanza un hilo de reemplazo, y el hilo colgado, si algún día vuelve, sale
+    sin tomar más trabajo: nunca hay más de `max_workers` hilos útiles.
+    """
+    pendientes = queue.SimpleQueue()
+    for i in range(len(plugins)):
+        pendientes.put(i)
+    inicios, resultados = {}, {}
+    condicion = threading.Condition()
+
+    def trabajador():
+        while True:
+            try:
+                i = pendientes.get_nowait()
+            except queue.Empty:
+                return
+            with condicion:
+                inicios[i] = time.perf_counter()
+            resultado = _ejecutar_medido(plugins[i], time.thread_time)
+            with condicion:
+                if i in resultados:            # Ya expiró: su reemplazo sigue
+                    return
+                resultados[i] = resultado
+                condicion.notify()
+
+    def lanzar():
+        threading.Thread(target=trabajador, daemon=True).start()
+
+    for _ in range(min(max_workers, len(plugins))):
+        lanzar()
+
+    with condicion:
+        while len(resultados) < len(plugins):
+            ahora = time.perf_counter()
+            espera = None
+            if timeout is not None:
+                for i, inicio in inicios.items():
+                    if i in resultados:
+                        continue
+                    if ahora - inicio >= timeout:
+                        resultados[i] = ResultadoPlugin(plugins[i].name, "timeout", pared=ahora - inicio,
+                                                        error=f"Sin respuesta tras {timeout:g}s")
+                        if not pendientes.empty():
+                            lanzar()
+                    else:
+                        restante = inicio + timeout - ahora
+                        espera = restante if espera is None else min(espera, restante)
+            if len(resultados) < len(plugins):
+                condicion.wait(espera if espera is not None else 0.1)
+    return [resultados[i] for i in range(len(plugins))]
+
+def _proceso_plugin(plugin, conexion):
+    resultado = _ejecutar_medido(plugin, time.process_time)
+    try:
+        conexion.send(resultado)
+    except Exception:  # El resultado no es picklable: mandamos su repr
+        resultado.resultado = repr(resultado.resultado)
+        conexion.send(resultado)
+    conexion.close()
+
+def _ejecutar_en_procesos(plugins, max_workers, timeout):
+    """Un proceso por plugin (hasta max_workers a la vez); al expirar, terminate()."""
+    contexto = multiprocessing.get_context()
+    por_lanzar = list(range(len(plugins)))
+    activos = {}               # conexión -> (i, proceso, inicio)
+    resultados = {}
+    while por_lanzar or activos:
+        while por_lanzar and len(activos) < max_workers:
+            i = por_lanzar.pop(0)
+            receptor, emisor = contexto.Pipe(duplex=False)
+            proceso = contexto.Process(target=_proceso_plugin, args=(plugins[i], emisor), daemon=True)
+            proceso.start()
+            emisor.close()
+            activos[receptor] = (i, proceso, time.perf_counter())
+
+        espera = None
+        if timeout is not None:
+            ahora = time.perf_counter()
+            espera = max(0.0, min(inicio + timeout - ahora for _, _, inicio in activos.values()))
+        for receptor in multiprocessing.connection.wait(list(activos), espera):
+            i, proceso, inicio = activos.pop(receptor)
+            try:
+                resultados[i] = receptor.recv()
+            except EOFError:   # El proceso murió sin responder (segfault, os._exit...)
+                proceso.join()
+                resultados[i] = ResultadoPlugin(plugins[i].name, "error", pared=time.perf_counter() - inicio,
+                                                error=f"El proceso terminó con código {proceso.exitcode}")
+            receptor.close()
+            proceso.join()
+
+        if timeout is not None:
+            ahora = time.perf_counter()
+            for receptor, (i, proceso, inicio) in list(activos.items()):
+                if ahora - inicio >= timeout:
+                    proceso.terminate()
+                    proceso.join()
+                    receptor.close()
+                    del activos[receptor]
+                    resultados[i] = ResultadoPlugin(plugins[i].name, "timeout", pared=ahora - inicio,
+                                                    error=f"Cancelado tras {timeout:g}s")
+    return [resultados[i] for i in range(len(plugins))]
+
+def imprimir_resumen(resultados, pared_total):
+    iconos = {"ok": "✅", "error": "❌", "timeout": "⏱"}
+    print(f"\n📊 {'Plugin':<24}{'Estado':<10}{'Pared':>10}{'CPU':>10}  Detalle")
+    for r in resultados:
+        detalle = r.error if r.error else ("" if r.resultado is None else repr(r.resultado))
+        print(f"{iconos[r.estado]} {r.nombre:<24}{r.estado:<10}{r.pared * 1e3:>8.1f}ms{r.cpu * 1e3:>8.1f}ms  {detalle[:50]}")
+    suma = sum(r.pared for r in resultados)
+    print(f"Total: {pared_total:.2f}s de reloj para {suma:.2f}s de trabajo "
+          f"({sum(r.estado == 'ok' for r in resultados)}/{len(resultados)} OK)")
+
+# --- Trabajadores Persistentes (aislamiento por proceso) ---
+# Un plugin de CPU retiene el GIL y frena a los demás; un proceso NUEVO por
+# llamada paga el arranque cada vez. Aquí cada plugin (o grupo) vive en un
+# proceso de larga vida que se reutiliza entre run_all(), con:
+#   - IPC por Pipe con pickle protocolo 5. Un bytearray común se copia
+#     DENTRO del pickle; solo los PickleBuffer (y arrays NumPy) salen fuera
+#     de banda. _fuera_de_banda envuelve los bytearray grandes del resultado
+#     en PickleBuffer y _recibir los lee directo a bytearrays nuevos con
+#     recv_bytes_into: el host obtiene un bytearray escribible sin que los
+#     datos pasen por el cuerpo del pickle.
+#   - Health check (ping) y respawn automático si el proceso muere o se cuelga.
+
+_MIN_FUERA_DE_BANDA = 64 * 1024   # Bytes: por debajo, copiar es más barato que un mensaje extra
+
+def _fuera_de_banda(obj):
+    """Copia de `obj` (dict/list/tuple anidados) con los bytearray grandes como PickleBuffer."""
+    if type(obj) is bytearray:
+        return pickle.PickleBuffer(obj) if len(obj) >= _MIN_FUERA_DE_BANDA else obj
+    if type(obj) is dict:
+        return {k: _fuera_de_banda(v) for k, v in obj.items()}
+    if type(obj) in (list, tuple):
+        return type(obj)(_fuera_de_banda(v) for v in obj)
+    return obj
+
+def _enviar(conexion, objeto):
+    buffers = []
+    cuerpo = pickle.dumps(objeto, protocol=5, buffer_callback=buffers.append)
+    vistas = [b.raw() for b in buffers]
+    conexion.send_bytes(struct.pack(f"<I{len(vistas)}Q", len(vistas), *(v.nbytes for v in vistas)))
+    conexion.send_bytes(cuerpo)
+    for vista in vistas:
+        conexion.send_bytes(vista)
+
+def _recibir(conexion):
+    cabecera = conexion.recv_bytes()
+    (n_buffers,) = struct.unpack_from("<I", cabecera)
+    tamanos = struct.unpack_from(f"<{n_buffers}Q", cabecera, 4)
+    cuerpo = conexion.recv_bytes()
+    buffers = []
+    for tam in tamanos:
+        buffer = bytearray(tam)
+        if tam:
+            conexion.recv_bytes_into(buffer)
+        else:
+            conexion.recv_bytes()
+        buffers.append(buffer)
+    return pickle.loads(cuerpo, buffers=buffers)
+
+def _spec_de(plugin):
+    """PluginSpec de un proxy o de una instancia cargada con estrategia 'importar'."""
+    if isinstance(plugin, PluginPerezoso):
+        return plugin.spec
+    cls = type(plugin)
+    return PluginSpec(plugin.name, cls.__module__, cls.__qualname__, metadatos={"depends": cls.depends})
+
+def _bucle_trabajador(conexion, specs):
+    """
+    Proceso hijo: instancia sus plugins UNA vez y atiende órdenes hasta 'salir'.
+    `specs` llega en orden topológico y con sus dependencias incluidas
+    (ver PoolTrabajadores), así que setup() ve siempre dependencias listas.
+    """
+    plugins, errores = {}, {}
+    for spec in specs:
+        try:
+            plugin = getattr(importlib.import_module(spec.modulo), spec.clase)()
+        except Exception as e:
+            errores[spec.nombre] = f"{type(e).__name__}: {e}"
+            continue
+        faltante = next((d for d in type(plugin).depends if d not in plugins), None)
+        if faltante is not None:
+            motivo = "falló" if faltante in errores else "no está en este proceso"
+            errores[spec.nombre] = f"omitido: depende de '{faltante}', que {motivo}"
+            continue
+        try:
+            plugin.setup({d: plugins[d] for d in type(plugin).depends})
+        except Exception as e:
+            errores[spec.nombre] = f"{type(e).__name__}: {e}"
+            continue
+        plugins[spec.nombre] = plugin
+    while True:
+        try:
+            orden, *argumentos = _recibir(conexion)
+        except (EOFError, OSError):
+            return  # El host cerró el pipe
+        if orden == "ping":
+            _enviar(conexion, ("pong", os.getpid()))
+        elif orden == "salir":
+            return
+        elif orden == "run":
+            nombre = argumentos[0]
+            if nombre in errores:
+                resultado = ResultadoPlugin(nombre, "error", error=errores[nombre])
+            else:
+                resultado = _ejecutar_medido(plugins[nombre], time.process_time)
+                resultado.resultado = _fuera_de_banda(resultado.resultado)
+            try:
+                _enviar(conexion, resultado)
+            except Exception:  # El resultado no es picklable: mandamos su repr
+                resultado.resultado = repr(resultado.resultado)
+                _enviar(conexion, resultado)
+
+class TrabajadorPlugins:
+    """Un proceso de larga vida que hospeda uno o más plugins."""
+
+    def __init__(self, specs, contexto=None):
+        self.specs = list(specs)
+        self.nombres = [s.nombre for s in self.specs]
+        self.contexto = contexto or multiprocessing.get_context()
+        self.reinicios = 0
+        self.proceso = self.conexion = None
+        self._iniciar()
+
+    def _iniciar(self):
+        conexion, extremo_hijo = self.contexto.Pipe()
+        self.proceso = self.contexto.Process(target=_bucle_trabajador, args=(extremo_hijo, self.specs),
+                                             name=f"plugins[{', '.join(self.nombres)}]", daemon=True)
+        self.proceso.start()
+        extremo_hijo.close()
+        self.conexion = conexion
+
+    def _detener(self, timeout=1.0):
+        try:
+            _enviar(self.conexion, ("salir",))
+        except (OSError, ValueError):
+            pass
+        self.proceso.join(timeout)
+        if self.proceso.is_alive():
+            self.proceso.terminate()
+            self.proceso.join()
+        self.conexion.close()
+
+    def reiniciar(self):
+        self._detener(timeout=0)
+        self._iniciar()
+        self.reinicios += 1
+
+    def vivo(self, timeout=1.0):
+        """Health check: el proceso existe Y responde a un ping a tiempo."""
+        if not self.proceso.is_alive():
+            return False
+        try:
+            _enviar(self.conexion, ("ping",))
+            return self.conexion.poll(timeout) and _recibir(self.conexion)[0] == "pong"
+        except (EOFError, OSError):
+            return False
+
+    def cerrar(self):
+        self._detener()
+
+class PoolTrabajadores:
+    """
+    Reparte los plugins entre trabajadores persistentes.
+    agrupar=None: un proceso por componente de dependencias; agrupar=k: a lo
+    sumo k procesos (componentes más grandes primero, al menos cargado).
+
+    Un plugin y todo lo que depende de él (directa o indirectamente) van al
+    mismo proceso: setup() recibe objetos vivos, que no cruzan procesos.
+    `dependencias`: {nombre: (deps...)}; por defecto, el `depends` de los specs.
+    ValueError si hay ciclos o dependencias que no están entre los specs.
+    """
+
+    def __init__(self, specs, agrupar=None, dependencias=None):
+        specs = list(specs)
+        if dependencias is None:
+            dependencias = {s.nombre: tuple(s.metadatos.get("depends", ())) for s in specs}
+        orden = [n for oleada in ordenar_en_oleadas(dependencias) for n in oleada]
+        posicion = {n: i for i, n in enumerate(orden)}
+
+        # Componentes conexos (union-find sobre las aristas de dependencia)
+        raiz = {s.nombre: s.nombre for s in specs}
+        def buscar(n):
+            while raiz[n] != n:
+                raiz[n] = raiz[raiz[n]]
+                n = raiz[n]
+            return n
+        for nombre, deps in dependencias.items():
+            for d in deps:
+                raiz[buscar(nombre)] = buscar(d)
+        componentes = {}
+        for spec in specs:
+            componentes.setdefault(buscar(spec.nombre), []).append(spec)
+        componentes = sorted(componentes.values(), key=len, reverse=True)
+
+        n = len(componentes) if agrupar is None else max(1, min(agrupar, len(componentes)))
+        grupos = [[] for _ in range(n)]
+        for componente in componentes:
+            min(grupos, key=len).extend(componente)
+        self.trabajadores = [TrabajadorPlugins(sorted(g, key=lambda s: posicion[s.nombre]))
+                             for g in grupos if g]
+        self._de = {nombre: t for t in self.trabajadores for nombre in t.nombres}
+
+    def verificar(self, timeout=1.0):
+        """Hace ping a todos y reinicia los que no responden. Devuelve los reiniciados."""
+        reiniciados = []
+        for t in self.trabajadores:
+            if not t.vivo(timeout):
+                t.reiniciar()
+                reiniciados.append(t.proceso.name)
+        return reiniciados
+
+    def ejecutar(self, nombres, timeout=None):
+        """
+        Ejecuta los plugins indicados: en paralelo entre trabajadores, en serie
+        dentro de cada uno. Un solo hilo multiplexa los pipes con wait().
+        Si un plugin excede el timeout o su proceso muere, el trabajador se
+        reinicia y su cola sigue con los plugins restantes.
+        """
+        colas = {t: [] for t in self.trabajadores}
+        for nombre in nombres:
+            colas[self._de[nombre]].append(nombre)
+        en_curso = {}          # conexión -> (trabajador, nombre, inicio)
+        resultados = {}
+
+        def despachar(t):
+            while colas[t]:
+                nombre = colas[t].pop(0)
+                try:
+                    _enviar(t.conexion, ("run", nombre))
+                except OSError:  # Murió entre llamadas: respawn y reintento del envío
+                    t.reiniciar()
+                    _enviar(t.conexion, ("run", nombre))
+                en_curso[t.conexion] = (t, nombre, time.perf_counter())
+                return
+
+        for t in self.trabajadores:
+            despachar(t)
+        while en_curso:
+            espera = None
+            if timeout is not None:
+                ahora = time.perf_counter()
+                espera = max(0.0, min(inicio + timeout - ahora for _, _, inicio in en_curso.values()))
+            for conexion in multiprocessing.connection.wait(list(en_curso), espera):
+                t, nombre, inicio = en_curso.pop(conexion)
+                try:
+                    resultados[nombre] = _recibir(conexion)
+                except (EOFError, OSError):
+                    t.proceso.join(0.5)
+                    codigo = t.proceso.exitcode
+                    t.reiniciar()
+                    resultados[nombre] = ResultadoPlugin(nombre, "error", pared=time.perf_counter() - inicio,
+                                                         error=f"El trabajador murió (código {codigo}); reiniciado")
+                despachar(t)
+            if timeout is not None:
+                ahora = time.perf_counter()
+                for conexion, (t, nombre, inicio) in list(en_curso.items()):
+                    if ahora - inicio >= timeout:
+                        del en_curso[conexion]
+                        t.reiniciar()
+                        resultados[nombre] = ResultadoPlugin(nombre, "timeout", pared=ahora - inicio,
+                                                             error=f"Cancelado tras {timeout:g}s; trabajador reiniciado")
+                        despachar(t)
+        return resultados
+
+    def cerrar(self):
+        for t in self.trabajadores:
+            t.cerrar()
+
+# --- Inicialización por Dependencias ---
+# Un plugin declara `depends = ("Otro Plugin", ...)`. Con eso armamos un DAG:
+#   - ciclos y dependencias faltantes se detectan ANTES de inicializar nada,
+#   - cada "oleada" contiene los plugins cuyas dependencias ya están listas
+#     y se inicializa en paralelo (hilos: cargar modelos, abrir conexiones),
+#   - la ruta crítica (la cadena más lenta) es el mínimo tiempo posible de
+#     arranque: paralelizar más no baja de ahí.
+
+@dataclass
+class ReporteInicio:
+    oleadas: list              # [[nombre, ...], ...] en orden
+    duraciones: dict           # nombre -> segundos de instanciar + setup
+    errores: dict              # nombre -> mensaje (incluye dependientes omitidos)
+    ruta_critica: list         # [nombre, ...] de la raíz al final de la cadena
+    pared: float               # Segundos totales
+
+def _dependencias_de(plugin):
+    if isinstance(plugin, PluginPerezoso) and not plugin.cargado:
+        return tuple(plugin.spec.metadatos.get("depends", ()))
+    instancia = plugin.instancia if isinstance(plugin, PluginPerezoso) else plugin
+    return tuple(type(instancia).depends)
+
+def _buscar_ciclo(grafo, nodos):
+    """Un ciclo (lista de nombres) dentro de `nodos`, con DFS iterativo."""
+    estado = {}                # nombre -> 1 (en la pila) | 2 (terminado)
+    for raiz in nodos:
+        if raiz in estado:
+            continue
+        camino, pila = [], [(raiz, iter(grafo[raiz]))]
+        estado[raiz] = 1
+        camino.append(raiz)
+        while pila:
+            nodo, hijos = pila[-1]
+            for dep in hijos:
+                if dep not in nodos:
+                    continue
+                if estado.get(dep) == 1:
+                    return camino[camino.index(dep):] + [dep]
+                if dep not in estado:
+                    estado[dep] = 1
+                    camino.append(dep)
+                    pila.append((dep, iter(grafo[dep])))
+                    break
+            else:
+                estado[nodo] = 2
+                camino.pop()
+                pila.pop()
+    return []
+
+def ordenar_en_oleadas(grafo):
+    """
+    grafo: {nombre: (dependencias...)}. Devuelve [[nombres], ...] (Kahn por niveles).
+    ValueError si falta una dependencia o hay un ciclo.
+    """
+    faltantes = {f"{n} -> {d}" for n, deps in grafo.items() for d in deps if d not in grafo}
+    if faltantes:
+        raise ValueError(f"Dependencias inexistentes: {', '.join(sorted(faltantes))}")
+    pendientes = {n: len(set(deps)) for n, deps in grafo.items()}
+    dependientes = {n: [] for n in grafo}
+    for n, deps in grafo.items():
+        for d in set(deps):
+            dependientes[d].append(n)
+    oleada = [n for n, k in pendientes.items() if k == 0]
+    oleadas = []
+    while oleada:
+        oleadas.append(oleada)
+        siguiente = []
+        for n in oleada:
+            for hijo in dependientes[n]:
+                pendientes[hijo] -= 1
+                if pendientes[hijo] == 0:
+                    siguiente.append(hijo)
+        oleada = siguiente
+    sin_orden = {n for n in grafo if pendientes[n] > 0}
+    if sin_orden:
+        raise ValueError(f"Ciclo de dependencias: {' -> '.join(_buscar_ciclo(grafo, sin_orden))}")
+    return oleadas
+
+def ruta_critica(grafo, oleadas, duraciones):
+    """Cadena de dependencias con mayor suma de duraciones (el arranque no puede ser más corto)."""
+    fin, previo = {}, {}
+    for oleada in oleadas:
+        for n in oleada:
+            antes = max(grafo[n], key=lambda d: fin[d], default=None)
+            previo[n] = antes
+            fin[n] = duraciones.get(n, 0.0) + (fin[antes] if antes else 0.0)
+    if not fin:
+        return []
+    n = max(fin, key=fin.get)
+    ruta = []
+    while n is not None:
+        ruta.append(n)
+        n = previo[n]
+    return ruta[::-1]
+
+def imprimir_inicio(reporte):
+    print(f"\n🧩 Inicialización en {len(reporte.oleadas)} oleadas ({reporte.pared * 1e3:.0f}ms):")
+    for i, oleada in enumerate(reporte.oleadas, 1):
+        partes = []
+        for n in oleada:
+            if n in reporte.errores:
+                partes.append(f"❌ {n}")
+            else:
+                partes.append(f"{n} ({reporte.duraciones.get(n, 0.0) * 1e3:.0f}ms)")
+        print(f"  {i}. {', '.join(partes)}")
+    for n, error in reporte.errores.items():
+        print(f"  ⚠️ {n}: {error}")
+    if reporte.ruta_critica:
+        total = sum(reporte.duraciones.get(n, 0.0) for n in reporte.ruta_critica)
+        print(f"  Ruta crítica ({total * 1e3:.0f}ms): {' -> '.join(reporte.ruta_critica)}")
+    print(f"  En serie habría tomado {sum(reporte.duraciones.values()) * 1e3:.0f}ms")
+
+# --- 3. Sistema de Plugins ---
 class PluginManager:
-    def __init__(self, plugin_package_name):
+    def __init__(self, plugin_package_name, usar_cache=True, ruta_cache=None):
         self.package_name = plugin_package_name
         self.plugins = []
+        self.specs = {}        # nombre -> PluginSpec (descubrimiento estático)
+        self.usar_cache = usar_cache
+        self.ruta_cache = ruta_cache
+        self._archivos = {}    # archivo -> (modulo, mtime_ns, tamaño) para la recarga
+        self._directorios = set()
+        self._lock = threading.RLock()
+        self._estrategia = None
+        self._pool = None       # PoolTrabajadores del modo "aislado" (se reutiliza)
+        self.agrupar = None
+
+    def discover_plugins(self, estrategia="auto"):
+        """
+        Escanea la carpeta del paquete buscando módulos que cumplan la interfaz.
 
-    def discover_plugins(self):
-        """Escanea la carpeta del paquete buscando módulos que cumplan la interfaz."""
-        print(f"🔍 Buscando plugins en '{self.package_name}'...")
+        estrategia:
+            "auto"       manifiesto si existe, si no AST (no importa nada)
+            "manifiesto" solo plugins.json
+            "ast"        solo análisis estático de los módulos
+            "importar"   importa e instancia todo al arrancar (comportamiento clásico)
+        """
+        print(f"🔍 Buscando plugins en '{self.package_name}' ({estrategia})...")
+        self._estrategia = estrategia
         
         # Debemos asegurar que el CWD está en el path
-        sys.path.append(os.getcwd())
+        if os.getcwd() not in sys.path:
+            sys.path.append(os.getcwd())
         
         try:
-            # Importar el paquete contenedor (debe existir la carpeta/__init__.py)
-            package = importlib.import_module(self.package_name)
-            
-            # Iterar sobre sus contenidos
-            for _, name, is_pkg in pkgutil.iter_modules(package.__path__):
-                full_name = f"{self.package_name}.{name}"
-                self._load_plugin(full_name)
+            if estrategia == "importar":
+                # Importar el paquete contenedor (debe existir la carpeta/__init__.py)
+                package = importlib.import_module(self.package_name)
+                
+                # Iterar sobre sus contenidos
+                for _, name, is_pkg in pkgutil.iter_modules(package.__path__):
+                    full_name = f"{self.package_name}.{name}"
+                    self._load_plugin(full_name)
+                return
+
+            # find_spec ubica el paquete sin ejecutar su __init__.py
+            spec = importlib.util.find_spec(self.package_name)
+            if spec is None or not spec.submodule_search_locations:
+                raise ImportError(f"No module named '{self.package_name}'")
+            cache = CacheDescubrimiento(self.ruta_cache) if self.usar_cache else None
+            for spec_plugin in self._descubrir_estatico(list(spec.submodule_search_locations), estrategia, cache):
+                self._registrar_spec(spec_plugin)
+            if cache is not None:
+                cache.guardar()
+                print(f"💾 Caché: {cache.aciertos} archivos sin cambios, {cache.fallos} analizados")
                 
         except ImportError as e:
             print(f"❌ Error: No se encuentra el paquete de plugins ({e})")
             print("Crea una carpeta 'plugins_repo' con un '__init__.py' vacio para probar.")
 
+    def _descubrir_estatico(self, rutas, estrategia, cache=None):
+        for directorio in rutas:
+            manifiesto = os.path.join(directorio, MANIFIESTO)
+            if estrategia in ("auto", "manifiesto") and os.path.exists(manifiesto):
+                yield from specs_desde_manifiesto(manifiesto, self.package_name)
+                continue
+            if estrategia == "manifiesto":
+                print(f"⚠️ No hay {MANIFIESTO} en {directorio}")
+                continue
+            for info in pkgutil.iter_modules([directorio]):
+                archivo = os.path.join(directorio, info.name + ".py")
+                if info.ispkg or not os.path.exists(archivo):
+                    continue
+                modulo = f"{self.package_name}.{info.name}"
+                try:
+                    if cache is None:
+                        yield from specs_desde_ast(archivo, modulo)
+                    else:
+                        yield from cache.specs(directorio, archivo, lambda: specs_desde_ast(archivo, modulo))
+                except (SyntaxError, ValueError, OSError) as e:
+                    print(f"⚠️ Error analizando {archivo}: {e}")
+
+    def _confirmar_plugin(self, spec):
+        """
+        Importa el módulo de un spec con `base_externa` y dice si la clase es
+        de verdad un plugin concreto; si lo es, completa el spec con lo que el
+        AST no pudo ver (nombre, capacidades y dependencias heredadas).
+        """
+        print(f"⚠️ {spec.modulo}.{spec.clase} hereda de una base que el AST no resuelve: se importa para comprobarlo.")
+        try:
+            clase = getattr(importlib.import_module(spec.modulo), spec.clase)
+        except Exception as e:
+            print(f"⚠️ Error cargando {spec.modulo}: {e}")
+            return False
+        if not (isinstance(clase, type) and issubclass(clase, PluginInterface)) or inspect.isabstract(clase):
+            return False
+        # Copia: el dict de metadatos puede ser el mismo que guarda la caché
+        spec.metadatos = dict(spec.metadatos, capabilities=tuple(clase.capabilities),
+                              depends=tuple(clase.depends))
+        if isinstance(clase.name, str):
+            spec.nombre = clase.name
+        else:
+            spec.metadatos["nombre_dinamico"] = True
+        return True
+
+    def _registrar_spec(self, spec):
+        if spec.metadatos.get("base_externa") and not self._confirmar_plugin(spec):
+            return
+        proxy = PluginPerezoso(spec)
+        if spec.metadatos.get("nombre_dinamico"):
+            # Sin el nombre real el plugin no se puede buscar: se importa ya
+            print(f"⚠️ {spec.modulo}.{spec.clase} calcula `name` en runtime: se carga para conocerlo.")
+            proxy.instancia
+        if spec.nombre in self.specs:
+            print(f"⚠️ Plugin duplicado '{spec.nombre}' en {spec.modulo}: se ignora.")
+            return
+        self.specs[spec.nombre] = spec
+        self.plugins.append(proxy)
+        if spec.archivo:
+            self._seguir_archivo(spec.archivo, spec.modulo)
+        print(f"📄 Descubierto: {spec.nombre} ({spec.modulo}.{spec.clase})")
+
+    def por_capacidad(self, tag):
+        """
+        Plugins con la capacidad `tag`. Para los aún no cargados se usa el
+        metadato estático `capabilities`, así que no se importa nada.
+        """
+        encontrados = []
+        for plugin in self.plugins:
+            if isinstance(plugin, PluginPerezoso) and not plugin.cargado:
+                tags = plugin.spec.metadatos.get("capabilities", ())
+            else:
+                tags = type(plugin.instancia if isinstance(plugin, PluginPerezoso) else plugin).capabilities
+            if tag in tags:
+                encontrados.append(plugin)
+        return encontrados
+
+    def get(self, nombre):
+        """Devuelve el plugin ya instanciado (lo carga si hacía falta)."""
+        for plugin in self.plugins:
+            if plugin.name == nombre:
+                return plugin.instancia if isinstance(plugin, PluginPerezoso) else plugin
+        raise KeyError(nombre)
+
     def _load_plugin(self, module_name):
         try:
             module = importlib.import_module(module_name)
-            # Buscar clases que hereden de PluginInterface
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if isinstance(attr, type) and issubclass(attr, PluginInterface) and attr is not PluginInterface:
-                    # Instanciar y registrar
-                    instance = attr()
-                    self.plugins.append(instance)
-                    print(f"✅ Cargado: {instance.name}")
+            if getattr(module, "__file__", None):
+                self._seguir_archivo(module.__file__, module_name)
+            # Las clases se registraron solas al importarse: nada de dir()/getattr
+            for plugin_cls in PluginInterface.del_modulo(module_name):
+                # Instanciar y registrar
+                instance = plugin_cls()
+                self.plugins.append(instance)
+                print(f"✅ Cargado: {instance.name}")
         except Exception as e:
             print(f"⚠️ Error cargando {module_name}: {e}")
 
-    def run_all(self):
-        print(f"\n🚀 Ejecutando {len(self.plugins)} plugins...")
+    # --- Recarga en caliente ---
+    def _modulo_de(self, plugin):
+        return plugin.spec.modulo if isinstance(plugin, PluginPerezoso) else type(plugin).__module__
+
+    def _seguir_archivo(self, archivo, modulo):
+        """Registra el mtime/tamaño actual de un módulo para detectar cambios."""
+        try:
+            estado = os.stat(archivo)
+        except OSError:
+            return
+        self._archivos[archivo] = (modulo, estado.st_mtime_ns, estado.st_size)
+        self._directorios.add(os.path.dirname(archivo))
+
+    def _archivos_cambiados(self):
+        """(archivo, modulo) nuevos, modificados o borrados desde la última revisión."""
+        cambios = []
+        actuales = set()
+        for directorio in self._directorios:
+            try:
+                entradas = list(os.scandir(directorio))
+            except OSError:
+                continue
+            for entrada in entradas:
+                if not entrada.name.endswith(".py") or entrada.name == "__init__.py":
+                    continue
+                actuales.add(entrada.path)
+                estado = entrada.stat()
+                previo = self._archivos.get(entrada.path)
+                if previo is None:
+                    cambios.append((entrada.path, f"{self.package_name}.{entrada.name[:-3]}"))
+                elif previo[1:] != (estado.st_mtime_ns, estado.st_size):
+                    cambios.append((entrada.path, previo[0]))
+        for archivo in set(self._archivos) - actuales:
+            cambios.append((archivo, self._archivos[archivo][0]))
+        return cambios
+
+    def recargar_cambios(self):
+        """
+        Recarga SOLO los módulos de plugins que cambiaron en disco.
+        Sus plugins se reemplazan en la misma posición de self.plugins; el
+        resto de instancias (y sus cachés en memoria) no se tocan.
+        Devuelve un reporte por módulo: {modulo, segundos, plugins, error}.
+        """
+        reportes = []
+        for archivo, modulo in self._archivos_cambiados():
+            inicio = time.perf_counter()
+            reporte = {"modulo": modulo, "plugins": [], "error": None}
+            try:
+                with self._lock:
+                    reporte["plugins"] = self._recargar_modulo(archivo, modulo)
+            except Exception as e:  # SyntaxError, error al importar...: nos quedamos con lo viejo
+                reporte["error"] = f"{type(e).__name__}: {e}"
+            if os.path.exists(archivo):
+                self._seguir_archivo(archivo, modulo)  # Aun con error: no reintentar hasta otro cambio
+            else:
+                self._archivos.pop(archivo, None)
+            reporte["segundos"] = time.perf_counter() - inicio
+            if reporte["error"]:
+                print(f"⚠️ No se pudo recargar {modulo}: {reporte['error']} (se mantiene la versión anterior)")
+            else:
+                print(f"🔁 Recargado {modulo} en {reporte['segundos'] * 1e3:.1f}ms: "
+                      f"{', '.join(reporte['plugins']) or '(sin plugins)'}")
+            reportes.append(reporte)
+        if reportes and self._pool is not None:
+            self.cerrar_trabajadores()  # Código viejo en los procesos: se recrean al próximo run_all
+        return reportes
+
+    def _recargar_modulo(self, archivo, modulo):
+        viejos = [p for p in self.plugins if self._modulo_de(p) == modulo]
+        cargados = {p.name for p in viejos if not isinstance(p, PluginPerezoso) or p.cargado}
+
+        # 1. Qué plugins define ahora el archivo (el manifiesto manda si existe)
+        if not os.path.exists(archivo):
+            specs = []
+        elif os.path.exists(os.path.join(os.path.dirname(archivo), MANIFIESTO)):
+            specs = [p.spec for p in viejos if isinstance(p, PluginPerezoso)]
+        else:
+            specs = specs_desde_ast(archivo, modulo)
+
+        # 2. Re-ejecutar el módulo solo si ya estaba importado
+        if modulo in sys.modules:
+            PluginInterface._olvidar_modulo(modulo)  # Nombres viejos fuera del registro
+            if specs:
+                importlib.reload(sys.modules[modulo])
+            else:
+                del sys.modules[modulo]
+
+        # 3. Nuevas instancias para lo que ya estaba cargado (el resto sigue perezoso)
+        specs = [s for s in specs if not s.metadatos.get("base_externa") or self._confirmar_plugin(s)]
+        nuevos = []
+        for spec in specs:
+            proxy = PluginPerezoso(spec)
+            if self._estrategia == "importar":
+                nuevos.append(proxy.instancia)
+            else:
+                if spec.nombre in cargados or spec.metadatos.get("nombre_dinamico"):
+                    proxy.instancia
+                nuevos.append(proxy)
+
+        # 4. Validar las dependencias ANTES de tocar nada (un ciclo nuevo aborta)
+        quedan = [p for p in self.plugins if self._modulo_de(p) != modulo] + nuevos
+        ordenar_en_oleadas({p.name: _dependencias_de(p) for p in quedan})
+
+        # 5. Intercambio en el lugar que ocupaban los viejos
+        lista = []
+        insertado = False
         for p in self.plugins:
-            print(f"--- {p.name} ---")
-            p.run()
+            if self._modulo_de(p) == modulo:
+                if not insertado:
+                    lista.extend(nuevos)
+                    insertado = True
+            else:
+                lista.append(p)
+        if not insertado:
+            lista.extend(nuevos)
+        self.plugins[:] = lista
+        for p in viejos:
+            self.specs.pop(p.name, None)
+        for spec in specs:
+            self.specs[spec.nombre] = spec
+
+        # 6. Re-inyección: los recargados y quienes dependen de ellos
+        self._reinyectar({spec.nombre for spec in specs} | {p.name for p in viejos})
+        return [spec.nombre for spec in specs]
+
+    def _reinyectar(self, recargados):
+        """
+        Vuelve a llamar setup() en orden topológico para los plugins cargados
+        en `recargados` y todos sus dependientes (directos o no), para que
+        nadie se quede con una instancia vieja. Una dependencia aún perezosa
+        se carga y prepara en el camino; las no afectadas no se tocan.
+        """
+        por_nombre = {p.name: p for p in self.plugins}
+        grafo = {n: _dependencias_de(p) for n, p in por_nombre.items()}
+        dependientes = {n: [] for n in grafo}
+        for n, deps in grafo.items():
+            for d in deps:
+                dependientes[d].append(n)
+        afectados, pila = set(), [n for n in recargados if n in grafo]
+        while pila:
+            n = pila.pop()
+            if n not in afectados:
+                afectados.add(n)
+                pila.extend(dependientes[n])
+
+        def cargado(n):
+            p = por_nombre[n]
+            return not isinstance(p, PluginPerezoso) or p.cargado
+
+        listos = {}
+        def preparar(n):
+            if n not in listos:
+                p = por_nombre[n]
+                instancia = p.instancia if isinstance(p, PluginPerezoso) else p
+                if n in afectados or not hasattr(instancia, "dependencias"):
+                    instancia.setup({d: preparar(d) for d in grafo[n]})
+                listos[n] = instancia
+            return listos[n]
+
+        for oleada in ordenar_en_oleadas(grafo):
+            for n in oleada:
+                if n in afectados and cargado(n):
+                    try:
+                        preparar(n)
+                    except Exception as e:
+                        print(f"⚠️ setup() de {n} falló tras la recarga: {type(e).__name__}: {e}")
+
+    def vigilar(self, intervalo=1.0):
+        """
+        Revisa los mtimes cada `intervalo` segundos en un hilo demonio.
+        Devuelve un threading.Event: .set() detiene la vigilancia.
+        """
+        detener = threading.Event()
+
+        def bucle():
+            while not detener.wait(intervalo):
+                self.recargar_cambios()
+
+        threading.Thread(target=bucle, name="vigilante-plugins", daemon=True).start()
+        return detener
+
+    # --- Inicialización ordenada ---
+    def inicializar(self, max_workers=None):
+        """
+        Instancia y hace setup() de todos los plugins respetando `depends`:
+        oleadas topológicas, cada una en paralelo con hilos. Si un plugin
+        falla, sus dependientes (directos o no) se omiten.
+        ValueError si hay ciclos o dependencias inexistentes (antes de empezar).
+        """
+        with self._lock:
+            por_nombre = {p.name: p for p in self.plugins}
+        grafo = {n: _dependencias_de(p) for n, p in por_nombre.items()}
+        oleadas = ordenar_en_oleadas(grafo)
+
+        duraciones, errores, listos = {}, {}, {}
+
+        def iniciar(nombre):
+            plugin = por_nombre[nombre]
+            inicio = time.perf_counter()
+            instancia = plugin.instancia if isinstance(plugin, PluginPerezoso) else plugin
+            instancia.setup({d: listos[d] for d in grafo[nombre]})
+            return instancia, time.perf_counter() - inicio
+
+        inicio_total = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers or min(32, len(por_nombre) or 1)) as pool:
+            for oleada in oleadas:
+                futuros = {}
+                for nombre in oleada:
+                    caida = next((d for d in grafo[nombre] if d in errores), None)
+                    if caida:
+                        errores[nombre] = f"omitido: depende de '{caida}', que falló"
+                    else:
+                        futuros[nombre] = pool.submit(iniciar, nombre)
+                for nombre, futuro in futuros.items():
+                    try:
+                        listos[nombre], duraciones[nombre] = futuro.result()
+                    except Exception as e:
+                        errores[nombre] = f"{type(e).__name__}: {e}"
+
+        reporte = ReporteInicio(oleadas, duraciones, errores,
+                                ruta_critica(grafo, oleadas, duraciones), time.perf_counter() - inicio_total)
+        imprimir_inicio(reporte)
+        return reporte
+
+    # --- Aislamiento en procesos persistentes ---
+    def aislar(self, agrupar=None):
+        """
+        Arranca (o rearranca) los trabajadores: None = uno por grupo de plugins
+        dependientes entre sí, k = a lo sumo k procesos. ValueError si las
+        dependencias tienen ciclos o nombres inexistentes.
+        """
+        self.cerrar_trabajadores()
+        self.agrupar = agrupar
+        with self._lock:
+            specs = [_spec_de(p) for p in self.plugins]
+            dependencias = {p.name: _dependencias_de(p) for p in self.plugins}
+        inicio = time.perf_counter()
+        self._pool = PoolTrabajadores(specs, agrupar, dependencias)
+        print(f"🧱 {len(self._pool.trabajadores)} trabajadores para {len(specs)} plugins "
+              f"({(time.perf_counter() - inicio) * 1e3:.0f}ms)")
+        return self._pool
 
-# --- 3. Simulación (Creación de plugins falsos en memoria/disco) ---
+    def cerrar_trabajadores(self):
+        if self._pool is not None:
+            self._pool.cerrar()
+            self._pool = None
+
+    def run_all(self, modo="secuencial", max_workers=None, timeout=None):
+        """
+        Ejecuta todos los plugins y devuelve un ResultadoPlugin por cada uno.
+
+        modo: "secuencial" | "hilos" (I/O) | "procesos" (CPU, cancelación real)
+              | "aislado" (trabajadores persistentes, ver aislar()).
+        timeout: segundos por plugin, contados desde que empieza a correr.
+        Una excepción en un plugin queda en su resultado: el lote sigue.
+        """
+        with self._lock:
+            plugins = list(self.plugins)  # Una recarga en caliente no altera este lote
+        print(f"\n🚀 Ejecutando {len(plugins)} plugins ({modo})...")
+        agrupar = max_workers  # En modo "aislado": procesos persistentes (None = uno por componente de dependencias)
+        max_workers = max_workers or min(32, len(plugins) or 1)
+        inicio = time.perf_counter()
+        if modo == "secuencial":
+            if timeout is not None:
+                raise ValueError("timeout requiere modo 'hilos' o 'procesos'.")
+            resultados = []
+            for p in plugins:
+                print(f"--- {p.name} ---")
+                resultados.append(_ejecutar_medido(p, time.thread_time))
+        elif modo == "hilos":
+            resultados = _ejecutar_en_hilos(plugins, max_workers, timeout)
+        elif modo == "procesos":
+            resultados = _ejecutar_en_procesos(plugins, max_workers, timeout)
+        elif modo == "aislado":
+            if self._pool is None or (agrupar is not None and agrupar != self.agrupar):
+                self.aislar(agrupar)
+            reiniciados = self._pool.verificar()
+            if reiniciados:
+                print(f"🩺 Trabajadores reiniciados: {', '.join(reiniciados)}")
+            por_nombre = self._pool.ejecutar([p.name for p in plugins], timeout)
+            resultados = [por_nombre[p.name] for p in plugins]
+        else:
+            raise ValueError(f"Modo desconocido: {modo!r}")
+        imprimir_resumen(resultados, time.perf_counter() - inicio)
+        return resultados
+
+# --- 4. Simulación (Creación de plugins falsos en memoria/disco) ---
 # Para que este script funcione "Out of the Box", crearemos la estructura temporalmente
 
 def setup_demo_env():
@@ -105,12 +1411,133 @@ class CalcPlugin(PluginInterface):
         print(f"2 + 2 = {2+2}")
 ''')
 
-def main():
+    # Plugin 3: I/O lento (red simulada) que devuelve un resultado
+    with open("plugins_repo/red.py", "w") as f:
+        f.write('''
+import time
+from __main__ import PluginInterface
+class RedPlugin(PluginInterface, capabilities=("io", "red")):
+    name = "Network Plugin"
+    def __init__(self):
+        time.sleep(0.3)  # Abrir la conexión
+    def run(self):
+        time.sleep(0.5)
+        return {"status": 200}
+''')
+
+    # Plugin 4 y 5: Un modelo lento de cargar que necesita la red, y un
+    # reporte que necesita el modelo y la calculadora
+    with open("plugins_repo/modelo.py", "w") as f:
+        f.write('''
+import time
+from __main__ import PluginInterface
+class ModeloPlugin(PluginInterface, depends=("Network Plugin",)):
+    name = "Model Plugin"
+    def __init__(self):
+        time.sleep(0.4)  # Cargar pesos
+    def run(self):
+        return "modelo listo"
+
+class ReportePlugin(PluginInterface, depends=("Model Plugin", "Math Plugin")):
+    name = "Report Plugin"
+    def run(self):
+        return f"reporte con {sorted(self.dependencias)}"
+''')
+
+    # Plugin 6: Falla siempre
+    with open("plugins_repo/roto.py", "w") as f:
+        f.write('''
+from __main__ import PluginInterface
+class RotoPlugin(PluginInterface):
+    name = "Broken Plugin"
+    def run(self):
+        raise RuntimeError("configuración inválida")
+''')
+
+    # Plugin 7 y 8: CPU pura (criba de primos). Con hilos se estorban por el GIL;
+    # aislados en procesos corren en paralelo. Devuelven un bytearray grande
+    # que _enviar manda fuera de banda (PickleBuffer, pickle protocolo 5).
+    with open("plugins_repo/primos.py", "w") as f:
+        f.write('''
+from __main__ import PluginInterface
+
+def criba(n):
+    es_primo = bytearray([1]) * (n + 1)
+    es_primo[0:2] = b"\\x00\\x00"
+    for i in range(2, int(n ** 0.5) + 1):
+        if es_primo[i]:
+            es_primo[i * i::i] = bytes(len(range(i * i, n + 1, i)))
+    return es_primo
+
+def gemelos(n):
+    es_primo = criba(n)
+    pares = sum(1 for i in range(n - 1) if es_primo[i] and es_primo[i + 2])  # Bucle Python: CPU
+    return {"pares_gemelos": pares, "criba": es_primo}
+
+class PrimosBajos(PluginInterface):
+    capabilities = ("cpu",)
+    name = "Twin primes < 2M"
+    def run(self):
+        return gemelos(2_000_000)
+
+class PrimosAltos(PluginInterface):
+    capabilities = ("cpu",)
+    name = "Twin primes < 3M"
+    def run(self):
+        return gemelos(3_000_000)
+''')
+
+    # Plugin 9: Se cuelga (más que el timeout de la demo)
+    with open("plugins_repo/colgado.py", "w") as f:
+        f.write('''
+import time
+from __main__ import PluginInterface
+class ColgadoPlugin(PluginInterface):
+    name = "Hung Plugin"
+    def run(self):
+        time.sleep(3)
+        return "terminé (demasiado tarde)"
+''')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Demo del sistema de plugins.")
+    parser.add_argument("--modo", choices=["secuencial", "hilos", "procesos", "aislado"], default="hilos")
+    parser.add_argument("--timeout", type=float, default=1.5, help="Segundos por plugin (no aplica a 'secuencial').")
+    parser.add_argument("--workers", type=int, help="Plugins en paralelo (por defecto, todos).")
+    args = parser.parse_args(argv)
+
     setup_demo_env()
     
     manager = PluginManager("plugins_repo")
     manager.discover_plugins()
-    manager.run_all()
+    cargados = [m for m in sys.modules if m.startswith("plugins_repo.")]
+    print(f"Módulos de plugins importados tras descubrir: {len(cargados)}")
+    print(f"Plugins de CPU (sin importarlos): {[p.name for p in manager.por_capacidad('cpu')]}")
+    manager.inicializar()
+    manager.run_all(args.modo, args.workers, None if args.modo == "secuencial" else args.timeout)
+    if args.modo == "aislado":
+        print("\n♻️  Segunda ronda: los mismos procesos, sin costo de arranque")
+        manager.run_all(args.modo, args.workers, args.timeout)
+
+    # Recarga en caliente: editamos un plugin "en vivo" y solo ése se recarga
+    print("\n✏️  Editando plugins_repo/calc.py...")
+    with open("plugins_repo/calc.py", "w") as f:
+        f.write('''
+from __main__ import PluginInterface
+class CalcPlugin(PluginInterface):
+    name = "Math Plugin"
+    def run(self):
+        print(f"2 ** 10 = {2**10}  (versión recargada)")
+''')
+    otros = [p for p in manager.plugins if p.name != "Math Plugin"]
+    manager.recargar_cambios()
+    assert all(any(p is q for q in manager.plugins) for p in otros)  # Los demás, intactos
+    manager.get("Math Plugin").run()
+    reporte = manager.get("Report Plugin")
+    assert reporte.dependencias["Math Plugin"] is manager.get("Math Plugin")  # Re-inyectado
+    print(f"Report Plugin tras la recarga: {reporte.run()}")
+    print(f"Registro por capacidad 'io': {[c.__name__ for c in PluginInterface.con_capacidad('io')]}")
+    manager.cerrar_trabajadores()
     
     # Cleanup (Opcional, para no ensuciar)
     # import shutil; shutil.rmtree("plugins_repo")
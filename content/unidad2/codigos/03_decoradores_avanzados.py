@@ -10,26 +10,313 @@ Conceptos:
 1. `functools.wraps`: Preservar metadatos (nombre, docstring).
 2. Decoradores con argumentos (`@route('/home')`).
 3. Decoradores de clases.
+4. Instrumentación siempre encendida: histogramas de latencia por hilo.
 
 Laboratorio:
     Crearemos un decorador `@retry` que reintenta ejecutar una función si falla,
-    y un `@timer` que mide el tiempo de ejecución.
+    y un `@timer` que registra el tiempo de ejecución en un registro de métricas
+    (conteos y p50/p95/p99) con un costo de fracciones de microsegundo.
+
+Uso:
+    python 03_decoradores_avanzados.py
+    python 03_decoradores_avanzados.py --n 1000000      # Llamadas del benchmark
+    python 03_decoradores_avanzados.py --exportar       # Formato de texto
 """
 
 import time
 import functools
 import random
+import threading
+import argparse
+import inspect
+from dataclasses import dataclass
 
 # --- 1. Decorador Simple (Mide tiempo) ---
-def timer(func):
-    """Mide el tiempo de ejecución de una función."""
-    @functools.wraps(func) # Buena práctica: Mantiene el nombre original
-    def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        result = func(*args, **kwargs)
-        end = time.perf_counter()
-        print(f"⏱ [{func.__name__}] tardó {end - start:.4f}s")
-        return result
+# Imprimir una línea por llamada no sirve si la función se llama millones de
+# veces. En su lugar, `@timer` anota cada duración en un histograma y el
+# reporte se pide cuando hace falta (o periódicamente).
+#
+# Histograma tipo HDR: buckets logarítmicos con 16 sub-buckets por potencia
+# de 2 (error relativo <= 1/16 ≈ 6%). El índice sale de `bit_length()`,
+# sin logaritmos ni búsquedas:
+#   ns < 32   -> índice exacto
+#   ns >= 32  -> s = bits - 5;  índice = 16*s + (ns >> s)
+# Para llamadas de menos de 65 µs (las que el sobrecosto puede distorsionar)
+# ni eso: el índice está precalculado en una tabla de 64 KB.
+# Cada hilo escribe en SU propia lista (sin locks en el camino caliente);
+# al leer se suman las listas de todos los hilos. No se guarda la suma
+# exacta: la media sale del punto medio de cada bucket (±3%), y así cada
+# llamada cuesta un incremento de lista en vez de dos.
+
+_SUB_BITS = 4                                  # 16 sub-buckets por octava
+_EXACTOS = 1 << (_SUB_BITS + 1)                # 0..31 ns se guardan exactos
+_N_BUCKETS = (64 - _SUB_BITS) << _SUB_BITS     # Alcanza para cualquier int64
+_RAPIDO = 1 << 16                              # ns con índice en tabla
+_PERCENTILES = (50, 95, 99)
+
+def _indice_bucket(ns):
+    """Referencia legible de la cuenta que `timer` hace en línea."""
+    bits = ns.bit_length()
+    if bits <= _SUB_BITS + 1:
+        return ns
+    s = bits - _SUB_BITS - 1
+    return (s << _SUB_BITS) + (ns >> s)
+
+def _rango_bucket(indice):
+    """[desde, hasta) en ns que cubre un bucket."""
+    if indice < _EXACTOS:
+        return indice, indice + 1
+    s = (indice >> _SUB_BITS) - 1
+    m = indice - (s << _SUB_BITS)
+    return m << s, (m + 1) << s
+
+def _tabla_indices(limite):
+    """bytes con el índice de bucket de cada ns < limite (todos caben en un byte)."""
+    tabla = bytearray(range(_EXACTOS))
+    indice = _EXACTOS
+    while len(tabla) < limite:
+        desde, hasta = _rango_bucket(indice)
+        tabla += bytes([indice]) * (min(hasta, limite) - desde)
+        indice += 1
+    return bytes(tabla)
+
+_TABLA = _tabla_indices(_RAPIDO)
+
+@dataclass
+class ResumenMetrica:
+    nombre: str
+    llamadas: int
+    total_ns: float            # Estimado con el punto medio de cada bucket
+    percentiles: dict          # {50: ns, 95: ns, 99: ns}
+    maximo_ns: int             # Cota superior del bucket más alto
+
+    @property
+    def media_ns(self):
+        return self.total_ns / self.llamadas if self.llamadas else 0.0
+
+class Metrica:
+    """Contador + histograma de latencias de una función, con un buffer por hilo."""
+    __slots__ = ("nombre", "buffers", "local", "_lock")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.buffers = {}                      # ident del hilo -> [conteo por bucket]
+        self.local = threading.local()         # local.h: el buffer del hilo actual
+        self._lock = threading.Lock()          # Crear buffers y reiniciar
+
+    def buffer(self):
+        """Crea (o recupera) el buffer del hilo actual. Se llama una vez por
+        hilo; si un ident se reutiliza tras morir un hilo, se sigue acumulando
+        en la misma lista, así que la memoria no crece con hilos efímeros."""
+        with self._lock:
+            h = self.buffers.setdefault(threading.get_ident(), [0] * _N_BUCKETS)
+            self.local.h = h
+        return h
+
+    def registrar(self, ns):
+        """Anota una duración a mano (lo mismo que hace `timer` en línea)."""
+        try:
+            h = self.local.h
+        except AttributeError:
+            h = self.buffer()
+        h[_indice_bucket(ns)] += 1
+
+    def histograma(self):
+        """Suma de los buffers de todos los hilos (lectura sin bloquear a nadie)."""
+        fusion = [0] * _N_BUCKETS
+        for h in list(self.buffers.values()):
+            for i, n in enumerate(h):
+                if n:
+                    fusion[i] += n
+        return fusion
+
+    def resumen(self, percentiles=_PERCENTILES):
+        h = self.histograma()
+        llamadas = sum(h)
+        valores, maximo, total_ns = {}, 0, 0.0
+        if llamadas:
+            objetivos = sorted(percentiles)
+            acumulado, k = 0, 0
+            for i, n in enumerate(h):
+                if not n:
+                    continue
+                acumulado += n
+                desde, hasta = _rango_bucket(i)
+                total_ns += n * (desde + hasta) / 2
+                while k < len(objetivos) and acumulado * 100 >= objetivos[k] * llamadas:
+                    valores[objetivos[k]] = (desde + hasta) // 2
+                    k += 1
+                maximo = hasta
+        return ResumenMetrica(self.nombre, llamadas, total_ns, valores, maximo)
+
+    def reiniciar(self):
+        """
+        Cambia buffers y `local` por objetos nuevos en vez de poner a cero las
+        listas: un hilo que está en medio de `h[i] += 1` escribiría de vuelta
+        el conteo viejo. Así, en el peor caso, esa única muestra cae en el
+        buffer descartado.
+        """
+        with self._lock:
+            self.buffers = {}
+            self.local = threading.local()
+
+class RegistroMetricas:
+    """Todas las métricas del proceso, por nombre."""
+
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def metrica(self, nombre):
+        with self._lock:
+            if nombre not in self._metricas:
+                self._metricas[nombre] = Metrica(nombre)
+            return self._metricas[nombre]
+
+    def instantanea(self):
+        """{nombre: ResumenMetrica} de las métricas con al menos una llamada."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        resumenes = (m.resumen() for m in metricas)
+        return {r.nombre: r for r in resumenes if r.llamadas}
+
+    def reiniciar(self):
+        with self._lock:
+            for m in self._metricas.values():
+                m.reiniciar()
+
+    def exportar_texto(self):
+        """Formato de exposición de Prometheus: un `summary` con quantiles, _sum y _count."""
+        lineas = ["# HELP latencia_segundos Latencia por llamada de funciones con @timer.",
+                  "# TYPE latencia_segundos summary"]
+        for nombre, r in sorted(self.instantanea().items()):
+            funcion = f'funcion="{_escapar_etiqueta(nombre)}"'
+            for p, ns in r.percentiles.items():
+                lineas.append(f'latencia_segundos{{{funcion},quantile="{p / 100:g}"}} {ns / 1e9:.9f}')
+            lineas.append(f"latencia_segundos_sum{{{funcion}}} {r.total_ns / 1e9:.9f}")
+            lineas.append(f"latencia_segundos_count{{{funcion}}} {r.llamadas}")
+        return "\n".join(lineas)
+
+    def imprimir(self):
+        print(f"📊 {'Función':<22}{'Llamadas':>10}{'Media':>11}" + "".join(f"{'p' + str(p):>11}" for p in _PERCENTILES))
+        for nombre, r in sorted(self.instantanea().items()):
+            cols = "".join(f"{_formato_ns(r.percentiles.get(p, 0)):>11}" for p in _PERCENTILES)
+            print(f"   {nombre:<22}{r.llamadas:>10}{_formato_ns(r.media_ns):>11}{cols}")
+
+def _escapar_etiqueta(valor):
+    """Escapa un valor de etiqueta: \\, comillas y saltos de línea."""
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _formato_ns(ns):
+    for unidad, escala in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= escala:
+            return f"{ns / escala:.2f}{unidad}"
+    return f"{ns:.0f}ns"
+
+REGISTRO = RegistroMetricas()
+
+class ReportadorPeriodico:
+    """Hilo daemon que cada `intervalo` segundos llama `accion(registro)`."""
+
+    def __init__(self, registro=REGISTRO, intervalo=10.0, accion=RegistroMetricas.imprimir):
+        self.registro = registro
+        self.intervalo = intervalo
+        self.accion = accion
+        self._parar = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="reportador-metricas", daemon=True)
+        self._hilo.start()
+        return self
+
+    def _bucle(self):
+        while not self._parar.wait(self.intervalo):
+            self.accion(self.registro)
+
+    def detener(self):
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+# El envoltorio se genera con LA MISMA firma que la función (como los
+# validadores de unidad0/03_type_hints.py): empaquetar *args/**kwargs en
+# cada llamada costaría más que todo el registro en el histograma.
+_PLANTILLA_TIMER = """\
+def {nombre}({firma}):
+    _inicio = _reloj()
+    _resultado = _func({llamada})
+    _ns = _reloj() - _inicio
+    try:
+        _h = _metrica.local.h
+    except AttributeError:
+        _h = _metrica.buffer()
+    if _ns < _RAPIDO:
+        _h[_TABLA[_ns]] += 1
+    else:
+        _s = _ns.bit_length() - _CORRIMIENTO
+        _h[(_s << _SUB_BITS) + (_ns >> _s)] += 1
+    return _resultado
+"""
+
+def _firma_de_paso(func):
+    """
+    (parámetros, llamada) como texto para la plantilla, o None si `func` no es
+    una función de Python. Los parámetros van sin defaults: `timer` copia
+    después `__defaults__` y `__kwdefaults__` de `func` al wrapper.
+    """
+    if not inspect.isfunction(func):
+        return None
+    # follow_wrapped=False: si `func` ya viene envuelta (p. ej. por @retry),
+    # sus defaults reales son los del envoltorio, no los de la original.
+    firma = inspect.signature(func, follow_wrapped=False)
+    parametros, llamada = [], []
+    for p in firma.parameters.values():
+        if p.name.startswith("_"):   # Chocaría con _inicio, _func, _h... de la plantilla
+            return None
+        parametros.append(p.replace(annotation=p.empty, default=p.empty))
+        if p.kind is p.VAR_POSITIONAL:
+            llamada.append(f"*{p.name}")
+        elif p.kind is p.VAR_KEYWORD:
+            llamada.append(f"**{p.name}")
+        elif p.kind is p.KEYWORD_ONLY:
+            llamada.append(f"{p.name}={p.name}")
+        else:
+            llamada.append(p.name)
+    texto = str(firma.replace(parameters=parametros, return_annotation=firma.empty))[1:-1]
+    return texto, ", ".join(llamada)
+
+def timer(func=None, *, nombre=None, registro=REGISTRO):
+    """
+    Mide cada llamada y la anota en `registro` (no imprime nada).
+    Se usa como `@timer` o `@timer(nombre="api.login")`. Como el original,
+    las llamadas que lanzan excepción no se cuentan.
+    """
+    if func is None:
+        return lambda f: timer(f, nombre=nombre, registro=registro)
+
+    metrica = registro.metrica(nombre or func.__qualname__)
+    ns = {"_func": func, "_metrica": metrica, "_reloj": time.perf_counter_ns,
+          "_RAPIDO": _RAPIDO, "_TABLA": _TABLA, "_SUB_BITS": _SUB_BITS, "_CORRIMIENTO": _SUB_BITS + 1}
+    de_paso = _firma_de_paso(func)
+    firma, llamada = de_paso or ("*args, **kwargs", "*args, **kwargs")
+    fuente = _PLANTILLA_TIMER.format(nombre="wrapper", firma=firma, llamada=llamada)
+    exec(compile(fuente, f"<timer {metrica.nombre}>", "exec"), ns)
+
+    wrapper = ns["wrapper"]
+    if de_paso:
+        wrapper.__defaults__ = func.__defaults__
+        wrapper.__kwdefaults__ = dict(func.__kwdefaults__ or {}) or None
+    wrapper = functools.wraps(func)(wrapper) # Buena práctica: Mantiene el nombre original
+    wrapper.metrica = metrica
     return wrapper
 
 # --- 2. Decorador con Argumentos (Retry Logic) ---
@@ -66,19 +353,92 @@ def funcion_pesada(n):
     """Calcula suma de cuadrados."""
     return sum(i*i for i in range(n))
 
-def main():
+@timer
+def operacion_trivial(x):
+    return x + 1
+
+def operacion_cruda(x):
+    return x + 1
+
+@timer(nombre="consulta_bd")
+def consulta_simulada():
+    """Latencia con cola larga: casi siempre rápida, a veces muy lenta."""
+    time.sleep(0.02 if random.random() < 0.05 else 0.001)
+
+def imprimir_metrica(funcion):
+    """Lo que antes imprimía @timer en cada llamada, ahora a pedido."""
+    r = funcion.metrica.resumen()
+    if r.llamadas:
+        print(f"⏱ [{r.nombre}] {r.llamadas} llamada(s), p50 {_formato_ns(r.percentiles[50])}, "
+              f"máx < {_formato_ns(r.maximo_ns)}")
+    else:
+        print(f"⏱ [{r.nombre}] sin llamadas completadas")
+
+def medir_sobrecosto(n):
+    """
+    ns por llamada de: la función sola, un wrapper que solo lee el reloj
+    (el piso de cualquier @timer en Python puro) y `@timer` completo.
+    """
+    reloj = time.perf_counter_ns
+    def solo_reloj(x):
+        inicio = reloj()
+        result = operacion_cruda(x)
+        reloj() - inicio
+        return result
+
+    def bucle(f):
+        inicio = time.perf_counter_ns()
+        for i in range(n):
+            f(i)
+        return (time.perf_counter_ns() - inicio) / n
+    return [min(bucle(f) for _ in range(3)) for f in (operacion_cruda, solo_reloj, operacion_trivial)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decoradores: retry y timer con métricas.")
+    parser.add_argument("--n", type=int, default=300_000, help="Llamadas en el benchmark de sobrecosto.")
+    parser.add_argument("--exportar", action="store_true", help="Imprime las métricas en formato de texto.")
+    args = parser.parse_args(argv)
+
     print("--- Probando Decoradores ---")
     
     print("\n1. Llamando a servicio inestable:")
     res = servicio_inestable()
     print(f"Resultado: {res}")
+    imprimir_metrica(servicio_inestable)
     
     print("\n2. Llamando a función pesada:")
     funcion_pesada(1000000)
+    imprimir_metrica(funcion_pesada)
     
     # Introspección (Gracias a functools.wraps)
     print(f"\nNombre real de la función: {servicio_inestable.__name__}")
     print(f"Docstring: {servicio_inestable.__doc__}")
 
+    print(f"\n3. Sobrecosto de @timer ({args.n:,} llamadas):")
+    crudo, reloj, medido = medir_sobrecosto(args.n)
+    print(f"   Sin decorar: {crudo:.0f} ns | solo reloj: {reloj:.0f} ns | con @timer: {medido:.0f} ns")
+    print(f"   Sobrecosto total: {medido - crudo:.0f} ns/llamada, de los cuales "
+          f"{medido - reloj:.0f} ns son el registro en el histograma "
+          f"({'✅' if medido - crudo < 1000 else '⚠️'} objetivo: < 1 µs)")
+
+    print("\n4. Cuatro hilos consultando, con reporte periódico:")
+    def reportar(registro):
+        r = registro.instantanea().get("consulta_bd")
+        if r:
+            print(f"   ⏲ consulta_bd: {r.llamadas} llamadas, p99 {_formato_ns(r.percentiles[99])}")
+
+    with ReportadorPeriodico(intervalo=0.1, accion=reportar):
+        hilos = [threading.Thread(target=lambda: [consulta_simulada() for _ in range(150)]) for _ in range(4)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+    print("\n5. Resumen final:")
+    if args.exportar:
+        print(REGISTRO.exportar_texto())
+    else:
+        REGISTRO.imprimir()
+
 if __name__ == "__main__":
     main()
@@ -10,17 +10,47 @@ Esto es flexible pero costoso en RAM.
 eliminando el diccionario dinámico.
 
 Conceptos:
-1. `sys.getsizeof`: Medir tamaño en bytes.
-2. `pympler` (simulado): Para medir árboles de objetos.
-3. Diferencias de tiempo de acceso.
+1. `sys.getsizeof`: Medir tamaño en bytes (¡solo el objeto, no lo que referencia!).
+2. `tracemalloc` y RSS: Medir la memoria REAL de N objetos.
+3. Diferencias de tiempo de creación, acceso e iteración.
+4. Layouts alternativos: namedtuple, dataclass(slots=True), tuple,
+   un `array('d')` por campo y un structured array de NumPy.
+5. `PixelBuffer`: struct of arrays con vistas ligeras (flyweight) y
+   operaciones por columna (trasladar, escalar, caja envolvente).
+6. `mmap` + `struct`: Pixeles en un archivo de registros fijos, más grande que la RAM.
 
 Instrucciones:
     python 04_slots_vs_dict.py
+    python 04_slots_vs_dict.py --n 10000 100000        # Tamaños a comparar
+    python 04_slots_vs_dict.py --layouts dict slots array
+    python 04_slots_vs_dict.py --en-proceso            # Sin subprocesos (RSS menos fiable)
+    python 04_slots_vs_dict.py --mmap 5000000          # Almacén en disco vía mmap
 """
 
+import argparse
+import gc
+import json
+import mmap
+import operator
+import os
+import random
+import struct
+import subprocess
 import sys
+import tempfile
 import time
 import timeit
+import tracemalloc
+import weakref
+from array import array
+from collections import namedtuple
+from dataclasses import dataclass
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Clase Estándar (Usa __dict__)
 class PixelDict:
@@ -37,42 +67,681 @@ class PixelSlots:
         self.y = y
         self.z = z
 
-def main():
-    N = 1_000_000 # Un millón de objetos
-    
-    print(f"--- Creando {N} objetos de cada tipo ---")
-    
-    # 1. Medición de Tiempo de Creación
-    start = time.time()
-    lista_dict = [PixelDict(1, 2, 3) for _ in range(N)]
-    t_dict = time.time() - start
-    print(f"Tiempo Clase Normal: {t_dict:.4f} s")
-    
-    start = time.time()
-    lista_slots = [PixelSlots(1, 2, 3) for _ in range(N)]
-    t_slots = time.time() - start
-    print(f"Tiempo Clase Slots:  {t_slots:.4f} s ({(t_dict/t_slots):.1f}x más rápido)")
-    
-    # 2. Medición aproximada de RAM (Solo referencias + objetos básicos)
-    # Nota: sys.getsizeof no mide recursivamente todo, pero sirve de proxy.
-    
-    size_dict_obj = sys.getsizeof(lista_dict[0]) + sys.getsizeof(lista_dict[0].__dict__)
-    size_slots_obj = sys.getsizeof(lista_slots[0])
-    
-    print("\n--- Tamaño por Objeto (Estimado) ---")
+# Alternativas inmutables / generadas
+PixelTupla = namedtuple("PixelTupla", ["x", "y", "z"])
+
+@dataclass(slots=True)
+class PixelDataclass:
+    x: float
+    y: float
+    z: float
+
+# Struct of Arrays: sin objetos por pixel
+# Incluso PixelSlots paga ~56 bytes + 3 floats (24 c/u) por pixel. PixelBuffer
+# guarda cada coordenada en un array('d') contiguo (8 bytes por valor) y solo
+# crea un objeto ligero (flyweight) cuando alguien pide buffer[i].
+
+class VistaPixel:
+    """Vista sobre la fila i de un PixelBuffer. Mismo API que PixelSlots (x, y, z)."""
+    __slots__ = ("_buffer", "_i")
+
+    def __init__(self, buffer, i):
+        self._buffer = buffer
+        self._i = i
+
+    @property
+    def x(self):
+        return self._buffer.xs[self._i]
+
+    @x.setter
+    def x(self, valor):
+        self._buffer.xs[self._i] = valor
+
+    @property
+    def y(self):
+        return self._buffer.ys[self._i]
+
+    @y.setter
+    def y(self, valor):
+        self._buffer.ys[self._i] = valor
+
+    @property
+    def z(self):
+        return self._buffer.zs[self._i]
+
+    @z.setter
+    def z(self, valor):
+        self._buffer.zs[self._i] = valor
+
+    def __repr__(self):
+        return f"VistaPixel(x={self.x}, y={self.y}, z={self.z})"
+
+class PixelBuffer:
+    """
+    N pixeles como tres columnas de doubles (memoryviews sobre array('d')).
+
+    - buffer[i]   -> VistaPixel (lee/escribe directo en las columnas)
+    - buffer[a:b] -> PixelBuffer que COMPARTE memoria (slicing sin copia)
+    - trasladar / escalar / caja_envolvente operan sobre columnas completas:
+      con NumPy son vectorizadas en el mismo buffer. Sin NumPy funcionan,
+      pero cada double se convierte a float de Python y de vuelta, y resultan
+      MÁS LENTAS que un bucle sobre PixelSlots: sin NumPy lo único que se
+      gana es memoria (24 bytes por pixel en vez de ~100).
+    El tamaño es fijo: un array con memoryviews vivas no puede crecer.
+    """
+    __slots__ = ("xs", "ys", "zs")
+
+    def __init__(self, n=0):
+        ceros = bytes(8 * n)
+        self.xs = memoryview(array("d", ceros))
+        self.ys = memoryview(array("d", ceros))
+        self.zs = memoryview(array("d", ceros))
+
+    @classmethod
+    def desde_columnas(cls, xs, ys, zs):
+        """Envuelve (sin copiar) tres buffers de doubles del mismo largo."""
+        buffer = cls.__new__(cls)
+        columnas = [memoryview(c) for c in (xs, ys, zs)]
+        # bytes/bytearray/mmap llegan como 'B': se reinterpretan como doubles
+        buffer.xs, buffer.ys, buffer.zs = (c if c.format == "d" else c.cast("d") for c in columnas)
+        if not len(buffer.xs) == len(buffer.ys) == len(buffer.zs):
+            raise ValueError("Las columnas deben tener el mismo largo.")
+        return buffer
+
+    @classmethod
+    def desde_puntos(cls, puntos):
+        """Copia una secuencia de tuplas (x, y, z) u objetos con .x/.y/.z."""
+        xs, ys, zs = array("d"), array("d"), array("d")
+        for p in puntos:
+            if isinstance(p, tuple):
+                x, y, z = p
+            else:
+                x, y, z = p.x, p.y, p.z
+            xs.append(x)
+            ys.append(y)
+            zs.append(z)
+        return cls.desde_columnas(xs, ys, zs)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return PixelBuffer.desde_columnas(self.xs[indice], self.ys[indice], self.zs[indice])
+        n = len(self.xs)
+        if indice < 0:
+            indice += n
+        if not 0 <= indice < n:
+            raise IndexError("índice de pixel fuera de rango")
+        return VistaPixel(self, indice)
+
+    def __iter__(self):
+        for i in range(len(self.xs)):
+            yield VistaPixel(self, i)
+
+    def __repr__(self):
+        return f"PixelBuffer(n={len(self)})"
+
+    def coordenadas(self):
+        """Iterador de tuplas (x, y, z): mucho más barato que crear vistas."""
+        return zip(self.xs, self.ys, self.zs)
+
+    def copia(self):
+        """Copia independiente y contigua (por ejemplo, de un slice con paso)."""
+        return PixelBuffer.desde_columnas(*(array("d", c) for c in (self.xs, self.ys, self.zs)))
+
+    def memoria_bytes(self):
+        return self.xs.nbytes + self.ys.nbytes + self.zs.nbytes
+
+    # --- Operaciones por columna ---
+    def _aplicar(self, operador, valores, neutro):
+        for columna, valor in zip((self.xs, self.ys, self.zs), valores):
+            if valor == neutro:
+                continue
+            if np is not None:
+                vista = np.asarray(columna)      # Sin copia, respeta el paso del slice
+                vista[...] = operador(vista, valor)
+            else:
+                columna[:] = array("d", map(operador, columna, repeat(valor, len(columna))))
+
+    def trasladar(self, dx=0.0, dy=0.0, dz=0.0):
+        self._aplicar(operator.add, (dx, dy, dz), 0.0)
+        return self
+
+    def escalar(self, sx, sy=None, sz=None):
+        self._aplicar(operator.mul, (sx, sx if sy is None else sy, sx if sz is None else sz), 1.0)
+        return self
+
+    def caja_envolvente(self):
+        """((min_x, min_y, min_z), (max_x, max_y, max_z)). ValueError si está vacío."""
+        if not len(self):
+            raise ValueError("caja_envolvente() de un PixelBuffer vacío")
+        columnas = (self.xs, self.ys, self.zs)
+        if np is not None:
+            columnas = [np.asarray(c) for c in columnas]
+            return (tuple(float(c.min()) for c in columnas), tuple(float(c.max()) for c in columnas))
+        return tuple(min(c) for c in columnas), tuple(max(c) for c in columnas)
+
+# --- 1. Layouts ---
+# Cada layout sabe construir N pixeles y hacer tres operaciones sobre ellos:
+#   leer:     sumar el campo x de todos
+#   escribir: x += 1 en todos (los inmutables se reemplazan)
+#   iterar:   recorrer los N registros en Python sumando x + y + z
+# Usamos floats DISTINTOS por pixel: con `PixelDict(1, 2, 3)` todos comparten
+# los mismos ints cacheados y la medición sale engañosamente barata.
+
+def _coordenadas(n):
+    return ((float(i), i * 0.5, i * 2.0) for i in range(n))
+
+def _crear_objetos(cls):
+    return lambda n: [cls(x, y, z) for x, y, z in _coordenadas(n)]
+
+def _leer_objetos(datos):
+    return sum(p.x for p in datos)
+
+def _escribir_mutables(datos):
+    for p in datos:
+        p.x += 1.0
+
+def _iterar_objetos(datos):
+    total = 0.0
+    for p in datos:
+        total += p.x + p.y + p.z
+    return total
+
+def _escribir_namedtuple(datos):
+    for i, p in enumerate(datos):
+        datos[i] = p._replace(x=p.x + 1.0)
+
+def _crear_tuplas(n):
+    return list(_coordenadas(n))
+
+def _leer_tuplas(datos):
+    return sum(p[0] for p in datos)
+
+def _escribir_tuplas(datos):
+    for i, (x, y, z) in enumerate(datos):
+        datos[i] = (x + 1.0, y, z)
+
+def _iterar_tuplas(datos):
+    total = 0.0
+    for x, y, z in datos:
+        total += x + y + z
+    return total
+
+def _crear_arrays(n):
+    # Un array contiguo de doubles por campo ("struct of arrays"): 8 bytes por valor
+    return (array("d", (float(i) for i in range(n))),
+            array("d", (i * 0.5 for i in range(n))),
+            array("d", (i * 2.0 for i in range(n))))
+
+def _leer_arrays(datos):
+    return sum(datos[0])
+
+def _escribir_arrays(datos):
+    xs = datos[0]
+    for i in range(len(xs)):
+        xs[i] += 1.0
+
+def _iterar_arrays(datos):
+    total = 0.0
+    for x, y, z in zip(*datos):
+        total += x + y + z
+    return total
+
+def _crear_numpy(n):
+    datos = np.empty(n, dtype=[("x", "f8"), ("y", "f8"), ("z", "f8")])
+    indices = np.arange(n, dtype="f8")
+    datos["x"] = indices
+    datos["y"] = indices * 0.5
+    datos["z"] = indices * 2.0
+    return datos
+
+def _leer_numpy(datos):
+    return float(datos["x"].sum())          # Vectorizado
+
+def _escribir_numpy(datos):
+    datos["x"] += 1.0                       # Vectorizado
+
+def _iterar_numpy(datos):
+    # Recorrer un array NumPy desde Python obliga a convertir cada valor
+    total = 0.0
+    for x, y, z in zip(datos["x"].tolist(), datos["y"].tolist(), datos["z"].tolist()):
+        total += x + y + z
+    return total
+
+def _crear_buffer(n):
+    return PixelBuffer.desde_columnas(*_crear_arrays(n))
+
+def _leer_buffer(datos):
+    return sum(datos.xs)
+
+def _escribir_buffer(datos):
+    datos.trasladar(1.0)
+
+def _iterar_buffer(datos):
+    total = 0.0
+    for x, y, z in datos.coordenadas():
+        total += x + y + z
+    return total
+
+LAYOUTS = {
+    # nombre: (descripción, crear, leer, escribir, iterar)
+    "dict": ("PixelDict (__dict__)", _crear_objetos(PixelDict),
+             _leer_objetos, _escribir_mutables, _iterar_objetos),
+    "slots": ("PixelSlots (__slots__)", _crear_objetos(PixelSlots),
+              _leer_objetos, _escribir_mutables, _iterar_objetos),
+    "namedtuple": ("namedtuple", _crear_objetos(PixelTupla),
+                   _leer_objetos, _escribir_namedtuple, _iterar_objetos),
+    "dataclass": ("dataclass(slots=True)", _crear_objetos(PixelDataclass),
+                  _leer_objetos, _escribir_mutables, _iterar_objetos),
+    "tuple": ("tuple", _crear_tuplas, _leer_tuplas, _escribir_tuplas, _iterar_tuplas),
+    "array": ("array('d') por campo", _crear_arrays, _leer_arrays, _escribir_arrays, _iterar_arrays),
+    "buffer": ("PixelBuffer", _crear_buffer, _leer_buffer, _escribir_buffer, _iterar_buffer),
+    "numpy": ("NumPy structured", _crear_numpy, _leer_numpy, _escribir_numpy, _iterar_numpy),
+}
+
+# --- 2. Medición ---
+
+def rss_bytes():
+    """RSS actual del proceso (Linux, /proc). None si no está disponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _mejor_tiempo(func, datos, repeticiones):
+    return min(timeit.repeat(lambda: func(datos), number=1, repeat=repeticiones))
+
+def medir_layout(nombre, n, repeticiones=3):
+    """
+    Mide un layout con N pixeles. Devuelve un dict serializable con:
+    bytes tracemalloc, delta de RSS, creación (s) y lectura/escritura/iteración (s).
+    El RSS solo es fiable en un proceso limpio: ver medir_aislado().
+    """
+    _, crear, leer, escribir, iterar = LAYOUTS[nombre]
+
+    # RSS: primera construcción, antes de que el allocator tenga memoria reciclada
+    gc.collect()
+    rss_antes = rss_bytes()
+    datos = crear(n)
+    rss_despues = rss_bytes()
+    rss = rss_despues - rss_antes if rss_antes is not None else None
+    del datos
+
+    creacion = float("inf")
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        datos = crear(n)
+        creacion = min(creacion, time.perf_counter() - inicio)
+        del datos
+
+    # tracemalloc ralentiza las asignaciones: va en su propia construcción
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    datos = crear(n)
+    memoria = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    resultado = {
+        "layout": nombre, "n": n, "memoria": memoria, "rss": rss, "creacion": creacion,
+        "lectura": _mejor_tiempo(leer, datos, repeticiones),
+        "iteracion": _mejor_tiempo(iterar, datos, repeticiones),
+    }
+    # Escribir al final: modifica los datos
+    resultado["escritura"] = _mejor_tiempo(escribir, datos, repeticiones)
+    return resultado
+
+def medir_aislado(nombre, n, repeticiones=3):
+    """Ejecuta medir_layout en un intérprete nuevo para que el RSS no herede basura."""
+    salida = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--hijo", nombre, str(n),
+         "--repeticiones", str(repeticiones)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout)
+
+def comparar_layouts(tamanos, layouts, repeticiones=3, aislado=True):
+    """Devuelve {n: [resultado, ...]} para cada tamaño y layout."""
+    medir = medir_aislado if aislado else medir_layout
+    return {n: [medir(nombre, n, repeticiones) for nombre in layouts] for n in tamanos}
+
+# --- 3. Reporte ---
+
+def _mb(b):
+    return "n/d" if b is None else f"{b / 1e6:.1f}"
+
+def imprimir_tabla(n, resultados):
+    referencia = next((r["memoria"] for r in resultados if r["layout"] == "dict"), None)
+    print(f"\n--- N = {n:,} ---")
+    print(f"{'Layout':<24}{'tracemalloc':>12}{'B/pixel':>9}{'vs dict':>9}{'RSS Δ':>9}"
+          f"{'Crear':>10}{'Leer':>9}{'Escribir':>10}{'Iterar':>9}")
+    print(f"{'':<24}{'MB':>12}{'':>9}{'':>9}{'MB':>9}{'ms':>10}{'ns/px':>9}{'ns/px':>10}{'ns/px':>9}")
+    for r in resultados:
+        vs = f"{r['memoria'] / referencia:.2f}x" if referencia else "-"
+        print(f"{LAYOUTS[r['layout']][0]:<24}{_mb(r['memoria']):>12}{r['memoria'] / n:>9.1f}{vs:>9}"
+              f"{_mb(r['rss']):>9}{r['creacion'] * 1e3:>10.1f}"
+              f"{r['lectura'] / n * 1e9:>9.1f}{r['escritura'] / n * 1e9:>10.1f}"
+              f"{r['iteracion'] / n * 1e9:>9.1f}")
+
+def demo_getsizeof():
+    """La medición ingenua original: por qué sys.getsizeof engaña."""
+    p_dict, p_slots = PixelDict(1.5, 2.5, 3.5), PixelSlots(1.5, 2.5, 3.5)
+    size_dict_obj = sys.getsizeof(p_dict) + sys.getsizeof(p_dict.__dict__)
+    size_slots_obj = sys.getsizeof(p_slots)
+    floats = 3 * sys.getsizeof(1.5)
+
+    print("--- Tamaño por Objeto según sys.getsizeof ---")
     print(f"Normal (__dict__): ~{size_dict_obj} bytes")
     print(f"Slots:             ~{size_slots_obj} bytes")
-    print(f"Ahorro memoria:    {100 * (1 - size_slots_obj/size_dict_obj):.1f}%")
-
-    # 3. Acceso a atributos
-    print("\n--- Velocidad de Acceso (Lectura) ---")
-    t_read_dict = timeit.timeit("o.x", globals={"o": lista_dict[0]}, number=10_000_000)
-    t_read_slots = timeit.timeit("o.x", globals={"o": lista_slots[0]}, number=10_000_000)
-    
-    print(f"Lectura Dict:  {t_read_dict:.4f} s")
-    print(f"Lectura Slots: {t_read_slots:.4f} s (Más rápido)")
-    
-    print("\nConclusión: Usa __slots__ si vas a crear MILLONES de objetos pequeños.")
+    print(f"...pero NO cuenta los 3 floats referenciados (+{floats} bytes) ni el slot de la lista.")
+
+def demo_buffer():
+    """PixelBuffer: mismo API que PixelSlots, sin un objeto por pixel."""
+    buffer = PixelBuffer.desde_puntos(PixelSlots(float(i), i * 0.5, i * 2.0) for i in range(10))
+    p = buffer[3]
+    p.x += 100                                   # Escribe directo en la columna
+    mitad = buffer[5:]                           # Sin copia: comparte memoria
+    mitad.trasladar(dz=-1.0)
+
+    print("\n--- PixelBuffer (struct of arrays) ---")
+    print(f"{buffer}: {buffer.memoria_bytes()} bytes de datos ({buffer.memoria_bytes() // len(buffer)} por pixel)")
+    print(f"buffer[3] = {buffer[3]}")
+    print(f"buffer[9] tras trasladar el slice [5:] = {buffer[9]}")
+    print(f"Caja envolvente: {buffer.caja_envolvente()}")
+    if np is None:
+        print("(Sin NumPy, trasladar/caja_envolvente son correctas pero más lentas que un bucle con __slots__.)")
+
+# --- 4. Almacén en disco (mmap) ---
+# Cuando los puntos no caben en RAM no se pueden cargar ni como PixelBuffer.
+# Formato de registro fijo:
+#   "PXL1" | n (uint64) | largo del JSON (uint32) | JSON {campos, tipos} | relleno a 8
+#   | n registros empaquetados con struct ("<ddd" por defecto)
+# Con mmap el SO pagina el archivo bajo demanda: leer el registro i es
+# calcular un offset, e iterar no carga el archivo completo en memoria.
+
+MAGIA = b"PXL1"
+_CABECERA_FIJA = struct.Struct("<4sQI")
+
+def _leer_cabecera(f):
+    magia, n, largo = _CABECERA_FIJA.unpack(f.read(_CABECERA_FIJA.size))
+    if magia != MAGIA:
+        raise ValueError(f"No es un archivo de pixeles (magia {magia!r}).")
+    meta = json.loads(f.read(largo))
+    inicio = -(-(_CABECERA_FIJA.size + largo) // 8) * 8
+    return n, meta["campos"], meta["tipos"], inicio
+
+def _validar_campos(campos, tipos):
+    """ValueError si `tipos` no tiene exactamente un código struct por campo."""
+    registro = struct.Struct("<" + tipos)
+    n_tipos = len(registro.unpack(bytes(registro.size)))  # "3d" cuenta 3, "8s" cuenta 1
+    if n_tipos != len(campos):
+        raise ValueError(f"{len(campos)} campos {list(campos)} pero {n_tipos} tipos en {tipos!r}.")
+
+class EscritorPixeles:
+    """
+    Agrega registros a un archivo de pixeles con escritura en bloques.
+
+    Los registros se acumulan en un bytearray y se escriben cada
+    `tam_bloque` registros; el contador n de la cabecera se actualiza
+    en cada descarga, así un lector nunca ve un registro a medias.
+    Si el archivo existe se abre para seguir agregando (mismos campos).
+    """
+
+    def __init__(self, ruta, campos=("x", "y", "z"), tipos="ddd", tam_bloque=65_536):
+        self.ruta = ruta
+        _validar_campos(campos, tipos)
+        if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+            self._f = open(ruta, "r+b")
+            self.n, campos_archivo, tipos, self._inicio = _leer_cabecera(self._f)
+            if list(campos) != campos_archivo:
+                self._f.close()
+                raise ValueError(f"El archivo tiene campos {campos_archivo}, no {list(campos)}.")
+            self._f.truncate(self._inicio + self.n * struct.calcsize("<" + tipos))  # Cola a medias
+        else:
+            self._f = open(ruta, "w+b")
+            meta = json.dumps({"campos": list(campos), "tipos": tipos}).encode()
+            self.n = 0
+            self._inicio = -(-(_CABECERA_FIJA.size + len(meta)) // 8) * 8
+            self._f.write(_CABECERA_FIJA.pack(MAGIA, 0, len(meta)) + meta)
+            self._f.write(bytes(self._inicio - self._f.tell()))
+        self._registro = struct.Struct("<" + tipos)
+        self._tam_bloque = tam_bloque
+        self._pendiente = bytearray()
+        self._n_pendiente = 0
+        self._f.seek(0, os.SEEK_END)
+
+    def agregar(self, *valores):
+        self._pendiente += self._registro.pack(*valores)
+        self._n_pendiente += 1
+        if self._n_pendiente >= self._tam_bloque:
+            self.descargar()
+
+    def agregar_pixel(self, pixel):
+        """Acepta PixelSlots, PixelDict, VistaPixel... cualquier cosa con .x/.y/.z."""
+        self.agregar(pixel.x, pixel.y, pixel.z)
+
+    def extender(self, filas):
+        for fila in filas:
+            self.agregar(*fila)
+
+    def descargar(self):
+        if not self._n_pendiente:
+            return
+        self._f.write(self._pendiente)
+        self.n += self._n_pendiente
+        self._pendiente.clear()
+        self._n_pendiente = 0
+        # Primero los datos, luego el contador que los hace visibles
+        self._f.flush()
+        self._f.seek(4)
+        self._f.write(struct.pack("<Q", self.n))
+        self._f.seek(0, os.SEEK_END)
+        self._f.flush()
+
+    def cerrar(self):
+        if not self._f.closed:
+            self.descargar()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+class AlmacenPixeles:
+    """
+    Lector de un archivo de pixeles vía mmap (solo lectura).
+
+    - almacen[i]        -> PixelSlots del registro i (acceso aleatorio O(1));
+                           con otros campos, un namedtuple con los del archivo
+    - almacen.leer(i)   -> tupla cruda, sin crear el objeto
+    - for fila in almacen.filas()       -> tuplas, secuencial
+    - for buf in almacen.bloques(k)     -> PixelBuffer de k pixeles (solo x/y/z 'd')
+
+    Los iteradores de filas()/bloques() toman vistas del mmap; cerrar() los
+    cierra primero, así que se puede cerrar aunque alguno quede a medias.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._f = open(ruta, "rb")
+        self.n, self.campos, self.tipos, self._inicio = _leer_cabecera(self._f)
+        try:
+            _validar_campos(self.campos, self.tipos)
+        except (ValueError, struct.error):
+            self._f.close()
+            raise
+        self._registro = struct.Struct("<" + self.tipos)
+        self._mmap = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        fin = self._inicio + self.n * self._registro.size
+        self._datos = memoryview(self._mmap)[self._inicio:fin]
+        self._es_pixel = tuple(self.campos) == ("x", "y", "z")
+        self._fila = PixelSlots if self._es_pixel else namedtuple("Registro", self.campos)
+        self._iteradores = weakref.WeakSet()   # Generadores vivos con vistas exportadas
+
+    def __len__(self):
+        return self.n
+
+    def leer(self, i):
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("índice de registro fuera de rango")
+        return self._registro.unpack_from(self._datos, i * self._registro.size)
+
+    def __getitem__(self, i):
+        return self._fila(*self.leer(i))
+
+    def _seguir(self, generador):
+        self._iteradores.add(generador)
+        return generador
+
+    def filas(self, inicio=0, fin=None):
+        return self._seguir(self._filas(inicio, fin))
+
+    __iter__ = filas
+
+    def _filas(self, inicio, fin):
+        tam = self._registro.size
+        fin = self.n if fin is None else min(fin, self.n)
+        vista = self._datos[inicio * tam:fin * tam]
+        try:
+            yield from self._registro.iter_unpack(vista)
+        finally:
+            vista.release()
+
+    def bloques(self, tam_bloque=65_536):
+        """Copia el archivo a PixelBuffers de a un bloque: la RAM queda acotada."""
+        if not self._es_pixel or set(self.tipos) != {"d"} or sys.byteorder != "little":
+            raise ValueError("bloques() requiere campos x, y, z de tipo 'd' en un host little-endian.")
+        return self._seguir(self._bloques(tam_bloque))
+
+    def _bloques(self, tam_bloque):
+        tam = self._registro.size
+        for inicio in range(0, self.n, tam_bloque):
+            fin = min(inicio + tam_bloque, self.n)
+            with self._datos[inicio * tam:fin * tam] as vista, vista.cast("d") as dobles:
+                valores = array("d", dobles)
+            yield PixelBuffer.desde_columnas(valores[0::3], valores[1::3], valores[2::3])
+
+    def cerrar(self):
+        if not self._mmap.closed:
+            for generador in list(self._iteradores):
+                generador.close()  # Su finally libera la vista del mmap
+            self._datos.release()
+            self._mmap.close()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+def caja_envolvente_archivo(almacen, tam_bloque=65_536):
+    """Caja envolvente de todo el archivo, combinando la de cada bloque."""
+    cajas = [bloque.caja_envolvente() for bloque in almacen.bloques(tam_bloque)]
+    if not cajas:
+        raise ValueError("caja_envolvente_archivo() de un archivo vacío")
+    mins, maxs = zip(*cajas)
+    return tuple(map(min, zip(*mins))), tuple(map(max, zip(*maxs)))
+
+def demo_mmap(n, ruta=None):
+    """Escribe N pixeles a disco y los recorre sin cargarlos en RAM."""
+    temporal = ruta is None
+    if temporal:
+        fd, ruta = tempfile.mkstemp(suffix=".pxl")
+        os.close(fd)
+        os.remove(ruta)
+    print(f"\n--- Almacén mmap: {n:,} pixeles en {ruta} ---")
+    try:
+        inicio = time.perf_counter()
+        with EscritorPixeles(ruta) as escritor:
+            escritor.extender(_coordenadas(n))
+        t_escritura = time.perf_counter() - inicio
+        print(f"Escritura:        {t_escritura:.2f} s ({os.path.getsize(ruta) / 1e6:.1f} MB en disco)")
+
+        with AlmacenPixeles(ruta) as almacen:
+            indices = [random.randrange(len(almacen)) for _ in range(100_000)]
+            inicio = time.perf_counter()
+            for i in indices:
+                almacen.leer(i)
+            t_aleatorio = (time.perf_counter() - inicio) / len(indices)
+            print(f"Acceso aleatorio: {t_aleatorio * 1e9:.0f} ns/registro  (almacen[{n // 2}] = "
+                  f"x={almacen[n // 2].x}, z={almacen[n // 2].z})")
+
+            inicio = time.perf_counter()
+            total = sum(x + y + z for x, y, z in almacen.filas())
+            t_iteracion = time.perf_counter() - inicio
+            print(f"Iteración:        {t_iteracion / n * 1e9:.0f} ns/registro (suma = {total:.3e})")
+
+            inicio = time.perf_counter()
+            caja = caja_envolvente_archivo(almacen)
+            t_bloques = time.perf_counter() - inicio
+            print(f"Caja por bloques: {t_bloques / n * 1e9:.0f} ns/registro -> {caja}")
+
+            # tracemalloc ralentiza todo: el pico se mide en una pasada aparte
+            tracemalloc.start()
+            caja_envolvente_archivo(almacen)
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"Pico de memoria Python al recorrerlo: {pico / 1e6:.1f} MB "
+              f"(vs {os.path.getsize(ruta) / 1e6:.1f} MB del archivo)")
+    finally:
+        if temporal and os.path.exists(ruta):
+            os.remove(ruta)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de layouts de memoria para N pixeles.")
+    parser.add_argument("--n", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Tamaños N a comparar.")
+    parser.add_argument("--layouts", nargs="+", choices=list(LAYOUTS), default=list(LAYOUTS),
+                        help="Layouts a incluir.")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por medición (se toma el mínimo).")
+    parser.add_argument("--en-proceso", action="store_true",
+                        help="Mide todo en este proceso (más rápido, el RSS Δ se vuelve poco fiable).")
+    parser.add_argument("--mmap", type=int, metavar="N",
+                        help="Demo del almacén en disco con N pixeles (en vez del benchmark).")
+    parser.add_argument("--archivo", help="Ruta del archivo para --mmap (por defecto, uno temporal).")
+    parser.add_argument("--hijo", nargs=2, metavar=("LAYOUT", "N"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.hijo:
+        print(json.dumps(medir_layout(args.hijo[0], int(args.hijo[1]), args.repeticiones)))
+        return
+
+    if args.mmap:
+        demo_mmap(args.mmap, args.archivo)
+        return
+
+    layouts = args.layouts
+    if np is None and "numpy" in layouts:
+        print("⚠️  NumPy no instalado: se omite el layout 'numpy' (pip install numpy).")
+        layouts = [l for l in layouts if l != "numpy"]
+
+    demo_getsizeof()
+    demo_buffer()
+    print(f"\n--- Comparando {len(layouts)} layouts "
+          f"({'en proceso' if args.en_proceso else 'un subproceso por medición'}) ---")
+    resultados = comparar_layouts(args.n, layouts, args.repeticiones, aislado=not args.en_proceso)
+    for n, filas in resultados.items():
+        imprimir_tabla(n, filas)
+
+    if "numpy" in layouts:
+        print("\nLeer/Escribir en NumPy son vectorizados; Iterar convierte cada valor a float de Python.")
+    print("Conclusión: Usa __slots__ si vas a crear MILLONES de objetos pequeños;")
+    print("si solo son datos numéricos, un layout columnar (array/PixelBuffer) ocupa mucho menos memoria.")
+    if np is not None:
+        print("Para VELOCIDAD en operaciones masivas hace falta NumPy (vectorizado en el mismo buffer).")
+    else:
+        print("Sin NumPy solo se gana memoria: leer/escribir desde Python es más lento que con __slots__.")
 
 if __name__ == "__main__":
     main()